@@ -4,9 +4,22 @@ Signal extraction and risk scoring agents
 """
 
 from .signal_extractor import SignalExtractorAgent
-from .risk_scorer import RiskScorerAgent
+from .risk_scorer import RiskScorerAgent, SignalBatch
+from .extraction_cache import ExtractionCache
+from .note_prefilter import NotePrefilter
+from .llm_replay import LLMReplayStore, ReplayMissError
+from .ranking import TopK, top_k, top_k_async, descending
 
 __all__ = [
     "SignalExtractorAgent",
     "RiskScorerAgent",
+    "SignalBatch",
+    "ExtractionCache",
+    "NotePrefilter",
+    "LLMReplayStore",
+    "ReplayMissError",
+    "TopK",
+    "top_k",
+    "top_k_async",
+    "descending",
 ]
@@ -0,0 +1,162 @@
+"""Content-addressed cache for signal extraction results"""
+
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from backend.cache import TTLCache
+
+
+# Keys per SQLite lookup (stays under the host parameter limit)
+DISK_LOOKUP_CHUNK_SIZE = 500
+
+
+class ExtractionCache:
+    """
+    Two-tier cache of LLM extraction results
+
+    Entries are keyed by a hash of the normalized note text, the model name
+    and the system prompt version, so identical notes skip the model call
+    and any prompt or model change invalidates old results. The memory tier
+    is a bounded LRU with TTL; the optional SQLite tier survives restarts.
+    SQLite calls run in a worker thread so they never block the event loop,
+    and `get_many`/`set_many` cover a whole batch of notes with one read and
+    one committed write.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = 86400,
+        disk_path: Optional[str] = None
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum entries held in memory
+            ttl_seconds: Entry lifetime in seconds (None for no expiry)
+            disk_path: SQLite file for the persistent tier (None to disable)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.memory = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS extraction_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._disk.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional["ExtractionCache"]:
+        """Build a cache from EXTRACTION_CACHE_* settings (None when disabled)"""
+        max_entries = int(os.getenv("EXTRACTION_CACHE_SIZE", "1024"))
+        ttl_seconds = float(os.getenv("EXTRACTION_CACHE_TTL_SECONDS", "86400"))
+        disk_path = os.getenv("EXTRACTION_CACHE_PATH") or None
+
+        if max_entries <= 0 and not disk_path:
+            return None
+
+        return cls(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds if ttl_seconds > 0 else None,
+            disk_path=disk_path
+        )
+
+    @staticmethod
+    def make_key(text: str, model: str, prompt_version: str) -> str:
+        """Hash normalized text together with the model and prompt version"""
+        normalized = re.sub(r"\s+", " ", text).strip()
+        digest = hashlib.sha256()
+        for part in (model, prompt_version, normalized):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached result JSON for `key`, checking memory then disk"""
+        return (await self.get_many([key])).get(key)
+
+    async def get_many(self, keys: list[str]) -> dict[str, str]:
+        """Cached result JSON for each of `keys` that is present, checking memory then disk"""
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.memory.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+
+        if missing and self._disk is not None:
+            from_disk = await asyncio.to_thread(self._disk_get_many, missing)
+            for key, value in from_disk.items():
+                self.memory.set(key, value)
+            found.update(from_disk)
+
+        hits = sum(1 for key in keys if key in found)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return found
+
+    async def set(self, key: str, value: str):
+        """Store result JSON in every enabled tier"""
+        await self.set_many({key: value})
+
+    async def set_many(self, entries: dict[str, str]):
+        """Store several results in every enabled tier, with one disk commit"""
+        for key, value in entries.items():
+            self.memory.set(key, value)
+        if entries and self._disk is not None:
+            await asyncio.to_thread(self._disk_put_many, entries)
+
+    def _disk_put_many(self, entries: dict[str, str]):
+        """Write entries to the SQLite tier in one transaction"""
+        now = time.time()
+        with self._disk_lock:
+            self._disk.executemany(
+                "INSERT OR REPLACE INTO extraction_cache (key, value, created_at) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in entries.items()]
+            )
+            self._disk.commit()
+
+    def _disk_get_many(self, keys: list[str]) -> dict[str, str]:
+        """Read non-expired entries from the SQLite tier, dropping expired ones"""
+        found, expired = {}, []
+        now = time.time()
+        with self._disk_lock:
+            for start in range(0, len(keys), DISK_LOOKUP_CHUNK_SIZE):
+                chunk = keys[start:start + DISK_LOOKUP_CHUNK_SIZE]
+                rows = self._disk.execute(
+                    "SELECT key, value, created_at FROM extraction_cache "
+                    f"WHERE key IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, value, created_at in rows:
+                    if self.ttl_seconds is not None and created_at + self.ttl_seconds <= now:
+                        expired.append((key,))
+                    else:
+                        found[key] = value
+
+            if expired:
+                self._disk.executemany("DELETE FROM extraction_cache WHERE key = ?", expired)
+                self._disk.commit()
+
+        return found
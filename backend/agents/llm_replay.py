@@ -0,0 +1,197 @@
+"""Record/replay store for extraction model calls"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional, Type
+
+from pydantic import BaseModel
+
+
+MODES = ("off", "record", "replay")
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when a prompt was never recorded"""
+
+
+@dataclass
+class ReplayCost:
+    """Recorded token counts in the shape of a pydantic_ai Cost"""
+    request_tokens: Optional[int] = None
+    response_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
+
+
+@dataclass
+class ReplayedRun:
+    """Stands in for a pydantic_ai RunResult"""
+    data: BaseModel
+    _cost: ReplayCost
+    latency_ms: float
+
+    def cost(self) -> ReplayCost:
+        return self._cost
+
+
+class LLMReplayStore:
+    """
+    SQLite store of model prompts and their structured results
+
+    In record mode every successful model call is saved (prompt and result
+    JSON zlib-compressed, plus token counts and latency). In replay mode
+    results are served from the store without network access, optionally
+    after a simulated delay, and a prompt that was never recorded raises
+    ReplayMissError. Calls are keyed by model, prompt version, request shape
+    and the exact prompt, so a prompt change invalidates old recordings.
+    Parts of a call (e.g. each note of a batched request) can be stored
+    under their own keys as well, so a replay that groups the same inputs
+    differently can still be served piece by piece. SQLite reads and writes
+    run in a worker thread, off the event loop.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", latency_ms: Optional[float] = None):
+        """
+        Initialize the store
+
+        Args:
+            path: SQLite file holding the recordings
+            mode: "record" or "replay"
+            latency_ms: Replay delay per call; None replays each call's recorded latency
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid LLM replay mode: {mode}")
+
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.recorded = 0
+        self.replayed = 0
+        self.missed = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_calls ("
+            "key TEXT PRIMARY KEY, prompt BLOB NOT NULL, result BLOB NOT NULL, "
+            "request_tokens INTEGER, response_tokens INTEGER, total_tokens INTEGER, "
+            "latency_ms REAL NOT NULL, recorded_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMReplayStore"]:
+        """Build a store from LLM_REPLAY_* settings (None when the mode is off)"""
+        mode = os.getenv("LLM_REPLAY_MODE", "off").lower()
+        if mode not in MODES:
+            raise ValueError(f"LLM_REPLAY_MODE must be one of {', '.join(MODES)}")
+        if mode == "off":
+            return None
+
+        latency = os.getenv("LLM_REPLAY_LATENCY_MS", "0").lower()
+        return cls(
+            path=os.getenv("LLM_REPLAY_PATH", "llm_replay.sqlite3"),
+            mode=mode,
+            latency_ms=None if latency == "recorded" else float(latency)
+        )
+
+    @staticmethod
+    def make_key(model: str, prompt_version: str, call_type: str, prompt: str) -> str:
+        """Hash the model, prompt version, request shape and prompt"""
+        digest = hashlib.sha256()
+        for part in (model, prompt_version, call_type, prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    async def record(self, key: str, prompt: str, result, latency_ms: float):
+        """Save a successful model run"""
+        cost = result.cost()
+        row = self._row(
+            key,
+            prompt,
+            result.data.model_dump_json(),
+            (cost.request_tokens, cost.response_tokens, cost.total_tokens),
+            latency_ms
+        )
+        await asyncio.to_thread(self._insert_many, [row], True)
+        self.recorded += 1
+
+    async def record_parts(self, parts: list[tuple[str, str, BaseModel]], latency_ms: float):
+        """
+        Save the per-input results of one model run under their own keys
+
+        Parts carry no token counts (the run's usage is recorded once, with
+        the run itself) and never replace a recording of a real call.
+
+        Args:
+            parts: (key, prompt, result) for each part
+            latency_ms: Latency of the run the parts came from
+        """
+        rows = [
+            self._row(key, prompt, result.model_dump_json(), (None, None, None), latency_ms)
+            for key, prompt, result in parts
+        ]
+        if rows:
+            await asyncio.to_thread(self._insert_many, rows, False)
+
+    @staticmethod
+    def _row(key: str, prompt: str, result_json: str, tokens: tuple, latency_ms: float) -> tuple:
+        """Compressed table row for one recording"""
+        return (
+            key,
+            zlib.compress(prompt.encode("utf-8")),
+            zlib.compress(result_json.encode("utf-8")),
+            *tokens,
+            latency_ms,
+            time.time()
+        )
+
+    def _insert_many(self, rows: list[tuple], replace: bool):
+        """Store recordings, replacing existing keys or keeping them"""
+        conflict = "REPLACE" if replace else "IGNORE"
+        with self._lock:
+            self._conn.executemany(f"INSERT OR {conflict} INTO llm_calls VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def _fetch(self, key: str) -> Optional[tuple]:
+        """Stored result and timing columns for `key`"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT result, request_tokens, response_tokens, total_tokens, latency_ms "
+                "FROM llm_calls WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+    async def replay(self, key: str, result_type: Type[BaseModel]) -> ReplayedRun:
+        """
+        Serve a recorded run, sleeping for the configured latency first
+
+        Raises:
+            ReplayMissError: If the prompt was never recorded
+        """
+        row = await asyncio.to_thread(self._fetch, key)
+
+        if row is None:
+            self.missed += 1
+            raise ReplayMissError("No recorded model result for this prompt")
+
+        result, request_tokens, response_tokens, total_tokens, recorded_latency = row
+        delay_ms = recorded_latency if self.latency_ms is None else self.latency_ms
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+        self.replayed += 1
+        return ReplayedRun(
+            data=result_type.model_validate_json(zlib.decompress(result)),
+            _cost=ReplayCost(request_tokens, response_tokens, total_tokens),
+            latency_ms=delay_ms
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,80 @@
+"""Rule-based pre-filter for inspection notes"""
+
+import re
+from dataclasses import dataclass
+
+
+# Phrases that positively indicate a clean inspection. A note is clean only
+# if it consists of nothing but these phrases (plus punctuation and filler
+# words), so every sentence of it has been recognized as an "all clear".
+CLEAN_PATTERNS = [
+    r"\ball (?:systems|equipment|areas|items) (?:are |were )?(?:nominal|operational|normal|functional|functioning|working|ok|in order|good)\b",
+    r"\bno (?:\w+ )?(?:issues?|problems?|concerns?|defects?|deficiencies|findings|hazards?|exceptions)(?: (?:found|noted|observed|identified|detected|reported|to report))?\b",
+    r"\b(?:documentation|paperwork|records?|logs?) (?:is |are |was |were )?(?:complete|up to date|current|in order)\b",
+    r"\b(?:(?:hvac|ahu|air|furnace|water) )?(?:filters?|belts?|lamps?|batteries|pm|preventive maintenance)? ?(?:(?:was|were) )?(?:changed|completed|serviced|performed|replaced|inspected|cleaned|tested) (?:on schedule|as scheduled|on time)\b",
+    r"\b(?:routine|scheduled|daily|weekly|monthly|quarterly|annual) (?:walkthrough|walk-through|inspection|check|visit|rounds?)s? (?:completed|performed|conducted|done)\b",
+    r"\bin good (?:condition|working order|repair|shape)\b",
+    r"\b(?:(?:daily|weekly|monthly|quarterly|annual) )?(?:(?:fire alarm|sprinkler|generator|backflow|elevator|emergency lighting) )?(?:inspection|test|audit)s? (?:passed|satisfactory)\b",
+    r"\b(?:nothing to report|no action (?:needed|required))\b",
+]
+
+# Words that may remain between clean phrases without making a note ambiguous
+FILLER_WORDS = {"a", "an", "and", "also", "the"}
+
+
+@dataclass
+class PrefilterStats:
+    """Counters for pre-filter decisions"""
+    checked: int = 0
+    skipped: int = 0
+
+    @property
+    def skip_rate(self) -> float:
+        """Fraction of checked notes that skipped the LLM"""
+        return self.skipped / self.checked if self.checked else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skip_rate, 4),
+        }
+
+
+class NotePrefilter:
+    """
+    Deterministic classifier that spots clearly clean inspection notes
+
+    A note is skipped only when it is made up entirely of explicit "all
+    clear" phrases: once they are removed, no words other than filler may
+    remain. Keyword checks alone are not enough, since a problem can be
+    described without any tell-tale keyword ("No issues found. Roof membrane
+    torn near east drain."), and a missed problem silently hides risk.
+    Anything not recognized goes to the LLM.
+    """
+
+    def __init__(self):
+        self._clean = [re.compile(p, re.IGNORECASE) for p in CLEAN_PATTERNS]
+        self.stats = PrefilterStats()
+
+    def _residual(self, notes: str) -> str:
+        """The note with every clean phrase removed"""
+        residual = notes
+        for pattern in self._clean:
+            residual = pattern.sub(" ", residual)
+        return residual
+
+    def is_clean(self, notes: str) -> bool:
+        """True when the note can safely skip LLM extraction"""
+        if not any(p.search(notes) for p in self._clean):
+            return False
+        remaining = re.findall(r"[^\W\d_]+", self._residual(notes).lower())
+        return all(word in FILLER_WORDS for word in remaining)
+
+    def should_skip(self, notes: str) -> bool:
+        """Classify a note and record the decision in `stats`"""
+        skip = self.is_clean(notes)
+        self.stats.checked += 1
+        if skip:
+            self.stats.skipped += 1
+        return skip
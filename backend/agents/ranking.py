@@ -0,0 +1,119 @@
+"""
+Partial top-K selection for ranking
+"""
+
+import heapq
+from typing import Any, AsyncIterable, Callable, Generic, Iterable, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class _Descending:
+    """Key component that compares in reverse order"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.value < self.value
+
+    def __gt__(self, other: "_Descending") -> bool:
+        return self.value < other.value
+
+    def __eq__(self, other: "_Descending") -> bool:
+        return self.value == other.value
+
+    __hash__ = None
+
+
+def descending(value: Any) -> _Descending:
+    """
+    Wrap one component of a sort key so it ranks in descending order
+
+    Lets a single key mix directions, e.g. highest score first with ties
+    broken by ascending site ID: `key=lambda s: (descending(s.score), s.site_id)`.
+    """
+    return _Descending(value)
+
+
+class TopK(Generic[T]):
+    """
+    Running selection of the k best items from a stream
+
+    Keeps a heap of at most k entries whose root is the worst item retained,
+    so each pushed item costs O(log k) and memory stays O(k) no matter how
+    long the stream is. Items with equal keys rank in arrival order, the same
+    tie-breaking sorted() gives, so results are deterministic.
+    """
+
+    def __init__(self, k: Optional[int], key: Callable[[T], Any], reverse: bool = True):
+        """
+        Initialize the selection
+
+        Args:
+            k: Number of items to keep (None keeps everything)
+            key: Ranking key for an item
+            reverse: Largest keys first when True, smallest first when False
+        """
+        self.k = k
+        self.key = key
+        self.reverse = reverse
+        self._heap: list[tuple] = []
+        self._seen = 0
+
+    def push(self, item: T):
+        """Offer one item"""
+        # Heap order puts the worst retained item at the root: the smallest
+        # rank key, and among equal keys the latest arrival
+        rank = self.key(item) if self.reverse else _Descending(self.key(item))
+        self._seen += 1
+
+        if self.k is None or len(self._heap) < self.k:
+            heapq.heappush(self._heap, (rank, -self._seen, item))
+        elif self.k > 0 and rank > self._heap[0][0]:
+            # A tie with the root arrived later, so only a strictly better
+            # key displaces it
+            heapq.heapreplace(self._heap, (rank, -self._seen, item))
+
+    def extend(self, items: Iterable[T]) -> "TopK[T]":
+        """Offer every item of an iterable"""
+        for item in items:
+            self.push(item)
+        return self
+
+    def result(self) -> list[T]:
+        """Retained items, best first"""
+        return [entry[2] for entry in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+
+def top_k(items: Iterable[T], k: Optional[int], key: Callable[[T], Any], reverse: bool = True) -> list[T]:
+    """
+    The k best items of `items` in rank order, in O(n log k)
+
+    Equivalent to `sorted(items, key=key, reverse=reverse)[:k]`, including
+    its stable ordering of ties, but reads `items` in a single pass and never
+    holds more than k of them.
+
+    Args:
+        items: Any iterable, including generators
+        k: Number of items to return (None ranks everything)
+        key: Ranking key for an item
+        reverse: Largest keys first when True, smallest first when False
+    """
+    return TopK(k, key, reverse).extend(items).result()
+
+
+async def top_k_async(
+    items: AsyncIterable[T],
+    k: Optional[int],
+    key: Callable[[T], Any],
+    reverse: bool = True
+) -> list[T]:
+    """top_k over an async stream, such as rows paged from the database"""
+    selection = TopK(k, key, reverse)
+    async for item in items:
+        selection.push(item)
+    return selection.result()
@@ -1,11 +1,105 @@
 """Risk Scoring Agent"""
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Iterable, Optional
 from collections import defaultdict
+import math
+import os
 import uuid
 
+import numpy as np
+
 from backend.models import RiskScore, ExecutionSignal
+from backend.observability import timed
+from backend.timeutils import to_naive_utc
+from backend.agents.ranking import top_k
+
+
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+# How signal age discounts risk: "buckets" (step weights at 7/30/90 days) or
+# "exponential" (continuous decay with the given half-life)
+RECENCY_MODES = ("buckets", "exponential")
+RECENCY_MODE = os.getenv("RISK_RECENCY_MODE", "buckets").lower()
+HALF_LIFE_DAYS = float(os.getenv("RISK_HALF_LIFE_DAYS", "30"))
+
+
+@dataclass
+class SignalBatch:
+    """
+    Columnar view of execution signals across many sites
+    
+    Each attribute is an array with one entry per signal, in a stable order.
+    Build with `from_signals` / `from_rows`, or directly from arrays.
+    """
+    site_ids: np.ndarray
+    signal_ids: np.ndarray
+    signal_types: np.ndarray
+    severities: np.ndarray
+    confidence_scores: np.ndarray
+    detected_dates: np.ndarray
+    resolved: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.signal_ids)
+    
+    @classmethod
+    def from_columns(
+        cls,
+        site_ids: Iterable[str],
+        signal_ids: Iterable[str],
+        signal_types: Iterable[str],
+        severities: Iterable[str],
+        confidence_scores: Iterable[float],
+        detected_dates: Iterable[datetime],
+        resolved: Iterable[bool]
+    ) -> "SignalBatch":
+        """Build a batch from parallel columns"""
+        return cls(
+            site_ids=np.asarray(list(site_ids), dtype=object),
+            signal_ids=np.asarray(list(signal_ids), dtype=object),
+            signal_types=np.asarray(list(signal_types), dtype=object),
+            severities=np.asarray(list(severities), dtype=object),
+            confidence_scores=np.asarray(list(confidence_scores), dtype=np.float64),
+            detected_dates=np.asarray(
+                [to_naive_utc(d) for d in detected_dates],
+                dtype="datetime64[us]"
+            ),
+            resolved=np.asarray(list(resolved), dtype=bool)
+        )
+    
+    @classmethod
+    def from_signals(cls, signals: Iterable[ExecutionSignal]) -> "SignalBatch":
+        """Build a batch from ExecutionSignal models"""
+        signals = list(signals)
+        return cls.from_columns(
+            site_ids=[s.site_id for s in signals],
+            signal_ids=[s.signal_id for s in signals],
+            signal_types=[s.signal_type for s in signals],
+            severities=[s.severity for s in signals],
+            confidence_scores=[s.confidence_score for s in signals],
+            detected_dates=[s.detected_date for s in signals],
+            resolved=[s.resolved for s in signals]
+        )
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "SignalBatch":
+        """Build a batch from `execution_signals` rows as returned by the database"""
+        rows = list(rows)
+        return cls.from_columns(
+            site_ids=[r["site_id"] for r in rows],
+            signal_ids=[r["signal_id"] for r in rows],
+            signal_types=[r["signal_type"] for r in rows],
+            severities=[r["severity"] for r in rows],
+            confidence_scores=[r["confidence_score"] for r in rows],
+            detected_dates=[
+                datetime.fromisoformat(r["detected_date"])
+                if isinstance(r["detected_date"], str) else r["detected_date"]
+                for r in rows
+            ],
+            resolved=[bool(r.get("resolved")) for r in rows]
+        )
 
 
 class RiskScorerAgent:
@@ -14,6 +108,11 @@ class RiskScorerAgent:
     
     Uses rule-based scoring to ensure explainability and consistency.
     No ML in Phase 0 - pure logic.
+    
+    In exponential recency mode every signal's weight halves each
+    `half_life_days`, so a whole score decays by one common factor over
+    time: a stored score can be aged to any later moment from its
+    breakdown and calculated_date alone (see `age_score`).
     """
     
     # Severity weights (how much each severity contributes to risk)
@@ -24,6 +123,28 @@ class RiskScorerAgent:
         "low": 3.0
     }
     
+    def __init__(self, recency_mode: Optional[str] = None, half_life_days: Optional[float] = None):
+        """
+        Initialize the scorer
+        
+        Args:
+            recency_mode: "buckets" or "exponential" (defaults to RISK_RECENCY_MODE)
+            half_life_days: Half-life of a signal's weight in exponential mode
+                (defaults to RISK_HALF_LIFE_DAYS)
+        """
+        self.recency_mode = (recency_mode or RECENCY_MODE).lower()
+        if self.recency_mode not in RECENCY_MODES:
+            raise ValueError(f"Unknown recency mode {self.recency_mode!r}, expected one of {RECENCY_MODES}")
+        
+        self.half_life_days = HALF_LIFE_DAYS if half_life_days is None else float(half_life_days)
+        if self.half_life_days <= 0:
+            raise ValueError("half_life_days must be positive")
+    
+    @property
+    def exponential(self) -> bool:
+        """True when signal weights decay exponentially with age"""
+        return self.recency_mode == "exponential"
+    
     # Recency multiplier (newer signals weighted more heavily)
     def _get_recency_multiplier(self, signal_age_days: int) -> float:
         """Calculate recency multiplier based on signal age"""
@@ -36,11 +157,80 @@ class RiskScorerAgent:
         else:
             return 0.2  # 20% weight for older signals
     
+    def _signal_score(self, signal: ExecutionSignal, now: datetime) -> float:
+        """Risk contribution of a single signal at time `now`"""
+        # Base score from severity
+        base_score = self.SEVERITY_WEIGHTS.get(signal.severity, 0.0)
+        
+        # Apply confidence score
+        confidence_adjusted = base_score * signal.confidence_score
+        
+        # Apply recency decay
+        age = now - to_naive_utc(signal.detected_date)
+        if self.exponential:
+            recency_multiplier = self._decay_factor(age / timedelta(days=1))
+        else:
+            recency_multiplier = self._get_recency_multiplier(age.days)
+        
+        return confidence_adjusted * recency_multiplier
+    
+    def _decay_factor(self, elapsed_days: float) -> float:
+        """Exponential weight after `elapsed_days` (signals dated in the future keep full weight)"""
+        return 0.5 ** (max(elapsed_days, 0.0) / self.half_life_days)
+    
+    def _recency_metadata(self) -> dict:
+        """Decay parameters stored with exponential-mode scores"""
+        if not self.exponential:
+            return {}
+        return {"recency": "exponential", "half_life_days": self.half_life_days}
+    
+    def _decay_key(self, total_score: float, calculated_date: datetime) -> Optional[float]:
+        """
+        Time-invariant ranking key of an exponential-mode score
+        
+        log2 of the uncapped score plus the calculation time in half-lives
+        since the epoch. It does not change as the score ages, so sites rank
+        by current risk in `decay_key` order at any moment, and the uncapped
+        score at time t is 2 ** (decay_key - t / half_life) with t in days
+        since the epoch. None in bucketed mode and for zero scores.
+        """
+        if not self.exponential or total_score <= 0:
+            return None
+        return math.log2(total_score) + self._epoch_half_lives(calculated_date)
+    
+    def _epoch_half_lives(self, value: datetime) -> float:
+        """Half-lives elapsed between the epoch and `value`"""
+        return (to_naive_utc(value) - datetime(1970, 1, 1)) / timedelta(days=self.half_life_days)
+    
+    def decay_key_threshold(self, min_score: float, now: Optional[datetime] = None) -> Optional[float]:
+        """
+        Lowest `decay_key` whose score aged to `now` is at least `min_score`
+        
+        Lets a query filter current risk on the stored key instead of on
+        stored scores, which are only as fresh as their last write.
+        
+        Returns:
+            The key threshold, or None when every score qualifies (min_score <= 0)
+        """
+        if min_score <= 0:
+            return None
+        return math.log2(min_score) + self._epoch_half_lives(now or datetime.utcnow())
+    
+    def _get_recency_multipliers(self, signal_ages_days: np.ndarray) -> np.ndarray:
+        """Vectorized `_get_recency_multiplier` over an array of ages in days"""
+        return np.select(
+            [signal_ages_days <= 7, signal_ages_days <= 30, signal_ages_days <= 90],
+            [1.0, 0.7, 0.4],
+            default=0.2
+        )
+    
+    @timed("scoring")
     def calculate_site_risk(
         self,
         site_id: str,
         signals: list[ExecutionSignal],
-        previous_score: Optional[RiskScore] = None
+        previous_score: Optional[RiskScore] = None,
+        now: Optional[datetime] = None
     ) -> RiskScore:
         """
         Calculate risk score for a site based on execution signals
@@ -49,11 +239,12 @@ class RiskScorerAgent:
             site_id: Site identifier
             signals: List of execution signals for this site
             previous_score: Previous risk score for trend calculation
+            now: Scoring time (defaults to current UTC time)
             
         Returns:
             RiskScore object with detailed breakdown
         """
-        now = datetime.utcnow()
+        now = to_naive_utc(now or datetime.utcnow())
         
         # Filter to unresolved signals only
         active_signals = [s for s in signals if not s.resolved]
@@ -61,23 +252,18 @@ class RiskScorerAgent:
         # Calculate total risk score
         total_score = 0.0
         breakdown_by_type = defaultdict(float)
+        severity_counts = defaultdict(int)
         
         for signal in active_signals:
-            # Base score from severity
-            base_score = self.SEVERITY_WEIGHTS.get(signal.severity, 0.0)
-            
-            # Apply confidence score
-            confidence_adjusted = base_score * signal.confidence_score
-            
-            # Apply recency decay
-            signal_age = (now - signal.detected_date).days
-            recency_multiplier = self._get_recency_multiplier(signal_age)
+            severity_counts[signal.severity] += 1
             
-            final_score = confidence_adjusted * recency_multiplier
+            final_score = self._signal_score(signal, now)
             
             total_score += final_score
             breakdown_by_type[signal.signal_type] += final_score
         
+        uncapped_score = total_score
+        
         # Cap at 100
         total_score = min(total_score, 100.0)
         
@@ -85,9 +271,9 @@ class RiskScorerAgent:
         trend = self._calculate_trend(total_score, previous_score)
         
         # Generate explanation
-        explanation = self._generate_explanation(
+        explanation = self._build_explanation(
             total_score,
-            active_signals,
+            severity_counts,
             breakdown_by_type
         )
         
@@ -103,13 +289,310 @@ class RiskScorerAgent:
             breakdown=dict(breakdown_by_type),
             metadata={
                 "total_signals": len(active_signals),
-                "critical_signals": len([s for s in active_signals if s.severity == "critical"]),
-                "high_signals": len([s for s in active_signals if s.severity == "high"])
-            }
+                "critical_signals": severity_counts["critical"],
+                "high_signals": severity_counts["high"],
+                "medium_signals": severity_counts["medium"],
+                "low_signals": severity_counts["low"],
+                **self._recency_metadata()
+            },
+            decay_key=self._decay_key(uncapped_score, now)
         )
         
         return risk_score
     
+    @timed("scoring")
+    def apply_signal_delta(
+        self,
+        site_id: str,
+        previous_score: Optional[RiskScore],
+        added: Iterable[ExecutionSignal] = (),
+        resolved: Iterable[ExecutionSignal] = (),
+        now: Optional[datetime] = None
+    ) -> RiskScore:
+        """
+        Update a site's risk score incrementally from signal changes
+        
+        Adjusts the previous score's per-type breakdown (which holds the
+        uncapped contributions) by the delta of each added or resolved signal
+        instead of rescoring every signal for the site. Added signals
+        contribute at `now`; resolved signals are removed at the value they
+        had when the previous score was calculated. Resolved signals are
+        applied first, so a signal passed in both lists is replaced (e.g. on
+        a severity change). In exponential mode the previous breakdown is
+        first aged to `now`, so the result is exact; with bucketed recency,
+        aging between updates is picked up by the next full rescore.
+        
+        Args:
+            site_id: Site identifier
+            previous_score: Current risk score for the site, if any
+            added: Newly detected signals
+            resolved: Signals that have just been resolved
+            now: Scoring time (defaults to current UTC time)
+            
+        Returns:
+            New RiskScore reflecting the changes
+        """
+        now = to_naive_utc(now or datetime.utcnow())
+        
+        breakdown_by_type = defaultdict(float)
+        contributing = []
+        metadata = {}
+        reference_time = now
+        if previous_score is not None:
+            breakdown_by_type.update(previous_score.breakdown)
+            contributing = list(previous_score.contributing_signals)
+            metadata = previous_score.metadata
+            reference_time = to_naive_utc(previous_score.calculated_date)
+            
+            if self._can_age(previous_score):
+                factor = self._decay_factor((now - reference_time) / timedelta(days=1))
+                breakdown_by_type = defaultdict(float, {
+                    signal_type: value * factor
+                    for signal_type, value in breakdown_by_type.items()
+                })
+                reference_time = now
+        
+        severity_counts = defaultdict(int, {
+            severity: metadata.get(f"{severity}_signals", 0)
+            for severity in self.SEVERITY_WEIGHTS
+        })
+        total_signals = metadata.get("total_signals", len(contributing))
+        present = set(contributing)
+        
+        removed = set()
+        for signal in resolved:
+            if signal.signal_id not in present:
+                continue
+            
+            remaining = breakdown_by_type[signal.signal_type] - self._signal_score(signal, reference_time)
+            if remaining > 1e-9:
+                breakdown_by_type[signal.signal_type] = remaining
+            else:
+                breakdown_by_type.pop(signal.signal_type)
+            severity_counts[signal.severity] = max(severity_counts[signal.severity] - 1, 0)
+            total_signals = max(total_signals - 1, 0)
+            present.discard(signal.signal_id)
+            removed.add(signal.signal_id)
+        
+        if removed:
+            contributing = [signal_id for signal_id in contributing if signal_id not in removed]
+        
+        for signal in added:
+            if signal.resolved or signal.signal_id in present:
+                continue
+            
+            breakdown_by_type[signal.signal_type] += self._signal_score(signal, now)
+            severity_counts[signal.severity] += 1
+            total_signals += 1
+            contributing.append(signal.signal_id)
+            present.add(signal.signal_id)
+        
+        # Breakdown values are uncapped, so their sum is the running total
+        uncapped_score = sum(breakdown_by_type.values())
+        total_score = min(uncapped_score, 100.0)
+        
+        return RiskScore(
+            risk_score_id=str(uuid.uuid4()),
+            site_id=site_id,
+            score=round(total_score, 2),
+            calculated_date=now,
+            contributing_signals=contributing,
+            explanation=self._build_explanation(
+                total_score,
+                severity_counts,
+                breakdown_by_type,
+                total_signals
+            ),
+            trend=self._calculate_trend(total_score, previous_score),
+            breakdown=dict(breakdown_by_type),
+            metadata={
+                "total_signals": total_signals,
+                "critical_signals": severity_counts["critical"],
+                "high_signals": severity_counts["high"],
+                "medium_signals": severity_counts["medium"],
+                "low_signals": severity_counts["low"],
+                "update": "incremental",
+                **self._recency_metadata()
+            },
+            decay_key=self._decay_key(uncapped_score, now)
+        )
+    
+    def _can_age(self, risk_score: RiskScore) -> bool:
+        """True if the score was calculated with this scorer's exponential decay"""
+        return (
+            self.exponential
+            and risk_score.metadata.get("recency") == "exponential"
+            and risk_score.metadata.get("half_life_days") == self.half_life_days
+        )
+    
+    def age_score(self, risk_score: RiskScore, now: Optional[datetime] = None) -> RiskScore:
+        """
+        Project an exponential-mode score forward to `now` without its signals
+        
+        Every contribution decays by the same factor, so the per-type
+        breakdown (which holds the uncapped contributions) is scaled by
+        0.5 ** (elapsed days / half-life) and the score re-capped. This is
+        the score a full rescore at `now` would produce if no signals changed.
+        The result is a read-time view of the stored score: it keeps its ID,
+        trend and `decay_key`, and is never written back. Scores from
+        bucketed mode, or with a different half-life, cannot be aged this way
+        and are returned unchanged.
+        
+        Args:
+            risk_score: Stored score to age
+            now: Target time (defaults to current UTC time)
+            
+        Returns:
+            Copy of the score as of `now`
+        """
+        if not self._can_age(risk_score):
+            return risk_score
+        
+        now = to_naive_utc(now or datetime.utcnow())
+        calculated = to_naive_utc(risk_score.calculated_date)
+        if now <= calculated:
+            return risk_score
+        factor = self._decay_factor((now - calculated) / timedelta(days=1))
+        
+        breakdown = {signal_type: value * factor for signal_type, value in risk_score.breakdown.items()}
+        total_score = min(sum(breakdown.values()), 100.0)
+        metadata = risk_score.metadata
+        severity_counts = {
+            severity: metadata.get(f"{severity}_signals", 0)
+            for severity in self.SEVERITY_WEIGHTS
+        }
+        
+        return risk_score.model_copy(update={
+            "score": round(total_score, 2),
+            "calculated_date": now,
+            "explanation": self._build_explanation(
+                total_score,
+                severity_counts,
+                breakdown,
+                metadata.get("total_signals", len(risk_score.contributing_signals))
+            ),
+            "breakdown": breakdown,
+            "metadata": {**metadata, "aged_from": calculated.isoformat()}
+        })
+    
+    @timed("scoring")
+    def calculate_portfolio_risk(
+        self,
+        batch: SignalBatch,
+        previous_scores: Optional[dict[str, RiskScore]] = None,
+        site_ids: Optional[Iterable[str]] = None,
+        now: Optional[datetime] = None
+    ) -> dict[str, RiskScore]:
+        """
+        Calculate risk scores for many sites in one vectorized pass
+        
+        Produces the same scores, breakdowns, explanations and trends as
+        calling `calculate_site_risk` for each site with its signals in
+        batch order.
+        
+        Args:
+            batch: Columnar signals for all sites being scored
+            previous_scores: Previous risk score per site for trend calculation
+            site_ids: Sites to score even if they have no signals in the batch
+            now: Scoring time (defaults to current UTC time)
+        
+        Returns:
+            RiskScore per site, keyed by site ID
+        """
+        now = to_naive_utc(now or datetime.utcnow())
+        previous_scores = previous_scores or {}
+        
+        # Keep unresolved signals only, preserving batch order
+        active = ~batch.resolved
+        sites = batch.site_ids[active]
+        signal_ids = batch.signal_ids[active]
+        types = batch.signal_types[active]
+        severities = batch.severities[active]
+        
+        # Per-signal contribution: severity weight x confidence x recency
+        base_scores = np.array(
+            [self.SEVERITY_WEIGHTS.get(sev, 0.0) for sev in severities],
+            dtype=np.float64
+        )
+        age_us = (np.datetime64(now, "us") - batch.detected_dates[active]).astype(np.int64)
+        if self.exponential:
+            recency = 0.5 ** (np.maximum(age_us, 0) / MICROSECONDS_PER_DAY / self.half_life_days)
+        else:
+            recency = self._get_recency_multipliers(age_us // MICROSECONDS_PER_DAY)
+        final_scores = (base_scores * batch.confidence_scores[active]) * recency
+        
+        # Encode sites and signal types as dense integer codes
+        all_sites = list(dict.fromkeys(list(batch.site_ids) + list(site_ids or [])))
+        site_index = {site_id: i for i, site_id in enumerate(all_sites)}
+        site_codes = np.array([site_index[s] for s in sites], dtype=np.int64)
+        type_names, type_codes = np.unique(types.astype(str), return_inverse=True)
+        type_codes = type_codes.astype(np.int64)
+        n_sites = len(all_sites)
+        n_types = len(type_names)
+        
+        # Totals and per-type breakdowns (bincount sums in batch order)
+        totals = np.bincount(site_codes, weights=final_scores, minlength=n_sites)
+        pair_codes = site_codes * n_types + type_codes
+        pair_scores = np.bincount(pair_codes, weights=final_scores, minlength=n_sites * n_types)
+        
+        # Severity counts
+        severity_names = list(self.SEVERITY_WEIGHTS.keys())
+        severity_counts = {
+            severity: np.bincount(site_codes[severities == severity], minlength=n_sites)
+            for severity in severity_names
+        }
+        signal_counts = np.bincount(site_codes, minlength=n_sites)
+        
+        # Breakdown keys in first-seen order per site (matches dict insertion order)
+        unique_pairs, first_seen = np.unique(pair_codes, return_index=True)
+        pair_order = np.lexsort((first_seen, unique_pairs // max(n_types, 1)))
+        breakdowns: list[dict] = [{} for _ in range(n_sites)]
+        for pair in unique_pairs[pair_order]:
+            site_code, type_code = divmod(int(pair), n_types)
+            breakdowns[site_code][str(type_names[type_code])] = float(pair_scores[pair])
+        
+        # Contributing signals grouped by site in batch order
+        site_order = np.argsort(site_codes, kind="stable")
+        boundaries = np.cumsum(signal_counts)[:-1] if n_sites else []
+        contributing = np.split(signal_ids[site_order], boundaries)
+        
+        capped = np.minimum(totals, 100.0)
+        
+        results = {}
+        for code, site_id in enumerate(all_sites):
+            total_score = float(capped[code])
+            counts = {
+                severity: int(severity_counts[severity][code])
+                for severity in severity_names
+            }
+            
+            results[site_id] = RiskScore(
+                risk_score_id=str(uuid.uuid4()),
+                site_id=site_id,
+                score=round(total_score, 2),
+                calculated_date=now,
+                contributing_signals=[str(s) for s in contributing[code]],
+                explanation=self._build_explanation(
+                    total_score,
+                    counts,
+                    breakdowns[code],
+                    int(signal_counts[code])
+                ),
+                trend=self._calculate_trend(total_score, previous_scores.get(site_id)),
+                breakdown=breakdowns[code],
+                metadata={
+                    "total_signals": int(signal_counts[code]),
+                    "critical_signals": counts["critical"],
+                    "high_signals": counts["high"],
+                    "medium_signals": counts["medium"],
+                    "low_signals": counts["low"],
+                    **self._recency_metadata()
+                },
+                decay_key=self._decay_key(float(totals[code]), now)
+            )
+        
+        return results
+    
     def _calculate_trend(
         self,
         current_score: float,
@@ -135,14 +618,31 @@ class RiskScorerAgent:
         breakdown: dict
     ) -> str:
         """Generate human-readable explanation of risk score"""
-        if not signals:
+        severity_counts = defaultdict(int)
+        for signal in signals:
+            severity_counts[signal.severity] += 1
+        
+        return self._build_explanation(score, severity_counts, breakdown, len(signals))
+    
+    def _build_explanation(
+        self,
+        score: float,
+        severity_counts: dict,
+        breakdown: dict,
+        signal_count: Optional[int] = None
+    ) -> str:
+        """Generate human-readable explanation from severity counts and breakdown"""
+        if signal_count is None:
+            signal_count = sum(severity_counts.values())
+        
+        if not signal_count:
             return "No active execution signals. Site is performing well."
         
         # Count by severity
-        critical_count = len([s for s in signals if s.severity == "critical"])
-        high_count = len([s for s in signals if s.severity == "high"])
-        medium_count = len([s for s in signals if s.severity == "medium"])
-        low_count = len([s for s in signals if s.severity == "low"])
+        critical_count = severity_counts.get("critical", 0)
+        high_count = severity_counts.get("high", 0)
+        medium_count = severity_counts.get("medium", 0)
+        low_count = severity_counts.get("low", 0)
         
         # Build explanation
         parts = []
@@ -159,7 +659,7 @@ class RiskScorerAgent:
         severity_text = ", ".join(parts)
         
         # Top contributing signal types
-        top_types = sorted(breakdown.items(), key=lambda x: x[1], reverse=True)[:3]
+        top_types = top_k(breakdown.items(), 3, key=lambda x: x[1])
         type_text = ", ".join([t.replace("_", " ") for t, _ in top_types])
         
         explanation = f"Site shows elevated risk (score: {score:.1f}) due to {severity_text}. "
@@ -167,14 +667,19 @@ class RiskScorerAgent:
         
         return explanation
     
-    def rank_sites(self, risk_scores: list[RiskScore]) -> list[RiskScore]:
+    def rank_sites(self, risk_scores: Iterable[RiskScore], limit: Optional[int] = None) -> list[RiskScore]:
         """
         Rank sites by risk score (highest first)
         
+        With a limit, only the top `limit` scores are kept while scanning
+        (a bounded heap), so ranking a large portfolio for a short list does
+        not sort every site. Equal scores keep their input order.
+        
         Args:
-            risk_scores: List of RiskScore objects
+            risk_scores: RiskScore objects (any iterable)
+            limit: Number of top sites to return (None ranks all)
             
         Returns:
             Sorted list of RiskScore objects
         """
-        return sorted(risk_scores, key=lambda x: x.score, reverse=True)
+        return top_k(risk_scores, limit, key=lambda x: x.score)
@@ -1,12 +1,47 @@
 """Signal Extraction Agent using Pydantic AI"""
 
+import asyncio
 import os
+import time
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional, Union
+import numpy as np
 from pydantic_ai import Agent
 from pydantic import BaseModel, Field
 
-from backend.models import ExecutionSignal
+from backend.models import ExecutionSignal, Inspection, WorkOrder
+from backend.agents.extraction_cache import ExtractionCache
+from backend.agents.note_prefilter import NotePrefilter
+from backend.agents.llm_replay import LLMReplayStore, ReplayMissError
+from backend.observability import LLM_IN_FLIGHT, record_llm_call, timed
+from backend.timeutils import to_naive_utc
+
+
+# Bump whenever the system prompt or result schema changes so cached
+# extractions from the old prompt are not reused
+SYSTEM_PROMPT_VERSION = "1"
+
+# Batched extraction limits: notes per model request and the approximate
+# prompt token budget for the packed notes
+BATCH_MAX_NOTES = int(os.getenv("EXTRACTION_BATCH_MAX_NOTES", "10"))
+BATCH_TOKEN_BUDGET = int(os.getenv("EXTRACTION_BATCH_TOKEN_BUDGET", "6000"))
+
+# Skip the model for notes the rule-based pre-filter classifies as clean
+PREFILTER_ENABLED = os.getenv("EXTRACTION_PREFILTER", "true").lower() in ("1", "true", "yes")
+
+# Days past due at which a late work order escalates to medium / high severity
+LATE_MEDIUM_DAYS = 3
+LATE_HIGH_DAYS = 7
+
+
+def late_severity(days_late: int) -> str:
+    """Severity of a late work order signal"""
+    if days_late >= LATE_HIGH_DAYS:
+        return "high"
+    if days_late >= LATE_MEDIUM_DAYS:
+        return "medium"
+    return "low"
 
 
 class ExtractedSignal(BaseModel):
@@ -27,18 +62,68 @@ class SignalExtractionResult(BaseModel):
     processing_notes: Optional[str] = None
 
 
+# Result used for notes the pre-filter lets skip the model
+SKIPPED_RESULT = SignalExtractionResult(
+    signals=[],
+    processing_notes="Skipped by local pre-filter: no execution issues detected"
+)
+
+
+class NoteExtractionResult(BaseModel):
+    """Signals extracted from one note of a batched request"""
+    note_id: int = Field(..., description="ID of the note these signals were extracted from")
+    signals: list[ExtractedSignal]
+
+
+class BatchSignalExtractionResult(BaseModel):
+    """Result from batched signal extraction (one entry per note)"""
+    notes: list[NoteExtractionResult]
+    processing_notes: Optional[str] = None
+
+
 class SignalExtractorAgent:
     """
     Pydantic AI agent for extracting execution signals from inspection notes and work orders
     """
     
-    def __init__(self, model: str = "openai:gpt-4o"):
-        """Initialize the signal extractor agent"""
+    def __init__(
+        self,
+        model: str = "openai:gpt-4o",
+        cache: Optional[ExtractionCache] = None,
+        prefilter: Optional[NotePrefilter] = None,
+        replay: Optional[LLMReplayStore] = None
+    ):
+        """
+        Initialize the signal extractor agent
+        
+        Args:
+            model: Pydantic AI model name
+            cache: Extraction result cache (defaults to EXTRACTION_CACHE_* settings)
+            prefilter: Clean-note classifier (defaults to EXTRACTION_PREFILTER setting)
+            replay: Record/replay store for model calls (defaults to LLM_REPLAY_* settings)
+        """
+        self.model = model
+        self.cache = cache if cache is not None else ExtractionCache.from_env()
+        if prefilter is None and PREFILTER_ENABLED:
+            prefilter = NotePrefilter()
+        self.prefilter = prefilter
+        self.replay = replay if replay is not None else LLMReplayStore.from_env()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        
+        # Replay never calls the model, so no provider client (or API key) is needed
+        agent_model = None if self._replaying else model
         self.agent = Agent(
-            model=model,
+            model=agent_model,
             result_type=SignalExtractionResult,
             system_prompt=self._get_system_prompt()
         )
+        self.batch_agent = Agent(
+            model=agent_model,
+            result_type=BatchSignalExtractionResult,
+            system_prompt=self._get_system_prompt() + self._get_batch_instructions()
+        )
+        self.max_batch_notes = max(1, BATCH_MAX_NOTES)
+        self.batch_token_budget = BATCH_TOKEN_BUDGET
     
     def _get_system_prompt(self) -> str:
         """Get the system prompt for signal extraction"""
@@ -72,6 +157,14 @@ class SignalExtractorAgent:
 
 **Important:** Do not invent information. Only extract signals clearly supported by the text."""
 
+    def _get_batch_instructions(self) -> str:
+        """Extra system prompt instructions for multi-note requests"""
+        return """
+
+**Batched Notes:**
+You may receive several inspection notes in one request, each wrapped in a <note id="N"> tag. Analyze every note independently and return exactly one entry per note with its note_id, even when a note has no signals. Evidence quotes must come from the note they are attributed to."""
+
+    @timed("extraction")
     async def extract_from_inspection(
         self,
         inspection_id: str,
@@ -89,18 +182,190 @@ class SignalExtractorAgent:
         Returns:
             List of ExecutionSignal objects
         """
-        user_prompt = f"""Analyze the following facilities inspection note and extract execution signals.
+        result = await self._extract_notes(notes)
+        return self._build_inspection_signals(result, inspection_id, site_id)
+    
+    @timed("extraction")
+    async def extract_from_inspections(
+        self,
+        inspections: list[Inspection],
+        return_exceptions: bool = False,
+        request_slots: Optional[asyncio.Semaphore] = None
+    ) -> list[Union[list[ExecutionSignal], Exception]]:
+        """
+        Extract execution signals from many inspections with batched requests
+        
+        Notes are packed into multi-note requests (bounded by note count and
+        an approximate token budget) so the system prompt is paid once per
+        request. A request that fails or returns incomplete attribution is
+        split in half and retried, down to single-note requests.
+        
+        Args:
+            inspections: Inspections to analyze
+            return_exceptions: Return per-inspection errors instead of raising
+            request_slots: Held for the duration of each model request, to
+                bound concurrent requests across packs and their retries
+            
+        Returns:
+            Signals (or the error) for each inspection, in input order
+        """
+        results: list = [None] * len(inspections)
+        
+        # Skip clean notes, serve cached ones and collapse identical notes to one slot
+        keys: dict[int, str] = {}
+        for idx, inspection in enumerate(inspections):
+            if self._skip_note(inspection.notes):
+                results[idx] = SKIPPED_RESULT
+            else:
+                keys[idx] = ExtractionCache.make_key(inspection.notes, self.model, SYSTEM_PROMPT_VERSION)
+        
+        cached = await self.cache.get_many(list(keys.values())) if self.cache is not None else {}
+        pending: dict[str, list[int]] = {}
+        for idx, cache_key in keys.items():
+            if cache_key in cached:
+                results[idx] = SignalExtractionResult.model_validate_json(cached[cache_key])
+            else:
+                pending.setdefault(cache_key, []).append(idx)
+        
+        cache_keys = list(pending)
+        notes = [inspections[pending[key][0]].notes for key in cache_keys]
+        packs = self._pack_notes(notes)
+        
+        pack_results = await asyncio.gather(*[
+            self._extract_batch([notes[i] for i in pack], request_slots) for pack in packs
+        ])
+        
+        extracted_json = {}
+        for pack, extracted in zip(packs, pack_results):
+            for note_idx, result in zip(pack, extracted):
+                cache_key = cache_keys[note_idx]
+                if not isinstance(result, Exception):
+                    extracted_json[cache_key] = result.model_dump_json()
+                for idx in pending[cache_key]:
+                    results[idx] = result
+        if self.cache is not None:
+            await self.cache.set_many(extracted_json)
+        
+        output = []
+        for inspection, result in zip(inspections, results):
+            if isinstance(result, Exception):
+                if not return_exceptions:
+                    raise result
+                output.append(result)
+            else:
+                output.append(self._build_inspection_signals(
+                    result,
+                    inspection.inspection_id,
+                    inspection.site_id
+                ))
+        
+        return output
+    
+    def _skip_note(self, notes: str) -> bool:
+        """True when the pre-filter classifies the note as clearly clean"""
+        return self.prefilter is not None and self.prefilter.should_skip(notes)
+    
+    def _estimate_tokens(self, text: str) -> int:
+        """Rough token count (about four characters per token plus tag overhead)"""
+        return len(text) // 4 + 16
+    
+    def _pack_notes(self, notes: list[str]) -> list[list[int]]:
+        """Greedily group note indexes into requests within the batch limits"""
+        packs = []
+        current = []
+        current_tokens = 0
+        
+        for idx, note in enumerate(notes):
+            tokens = self._estimate_tokens(note)
+            if current and (
+                len(current) >= self.max_batch_notes
+                or current_tokens + tokens > self.batch_token_budget
+            ):
+                packs.append(current)
+                current = []
+                current_tokens = 0
+            current.append(idx)
+            current_tokens += tokens
+        
+        if current:
+            packs.append(current)
+        
+        return packs
+    
+    async def _extract_batch(
+        self,
+        notes: list[str],
+        request_slots: Optional[asyncio.Semaphore] = None
+    ) -> list[Union[SignalExtractionResult, Exception]]:
+        """Extract a pack of notes, splitting it in half whenever a request fails"""
+        if len(notes) == 1:
+            try:
+                return [await self._run_model(notes[0], request_slots)]
+            except Exception as e:
+                return [e]
+        
+        try:
+            return await self._run_batch_model(notes, request_slots)
+        except ReplayMissError:
+            # This grouping was never recorded; recordings are also kept per
+            # note, so look each note up on its own instead
+            per_note = await asyncio.gather(*[
+                self._extract_batch([note], request_slots) for note in notes
+            ])
+            return [result for results in per_note for result in results]
+        except Exception:
+            mid = len(notes) // 2
+            left, right = await asyncio.gather(
+                self._extract_batch(notes[:mid], request_slots),
+                self._extract_batch(notes[mid:], request_slots)
+            )
+            return left + right
+    
+    async def _run_batch_model(
+        self,
+        notes: list[str],
+        request_slots: Optional[asyncio.Semaphore] = None
+    ) -> list[SignalExtractionResult]:
+        """Call the model once for several notes and attribute results to each"""
+        packed_notes = "\n\n".join(
+            f'<note id="{idx}">\n{note}\n</note>' for idx, note in enumerate(notes)
+        )
+        user_prompt = f"""Analyze each of the following {len(notes)} facilities inspection notes independently and extract execution signals.
 
-**Inspection Note:**
-{notes}
+{packed_notes}
 
-Extract all execution signals with their severity, confidence, evidence, and explanation."""
+Return one entry per note_id with all execution signals for that note, including their severity, confidence, evidence, and explanation."""
 
-        result = await self.agent.run(user_prompt)
+        result = await self._call_model(
+            self.batch_agent,
+            user_prompt,
+            "batch",
+            request_slots,
+            parts=lambda data: list(zip(map(self._note_prompt, notes), self._attribute(notes, data)))
+        )
+        return self._attribute(notes, result.data)
+    
+    def _attribute(self, notes: list[str], data: BatchSignalExtractionResult) -> list[SignalExtractionResult]:
+        """Split a batched result into one result per note, in note order"""
+        by_note = {entry.note_id: entry for entry in data.notes}
+        missing = [idx for idx in range(len(notes)) if idx not in by_note]
+        if missing:
+            raise ValueError(f"Batched extraction returned no result for notes {missing}")
         
-        # Convert extracted signals to ExecutionSignal models
+        return [
+            SignalExtractionResult(signals=by_note[idx].signals)
+            for idx in range(len(notes))
+        ]
+    
+    def _build_inspection_signals(
+        self,
+        result: SignalExtractionResult,
+        inspection_id: str,
+        site_id: str
+    ) -> list[ExecutionSignal]:
+        """Convert extracted signals to ExecutionSignal models"""
         signals = []
-        for idx, extracted in enumerate(result.data.signals):
+        for idx, extracted in enumerate(result.signals):
             signal = ExecutionSignal(
                 signal_id=f"{inspection_id}_sig_{idx}",
                 site_id=site_id,
@@ -121,6 +386,113 @@ Extract all execution signals with their severity, confidence, evidence, and exp
         
         return signals
     
+    async def _extract_notes(self, notes: str) -> SignalExtractionResult:
+        """Run the model on one note, serving repeated notes from the cache"""
+        if self._skip_note(notes):
+            return SKIPPED_RESULT
+        
+        if self.cache is None:
+            return await self._run_model(notes)
+        
+        cache_key = ExtractionCache.make_key(notes, self.model, SYSTEM_PROMPT_VERSION)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            return SignalExtractionResult.model_validate_json(cached)
+        
+        # Identical notes already being extracted share the in-flight call
+        pending = self._in_flight.get(cache_key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        
+        pending = asyncio.ensure_future(self._run_model(notes))
+        self._in_flight[cache_key] = pending
+        try:
+            result = await asyncio.shield(pending)
+        finally:
+            self._in_flight.pop(cache_key, None)
+        
+        await self.cache.set(cache_key, result.model_dump_json())
+        return result
+    
+    async def _run_model(self, notes: str, request_slots: Optional[asyncio.Semaphore] = None) -> SignalExtractionResult:
+        """Call the model for one inspection note"""
+        result = await self._call_model(self.agent, self._note_prompt(notes), "single", request_slots)
+        return result.data
+    
+    def _note_prompt(self, notes: str) -> str:
+        """User prompt for a single-note request"""
+        return f"""Analyze the following facilities inspection note and extract execution signals.
+
+**Inspection Note:**
+{notes}
+
+Extract all execution signals with their severity, confidence, evidence, and explanation."""
+    
+    @property
+    def _replaying(self) -> bool:
+        return self.replay is not None and self.replay.mode == "replay"
+    
+    async def _call_model(
+        self,
+        agent: Agent,
+        user_prompt: str,
+        mode: str,
+        request_slots: Optional[asyncio.Semaphore] = None,
+        parts: Optional[Callable[[BaseModel], list[tuple[str, BaseModel]]]] = None
+    ):
+        """
+        Run a model request, recording its latency and token usage
+        
+        With a replay store, results are saved after each call (record mode)
+        or served from the store instead of calling the model (replay mode).
+        `request_slots`, if given, is held only while the request is in
+        flight, so latency excludes time spent waiting for a slot. `parts`
+        maps a batched result to the equivalent single-note (prompt, result)
+        pairs, which are recorded too so replay does not depend on packing.
+        """
+        replay_key = None
+        if self.replay is not None:
+            replay_key = LLMReplayStore.make_key(self.model, SYSTEM_PROMPT_VERSION, mode, user_prompt)
+        
+        async with request_slots or nullcontext():
+            start = time.perf_counter()
+            LLM_IN_FLIGHT.inc()
+            try:
+                if self._replaying:
+                    result_type = BatchSignalExtractionResult if mode == "batch" else SignalExtractionResult
+                    result = await self.replay.replay(replay_key, result_type)
+                else:
+                    result = await agent.run(user_prompt)
+            except Exception:
+                record_llm_call(mode, time.perf_counter() - start, failed=True)
+                raise
+            finally:
+                LLM_IN_FLIGHT.dec()
+            elapsed = time.perf_counter() - start
+        
+        record_llm_call(mode, elapsed, result.cost(), replayed=self._replaying)
+        if replay_key is not None and not self._replaying:
+            await self.replay.record(replay_key, user_prompt, result, elapsed * 1000)
+            if parts is not None:
+                await self._record_parts(parts, result.data, elapsed * 1000)
+        return result
+    
+    async def _record_parts(self, parts: Callable, data: BaseModel, latency_ms: float):
+        """Record each note of a batched result under its single-note key"""
+        try:
+            split = parts(data)
+        except ValueError:
+            # Incomplete attribution; the pack is split and retried
+            return
+        await self.replay.record_parts(
+            [
+                (LLMReplayStore.make_key(self.model, SYSTEM_PROMPT_VERSION, "single", prompt), prompt, result)
+                for prompt, result in split
+            ],
+            latency_ms
+        )
+    
+    @timed("work_order_rules")
     async def extract_from_work_order(
         self,
         work_order_id: str,
@@ -144,37 +516,85 @@ Extract all execution signals with their severity, confidence, evidence, and exp
         Returns:
             List of ExecutionSignal objects
         """
+        now = datetime.utcnow()
         signals = []
         
         # Rule-based detection for late work orders
-        if status != "completed" and datetime.utcnow() > due_date:
-            days_late = (datetime.utcnow() - due_date).days
-            
-            # Determine severity based on how late
-            if days_late >= 7:
-                severity = "high"
-            elif days_late >= 3:
-                severity = "medium"
-            else:
-                severity = "low"
+        if status != "completed" and now > to_naive_utc(due_date):
+            days_late = (now - to_naive_utc(due_date)).days
+            signals.append(self._late_work_order_signal(
+                work_order_id, site_id, due_date, days_late, late_severity(days_late), now
+            ))
+        
+        return signals
+    
+    @timed("work_order_rules")
+    def detect_late_work_orders(
+        self,
+        work_orders: list[WorkOrder],
+        now: Optional[datetime] = None
+    ) -> list[ExecutionSignal]:
+        """
+        Apply the late work order rule to a whole batch at once
+        
+        Every order is compared against the same reference time, so a bulk
+        sync classifies all of its orders consistently.
+        
+        Args:
+            work_orders: Work orders to check
+            now: Reference time (defaults to the current UTC time)
             
-            signal = ExecutionSignal(
-                signal_id=f"{work_order_id}_late",
-                site_id=site_id,
-                signal_type="late_work_order",
-                severity=severity,
-                detected_date=datetime.utcnow(),
-                confidence_score=1.0,  # Rule-based, high confidence
-                evidence={
-                    "work_order_id": work_order_id,
-                    "due_date": due_date.isoformat(),
-                    "days_late": days_late
-                },
-                explanation=f"Work order is {days_late} days past due date without completion",
-                source_type="work_order",
-                source_id=work_order_id,
-                resolved=False
-            )
-            signals.append(signal)
+        Returns:
+            One late_work_order signal per open order past its due date
+        """
+        if not work_orders:
+            return []
+        
+        now = to_naive_utc(now or datetime.utcnow())
+        now64 = np.datetime64(now, "us")
+        due = np.array([to_naive_utc(wo.due_date) for wo in work_orders], dtype="datetime64[us]")
+        is_open = np.array([wo.status != "completed" for wo in work_orders], dtype=bool)
+        
+        late_idx = np.flatnonzero(is_open & (due < now64))
+        days_late = (now64 - due[late_idx]) // np.timedelta64(1, "D")
+        severity = np.select(
+            [days_late >= LATE_HIGH_DAYS, days_late >= LATE_MEDIUM_DAYS],
+            ["high", "medium"],
+            default="low"
+        )
         
+        signals = []
+        for i, days, sev in zip(late_idx.tolist(), days_late.tolist(), severity.tolist()):
+            wo = work_orders[i]
+            signals.append(self._late_work_order_signal(
+                wo.work_order_id, wo.site_id, wo.due_date, days, sev, now
+            ))
         return signals
+    
+    def _late_work_order_signal(
+        self,
+        work_order_id: str,
+        site_id: str,
+        due_date: datetime,
+        days_late: int,
+        severity: str,
+        detected_date: datetime
+    ) -> ExecutionSignal:
+        """Build the signal for a work order past its due date"""
+        return ExecutionSignal(
+            signal_id=f"{work_order_id}_late",
+            site_id=site_id,
+            signal_type="late_work_order",
+            severity=severity,
+            detected_date=detected_date,
+            confidence_score=1.0,  # Rule-based, high confidence
+            evidence={
+                "work_order_id": work_order_id,
+                "due_date": due_date.isoformat(),
+                "days_late": days_late
+            },
+            explanation=f"Work order is {days_late} days past due date without completion",
+            source_type="work_order",
+            source_id=work_order_id,
+            resolved=False
+        )
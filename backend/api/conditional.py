@@ -0,0 +1,79 @@
+"""Conditional GET (ETag / If-None-Match) support for read endpoints"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Clients may store responses but must revalidate them on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+async def site_version(db, site_id: str) -> Optional[int]:
+    """Change counter for one site, bumped by triggers on every write to its rows"""
+    result = await db.table("site_versions").select("version").eq("site_id", site_id).execute()
+    return result.data[0]["version"] if result.data else None
+
+
+async def portfolio_version(db) -> str:
+    """
+    Validator for the whole portfolio, changed by every write to any site
+
+    A digest of all visible site versions (see `portfolio_version()` in
+    schema.sql), so a write that commits out of sequence order still
+    changes it.
+    """
+    result = await db.rpc("portfolio_version").execute()
+    return result.data
+
+
+def make_etag(request: Request, version) -> str:
+    """
+    Weak validator for the representation of `request` at `version`
+
+    The path and query string are folded in, so different pages, filters
+    or field selections of the same data get different validators.
+    """
+    digest = hashlib.sha1(f"{version}|{request.url.path}?{request.url.query}".encode("utf-8"))
+    return f'W/"{digest.hexdigest()[:20]}"'
+
+
+async def site_validator(db, request: Request, site_id: str) -> tuple[Optional[int], Optional[str]]:
+    """
+    Current version of a site and the ETag for this request
+
+    Both are None when the site has never been written (it does not exist).
+    """
+    version = await site_version(db, site_id)
+    if version is None:
+        return None, None
+    return version, make_etag(request, version)
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match header value"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """Return a 304 response when the client already holds `etag`, else None"""
+    if etag is None:
+        return None
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
+
+
+def set_validators(response: Response, etag: Optional[str]):
+    """Attach the validator and revalidation policy to a full response"""
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
@@ -1,37 +1,113 @@
 """Inspections API endpoints"""
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from typing import Optional
-import csv
-import io
 import uuid
 
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Union
+
 from backend.models import Inspection
-from backend.agents import SignalExtractorAgent
+from backend.agents import SignalExtractorAgent, RiskScorerAgent
 from backend.db.config import Database
+from backend.db.bulk import BulkWriter
+from backend.services.risk_maintenance import RiskScoreMaintainer
+from backend.services.inspection_pipeline import (
+    InspectionIngestPipeline,
+    DEFAULT_CONCURRENCY,
+    MAX_CONCURRENCY
+)
+from backend.services.job_queue import job_queue
+from backend.services.iterables import aiter_any
+from backend.services.upload_stream import iter_upload_rows, UploadFormatError
+from backend.cache import read_cache
 
 router = APIRouter(prefix="/api/inspections", tags=["inspections"])
 
-# Initialize signal extractor
+# Initialize signal extractor and risk scorer
 signal_extractor = SignalExtractorAgent()
+risk_scorer = RiskScorerAgent()
+
+INSPECTION_JOB = "inspections"
+
+
+async def process_inspection_job(items: list[dict]) -> list[dict]:
+    """Job handler: run a chunk of queued inspection rows through the pipeline"""
+    db = Database.get_async_client()
+    pipeline = InspectionIngestPipeline(
+        db,
+        signal_extractor,
+        risk_maintainer=RiskScoreMaintainer(db, risk_scorer)
+    )
+    results = await pipeline.run(items)
+    
+    # Row numbers are chunk-relative; the job store tracks each item's index
+    for result in results:
+        result.pop("row", None)
+    return results
+
+
+job_queue.register(INSPECTION_JOB, process_inspection_job)
+
+
+async def _with_inspection_ids(payloads: Union[Iterable[dict], AsyncIterable[dict]]) -> AsyncIterator[dict]:
+    """
+    Give every row an inspection_id before it is persisted
+    
+    A chunk resumed after a crash is then processed with the same IDs, so
+    its inspections and signals are upserted over the first attempt's rows
+    instead of being stored (and scored) a second time.
+    """
+    async for payload in aiter_any(payloads):
+        if not payload.get("inspection_id"):
+            payload = {**payload, "inspection_id": str(uuid.uuid4())}
+        yield payload
+
+
+async def _accept_job(payloads: Union[Iterable[dict], AsyncIterable[dict]]) -> JSONResponse:
+    """Queue payloads as a background job and answer 202 Accepted"""
+    try:
+        job_id = await job_queue.submit(INSPECTION_JOB, _with_inspection_ids(payloads))
+    except UploadFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    job = await job_queue.get_job(job_id, limit=0)
+    status_url = f"/api/jobs/{job_id}"
+    
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "queued",
+            "job_id": job_id,
+            "items": job["total_items"],
+            "status_url": status_url
+        },
+        headers={"Location": status_url}
+    )
 
 
 @router.post("/ingest")
-async def ingest_inspection(inspection: Inspection):
+async def ingest_inspection(
+    inspection: Inspection,
+    background: bool = Query(
+        default=False,
+        description="Queue the inspection and return 202 with a job ID instead of waiting"
+    )
+):
     """
     Ingest a single inspection and extract execution signals
     
     Args:
         inspection: Inspection data
+        background: Process in a background job
         
     Returns:
-        Processing status and extracted signals
+        Processing status and extracted signals, or the queued job
     """
     try:
-        db = Database.get_client()
+        if background:
+            return await _accept_job([inspection.model_dump(mode="json")])
         
-        # Store inspection
-        db.table("inspections").insert(inspection.model_dump(mode="json")).execute()
+        db = Database.get_async_client()
         
         # Extract signals using AI agent
         signals = await signal_extractor.extract_from_inspection(
@@ -40,10 +116,27 @@ async def ingest_inspection(inspection: Inspection):
             notes=inspection.notes
         )
         
-        # Store signals
-        if signals:
-            signals_data = [s.model_dump(mode="json") for s in signals]
-            db.table("execution_signals").insert(signals_data).execute()
+        # Store the inspection and its signals together; upserts make a
+        # retried request safe, and signals stored by an earlier attempt
+        # are neither rewritten nor counted into the score again
+        writer = BulkWriter(db)
+        writer.add("inspections", [inspection.model_dump(mode="json")], ref=inspection.inspection_id, on_conflict="inspection_id")
+        writer.add(
+            "execution_signals",
+            [s.model_dump(mode="json") for s in signals],
+            ref=inspection.inspection_id,
+            on_conflict="signal_id",
+            ignore_duplicates=True
+        )
+        outcome = await writer.flush()
+        if outcome.failed:
+            raise HTTPException(status_code=500, detail=outcome.failed[inspection.inspection_id])
+        
+        # Fold new signals into the site's running risk score
+        inserted = {row["signal_id"] for row in outcome.rows("execution_signals")}
+        new_signals = [s for s in signals if s.signal_id in inserted]
+        if new_signals:
+            await RiskScoreMaintainer(db, risk_scorer).apply(added=new_signals)
         
         return {
             "status": "success",
@@ -60,76 +153,124 @@ async def ingest_inspection(inspection: Inspection):
             ]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/ingest/csv")
-async def ingest_inspections_csv(file: UploadFile = File(...)):
+@router.post(
+    "/ingest/csv",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"]
+                    }
+                },
+                "text/csv": {"schema": {"type": "string"}}
+            }
+        }
+    }
+)
+async def ingest_inspections_csv(
+    request: Request,
+    concurrency: int = Query(
+        default=DEFAULT_CONCURRENCY,
+        ge=1,
+        le=MAX_CONCURRENCY,
+        description="Maximum number of concurrent extraction requests"
+    ),
+    background: bool = Query(
+        default=False,
+        description="Queue the rows and return 202 with a job ID instead of waiting"
+    )
+):
     """
     Ingest multiple inspections from CSV file
     
+    Rows are extracted in batched model requests (up to `concurrency` at a
+    time) and written in batches, so a failing row does not abort the upload.
+    The response counts successful rows and lists only the failed ones.
+    With `background=true` the rows are persisted as a job and the response
+    is 202 Accepted; poll `/api/jobs/{job_id}` for progress and results.
+    
+    The upload (a multipart `file` field or a raw `text/csv` body) is parsed
+    as it streams in, so extraction starts before the upload finishes and
+    memory use does not grow with file size.
+    
     CSV Format:
     site_id, inspector_name, inspection_date, notes, status, inspection_type
     
     Returns:
-        Processing summary
+        Processing summary with counts and the failed rows
     """
     try:
-        contents = await file.read()
-        csv_text = contents.decode("utf-8")
-        csv_reader = csv.DictReader(io.StringIO(csv_text))
+        csv_reader = iter_upload_rows(
+            request.stream(),
+            request.headers.get("content-type", ""),
+            upload_format="csv"
+        )
         
-        db = Database.get_client()
-        total_processed = 0
-        total_signals = 0
+        if background:
+            return await _accept_job(csv_reader)
         
-        for row in csv_reader:
-            # Create inspection object
-            inspection = Inspection(
-                inspection_id=str(uuid.uuid4()),
-                site_id=row["site_id"],
-                inspector_name=row["inspector_name"],
-                inspection_date=row["inspection_date"],
-                notes=row["notes"],
-                status=row["status"],
-                inspection_type=row.get("inspection_type")
-            )
-            
-            # Store inspection
-            db.table("inspections").insert(inspection.model_dump(mode="json")).execute()
-            
-            # Extract signals
-            signals = await signal_extractor.extract_from_inspection(
-                inspection_id=inspection.inspection_id,
-                site_id=inspection.site_id,
-                notes=inspection.notes
-            )
-            
-            # Store signals
-            if signals:
-                signals_data = [s.model_dump(mode="json") for s in signals]
-                db.table("execution_signals").insert(signals_data).execute()
-                total_signals += len(signals)
-            
-            total_processed += 1
+        db = Database.get_async_client()
+        pipeline = InspectionIngestPipeline(
+            db,
+            signal_extractor,
+            concurrency=concurrency,
+            risk_maintainer=RiskScoreMaintainer(db, risk_scorer)
+        )
+        summary = await pipeline.summarize(csv_reader)
         
-        return {
-            "status": "success",
-            "inspections_processed": total_processed,
-            "total_signals_extracted": total_signals
-        }
+        if not summary["inspections_failed"]:
+            status = "success"
+        elif summary["inspections_processed"]:
+            status = "partial"
+        else:
+            status = "failed"
+        
+        return {"status": status, **summary}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/stats/extraction")
+async def get_extraction_stats():
+    """Pre-filter skip rate and extraction / read cache hit ratios for this worker"""
+    prefilter = signal_extractor.prefilter
+    cache = signal_extractor.cache
+    
+    return {
+        "prefilter": prefilter.stats.to_dict() if prefilter else None,
+        "cache": {
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "hit_ratio": round(cache.hit_ratio, 4)
+        } if cache else None,
+        "read_cache": {
+            "hits": read_cache.hits,
+            "misses": read_cache.misses,
+            "coalesced": read_cache.coalesced,
+            "hit_ratio": round(read_cache.hit_ratio, 4)
+        }
+    }
+
+
 @router.get("/{inspection_id}")
 async def get_inspection(inspection_id: str):
     """Get inspection by ID"""
     try:
-        db = Database.get_client()
-        result = db.table("inspections").select("*").eq("inspection_id", inspection_id).execute()
+        db = Database.get_async_client()
+        result = await db.table("inspections").select("*").eq("inspection_id", inspection_id).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Inspection not found")
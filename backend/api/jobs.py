@@ -0,0 +1,41 @@
+"""Background job API endpoints"""
+
+from fastapi import APIRouter, HTTPException, Query
+
+from backend.services.job_queue import job_queue
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    offset: int = Query(default=0, ge=0, description="First item to include"),
+    limit: int = Query(default=100, ge=1, le=1000, description="Maximum items to include")
+):
+    """
+    Get the status and progress of a background job
+    
+    Args:
+        job_id: Job identifier returned when the job was accepted
+        offset: First item to include
+        limit: Maximum items to include
+        
+    Returns:
+        Job status, progress counters and a page of per-item results and errors
+    """
+    try:
+        job = await job_queue.get_job(job_id, offset=offset, limit=limit)
+        
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        total = job["total_items"]
+        job["progress"] = round(job["processed_items"] / total, 4) if total else 1.0
+        
+        return job
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,15 +1,30 @@
 """Signals API endpoints"""
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from datetime import datetime
 from typing import Optional
 
+from backend.models import ExecutionSignal
+from backend.agents import RiskScorerAgent
 from backend.db.config import Database
+from backend.services.risk_maintenance import RiskScoreMaintainer
+from backend.cache import read_cache
+from backend.cache.read_cache import SIGNALS_TAG, site_signals_tag
+from backend.api.conditional import portfolio_version, site_version, make_etag, not_modified, set_validators
 
 router = APIRouter(prefix="/api/signals", tags=["signals"])
 
+# Initialize risk scorer
+risk_scorer = RiskScorerAgent()
+
+# Number of sites reported in the top-sites ranking
+TOP_SITES_LIMIT = 10
+
 
 @router.get("/breakdown")
 async def get_signals_breakdown(
+    request: Request,
+    response: Response,
     site_id: Optional[str] = Query(None, description="Filter by site"),
     signal_type: Optional[str] = Query(None, description="Filter by signal type"),
     severity: Optional[str] = Query(None, description="Filter by severity"),
@@ -25,82 +40,109 @@ async def get_signals_breakdown(
         resolved: Optional resolution status filter
         
     Returns:
-        Aggregated signal statistics
+        Aggregated signal statistics (cached until the next signal write;
+        If-None-Match is answered from the site or portfolio version)
     """
     try:
-        db = Database.get_client()
-        
-        # Build query
-        query = db.table("execution_signals").select("*")
+        db = Database.get_async_client()
         
+        # Site-filtered results only change with that site's signals
         if site_id:
-            query = query.eq("site_id", site_id)
-        if signal_type:
-            query = query.eq("signal_type", signal_type)
-        if severity:
-            query = query.eq("severity", severity)
-        if resolved is not None:
-            query = query.eq("resolved", resolved)
-        
-        result = query.execute()
-        signals = result.data
+            tags = [site_signals_tag(site_id)]
+            version = await site_version(db, site_id) or 0
+        else:
+            tags = [SIGNALS_TAG]
+            version = await portfolio_version(db)
         
-        # Aggregate statistics
-        breakdown_by_type = {}
-        breakdown_by_severity = {}
-        by_site = {}
+        etag = make_etag(request, version)
+        unchanged = not_modified(request, etag)
+        if unchanged is not None:
+            return unchanged
         
-        for signal in signals:
-            # By type
-            sig_type = signal["signal_type"]
-            breakdown_by_type[sig_type] = breakdown_by_type.get(sig_type, 0) + 1
-            
-            # By severity
-            sev = signal["severity"]
-            breakdown_by_severity[sev] = breakdown_by_severity.get(sev, 0) + 1
-            
-            # By site
-            sid = signal["site_id"]
-            by_site[sid] = by_site.get(sid, 0) + 1
-        
-        # Top sites with most signals
-        top_sites = sorted(by_site.items(), key=lambda x: x[1], reverse=True)[:10]
-        
-        return {
-            "total_signals": len(signals),
-            "breakdown_by_type": breakdown_by_type,
-            "breakdown_by_severity": breakdown_by_severity,
-            "top_sites_by_signal_count": [
-                {"site_id": site_id, "signal_count": count}
-                for site_id, count in top_sites
-            ],
-            "filters_applied": {
-                "site_id": site_id,
-                "signal_type": signal_type,
-                "severity": severity,
-                "resolved": resolved
-            }
-        }
+        breakdown = await read_cache.get_or_load(
+            ("breakdown", site_id, signal_type, severity, resolved, version),
+            tags,
+            lambda: _load_breakdown(site_id, signal_type, severity, resolved)
+        )
+        set_validators(response, etag)
+        return breakdown
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _load_breakdown(
+    site_id: Optional[str],
+    signal_type: Optional[str],
+    severity: Optional[str],
+    resolved: Optional[bool]
+) -> dict:
+    """Aggregate signal counts for the given filters"""
+    db = Database.get_async_client()
+    
+    # Aggregate in the database; only grouped counts are transferred
+    result = await db.rpc("signal_breakdown", {
+        "p_site_id": site_id or None,
+        "p_signal_type": signal_type or None,
+        "p_severity": severity or None,
+        "p_resolved": resolved,
+        "p_top_sites": TOP_SITES_LIMIT
+    }).execute()
+    
+    total_signals = 0
+    breakdown_by_type = {}
+    breakdown_by_severity = {}
+    top_sites = []
+    
+    for row in result.data:
+        dimension = row["dimension"]
+        if dimension == "total":
+            total_signals = row["signal_count"]
+        elif dimension == "type":
+            breakdown_by_type[row["bucket"]] = row["signal_count"]
+        elif dimension == "severity":
+            breakdown_by_severity[row["bucket"]] = row["signal_count"]
+        elif dimension == "site":
+            top_sites.append((row["bucket"], row["signal_count"]))
+    
+    return {
+        "total_signals": total_signals,
+        "breakdown_by_type": breakdown_by_type,
+        "breakdown_by_severity": breakdown_by_severity,
+        "top_sites_by_signal_count": [
+            {"site_id": sid, "signal_count": count}
+            for sid, count in top_sites
+        ],
+        "filters_applied": {
+            "site_id": site_id,
+            "signal_type": signal_type,
+            "severity": severity,
+            "resolved": resolved
+        }
+    }
+
+
 @router.patch("/{signal_id}/resolve")
 async def resolve_signal(signal_id: str):
-    """Mark a signal as resolved"""
+    """Mark a signal as resolved and update the site's risk score"""
     try:
-        db = Database.get_client()
-        
-        from datetime import datetime
+        db = Database.get_async_client()
         
-        result = db.table("execution_signals").update({
+        # Only flip unresolved signals so a repeat call cannot double-count
+        result = await db.table("execution_signals").update({
             "resolved": True,
             "resolved_date": datetime.utcnow().isoformat()
-        }).eq("signal_id", signal_id).execute()
+        }).eq("signal_id", signal_id).eq("resolved", False).execute()
         
         if not result.data:
-            raise HTTPException(status_code=404, detail="Signal not found")
+            existing = await db.table("execution_signals").select("signal_id").eq("signal_id", signal_id).execute()
+            if not existing.data:
+                raise HTTPException(status_code=404, detail="Signal not found")
+        else:
+            # Remove the signal's contribution from the site's running risk score
+            await RiskScoreMaintainer(db, risk_scorer).apply(
+                resolved=[ExecutionSignal(**row) for row in result.data]
+            )
         
         return {
             "status": "success",
@@ -1,24 +1,105 @@
 """Sites API endpoints"""
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from datetime import datetime
 from typing import Optional
+import asyncio
+import sys
+import time
 
-from backend.models import Site, RiskScore
+from backend.models import Site, RiskScore, ExecutionSignal
 from backend.agents import RiskScorerAgent
 from backend.db.config import Database
+from backend.db.pagination import keyset_page, split_page, iter_keyset
+from backend.api.streaming import ndjson_response, STREAM_PAGE_SIZE
+from backend.api.conditional import portfolio_version, make_etag, site_validator, not_modified, set_validators
+from backend.cache import read_cache
+from backend.cache.read_cache import SCORES_TAG, site_tag
 
 router = APIRouter(prefix="/api/sites", tags=["sites"])
 
 # Initialize risk scorer
 risk_scorer = RiskScorerAgent()
 
+# History page sizes
+HISTORY_PAGE_SIZE = 50
+MAX_HISTORY_PAGE_SIZE = 500
+
+# In exponential recency mode current scores are aged on read, so their
+# validators also roll over once per period (weak ETags: scores within one
+# period are treated as equivalent)
+AGING_PERIOD_SECONDS = 3600
+
+# Keyset order for paginated history: (sort column, unique tie-breaker)
+SIGNAL_KEYS = ("detected_date", "signal_id")
+RISK_SCORE_KEYS = ("calculated_date", "risk_score_id")
+
+
+def _projection(fields: Optional[str], model, keys: tuple[str, str]) -> str:
+    """
+    Build a select list from a comma-separated field list
+    
+    Keyset columns are always included so the next cursor can be built.
+    """
+    if not fields:
+        return "*"
+    
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    
+    return ",".join(dict.fromkeys([*keys, *requested]))
+
+
+def _current_version(version):
+    """Validator version for responses that carry current risk scores"""
+    if version is None or not risk_scorer.exponential:
+        return version
+    return f"{version}@{int(time.time() // AGING_PERIOD_SECONDS)}"
+
+
+def _aged(score: Optional[dict], now: datetime) -> Optional[dict]:
+    """
+    A stored current score as of `now`
+    
+    Stored scores are only as fresh as their last write; in exponential
+    mode they are projected to the request time instead (see
+    `RiskScorerAgent.age_score`). Returns a new dict, so cached rows are
+    never modified.
+    """
+    if score is None or not risk_scorer.exponential:
+        return score
+    return risk_scorer.age_score(RiskScore(**score), now).model_dump(mode="json")
+
+
+async def _history_page(
+    db,
+    table: str,
+    site_id: str,
+    columns: str,
+    keys: tuple[str, str],
+    limit: int,
+    cursor: Optional[str] = None
+) -> tuple[list[dict], Optional[str]]:
+    """Fetch one newest-first page of a site's history table"""
+    query = db.table(table).select(columns).eq("site_id", site_id)
+    try:
+        query = keyset_page(query, *keys, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    result = await query.execute()
+    return split_page(result.data, limit, *keys)
+
 
 @router.post("/")
 async def create_site(site: Site):
     """Create a new site"""
     try:
-        db = Database.get_client()
-        db.table("sites").insert(site.model_dump(mode="json")).execute()
+        db = Database.get_async_client()
+        await db.table("sites").insert(site.model_dump(mode="json")).execute()
+        read_cache.invalidate(site_tag(site.site_id))
         
         return {
             "status": "success",
@@ -29,26 +110,132 @@ async def create_site(site: Site):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{site_id}")
-async def get_site(site_id: str):
-    """Get site by ID with current risk score"""
-    try:
-        db = Database.get_client()
-        
-        # Get site
-        site_result = db.table("sites").select("*").eq("site_id", site_id).execute()
+@router.get("/at-risk")
+async def get_at_risk_sites(
+    request: Request,
+    response: Response,
+    min_score: float = Query(default=50.0, description="Minimum risk score"),
+    limit: int = Query(default=50, le=100),
+    include_total: bool = Query(default=False, description="Also count every site above the threshold")
+):
+    """
+    Get ranked list of at-risk sites
+    
+    Ranks the current score per site (`site_current_risk`, one row per
+    site) in the database and fetches site details for the returned page
+    in one query.
+    Results are cached until the next risk score write. The ETag follows
+    the portfolio version, so an unchanged portfolio answers 304.
+    
+    In exponential recency mode sites are filtered and ranked by
+    `decay_key`, which orders them by risk as of the request, and the
+    returned scores are aged to the request time.
+    
+    Args:
+        min_score: Minimum risk score threshold
+        limit: Maximum number of sites to return
+        include_total: Add `total`, the number of sites above the
+            threshold; counting reads every one of them, not just the page
         
-        if not site_result.data:
-            raise HTTPException(status_code=404, detail="Site not found")
+    Returns:
+        Ranked list of sites by risk score
+    """
+    try:
+        version = _current_version(await portfolio_version(Database.get_async_client()))
+        etag = make_etag(request, version)
+        unchanged = not_modified(request, etag)
+        if unchanged is not None:
+            return unchanged
         
-        site = site_result.data[0]
+        # The version is part of the key, so writes from other processes
+        # are seen as soon as they commit
+        sites = await read_cache.get_or_load(
+            ("at_risk", min_score, limit, include_total, version),
+            [SCORES_TAG],
+            lambda: _load_at_risk_sites(min_score, limit, include_total)
+        )
+        set_validators(response, etag)
         
-        # Get latest risk score
-        risk_result = db.table("risk_scores").select("*").eq("site_id", site_id).order("calculated_date", desc=True).limit(1).execute()
+        now = datetime.utcnow()
+        return {
+            **sites,
+            "sites": [{**site, "risk_score": _aged(site["risk_score"], now)} for site in sites["sites"]]
+        }
         
-        site["current_risk_score"] = risk_result.data[0] if risk_result.data else None
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _load_at_risk_sites(min_score: float, limit: int, include_total: bool = False) -> dict:
+    """Query the ranked at-risk sites page"""
+    db = Database.get_async_client()
+    
+    # Get current risk score per site above threshold, highest first; the
+    # (score DESC, site_id) index lets Postgres stop after `limit` rows
+    # instead of sorting every site, and the site_id tie-break keeps equal
+    # scores in a stable order between requests
+    query = db.table("site_current_risk").select("*", count="exact" if include_total else None)
+    if risk_scorer.exponential:
+        # Stored scores have decayed unevenly since their last write, but
+        # decay_key ranks them by risk as of now, with its own index. Rows
+        # without a key (zero scores, or scored before the mode was
+        # switched) are left out
+        threshold = risk_scorer.decay_key_threshold(min_score)
+        query = query.gte("decay_key", -sys.float_info.max if threshold is None else threshold)
+        query = query.order("decay_key", desc=True)
+    else:
+        query = query.gte("score", min_score).order("score", desc=True)
+    risk_result = await query.order("site_id").limit(limit).execute()
+    scores = risk_result.data
+    
+    # Get site details in a single batched query
+    sites_by_id = {}
+    if scores:
+        site_ids = [score["site_id"] for score in scores]
+        sites_result = await db.table("sites").select("*").in_("site_id", site_ids).execute()
+        sites_by_id = {site["site_id"]: site for site in sites_result.data}
+    
+    sites_with_scores = []
+    for score in scores:
+        site = sites_by_id.get(score["site_id"])
+        if site:
+            site["risk_score"] = score
+            sites_with_scores.append(site)
+    
+    response = {
+        "sites": sites_with_scores,
+        "count": len(sites_with_scores),
+        "min_score_threshold": min_score
+    }
+    if include_total:
+        response["total"] = risk_result.count
+    return response
+
+
+@router.get("/{site_id}")
+async def get_site(site_id: str, request: Request, response: Response):
+    """
+    Get site by ID with current risk score
+    
+    Supports If-None-Match: until the site changes, a polling client costs
+    one site version lookup and gets 304 Not Modified. In exponential
+    recency mode the score is aged to the request time.
+    """
+    try:
+        version, etag = await site_validator(Database.get_async_client(), request, site_id)
+        if version is not None and risk_scorer.exponential:
+            etag = make_etag(request, _current_version(version))
+        unchanged = not_modified(request, etag)
+        if unchanged is not None:
+            return unchanged
         
-        return site
+        site = await read_cache.get_or_load(
+            ("site", site_id, version),
+            [site_tag(site_id)],
+            lambda: _load_site(site_id)
+        )
+        set_validators(response, etag)
+        return {**site, "current_risk_score": _aged(site["current_risk_score"], datetime.utcnow())}
         
     except HTTPException:
         raise
@@ -56,28 +243,94 @@ async def get_site(site_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _load_site(site_id: str) -> dict:
+    """Query a site and its latest risk score"""
+    db = Database.get_async_client()
+    
+    # Get site
+    site_result = await db.table("sites").select("*").eq("site_id", site_id).execute()
+    
+    if not site_result.data:
+        raise HTTPException(status_code=404, detail="Site not found")
+    
+    site = site_result.data[0]
+    
+    # Get current risk score (one primary key lookup, however long the history)
+    risk_result = await db.table("site_current_risk").select("*").eq("site_id", site_id).execute()
+    
+    site["current_risk_score"] = risk_result.data[0] if risk_result.data else None
+    
+    return site
+
+
 @router.get("/{site_id}/history")
-async def get_site_history(site_id: str):
-    """Get execution signal timeline for a site"""
+async def get_site_history(
+    site_id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(default=HISTORY_PAGE_SIZE, ge=1, le=MAX_HISTORY_PAGE_SIZE, description="Items per list"),
+    signal_fields: Optional[str] = Query(default=None, description="Comma-separated signal fields (default: all)"),
+    risk_fields: Optional[str] = Query(default=None, description="Comma-separated risk score fields (default: all)"),
+    stream: bool = Query(default=False, description="Stream the full history as NDJSON instead of one page")
+):
+    """
+    Get execution signal timeline for a site
+    
+    Returns the newest page of signals and of risk scores, each with a
+    cursor for the next page (see `/signals` and `/risk-history`).
+    
+    With `stream=true` the full history is streamed as NDJSON records
+    `{"type": "site" | "signal" | "risk_score", "data": {...}}`, paging
+    through the database as the response is written.
+    
+    Supports If-None-Match against the site's version, checked before any
+    history rows are read.
+    
+    Args:
+        site_id: Site identifier
+        limit: Page size for each list
+        signal_fields: Signal fields to return, e.g. without `evidence`
+        risk_fields: Risk score fields to return, e.g. without `contributing_signals`
+        stream: Stream every signal and risk score as NDJSON
+        
+    Returns:
+        Site, first signal and risk score pages, and next-page cursors
+    """
     try:
-        db = Database.get_client()
+        signal_columns = _projection(signal_fields, ExecutionSignal, SIGNAL_KEYS)
+        risk_columns = _projection(risk_fields, RiskScore, RISK_SCORE_KEYS)
+        
+        db = Database.get_async_client()
+        
+        _, etag = await site_validator(db, request, site_id)
+        unchanged = not_modified(request, etag)
+        if unchanged is not None:
+            return unchanged
         
         # Get site
-        site_result = db.table("sites").select("*").eq("site_id", site_id).execute()
+        site_result = await db.table("sites").select("*").eq("site_id", site_id).execute()
         
         if not site_result.data:
             raise HTTPException(status_code=404, detail="Site not found")
         
-        # Get signals (ordered by date, most recent first)
-        signals_result = db.table("execution_signals").select("*").eq("site_id", site_id).order("detected_date", desc=True).execute()
+        if stream:
+            streamed = ndjson_response(_stream_history(db, site_result.data[0], signal_columns, risk_columns))
+            set_validators(streamed, etag)
+            return streamed
         
-        # Get risk score history
-        risk_result = db.table("risk_scores").select("*").eq("site_id", site_id).order("calculated_date", desc=True).execute()
+        # Get first pages of signals and risk score history (most recent first)
+        (signals, signals_cursor), (risk_history, risk_cursor) = await asyncio.gather(
+            _history_page(db, "execution_signals", site_id, signal_columns, SIGNAL_KEYS, limit),
+            _history_page(db, "risk_scores", site_id, risk_columns, RISK_SCORE_KEYS, limit)
+        )
         
+        set_validators(response, etag)
         return {
             "site": site_result.data[0],
-            "signals": signals_result.data,
-            "risk_history": risk_result.data
+            "signals": signals,
+            "signals_next_cursor": signals_cursor,
+            "risk_history": risk_history,
+            "risk_history_next_cursor": risk_cursor
         }
         
     except HTTPException:
@@ -86,51 +339,95 @@ async def get_site_history(site_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/at-risk")
-async def get_at_risk_sites(
-    min_score: float = Query(default=50.0, description="Minimum risk score"),
-    limit: int = Query(default=50, le=100)
-):
-    """
-    Get ranked list of at-risk sites
+async def _stream_history(db, site: dict, signal_columns: str, risk_columns: str):
+    """Yield typed history records for a site, newest first"""
+    site_id = site["site_id"]
+    yield {"type": "site", "data": site}
     
-    Args:
-        min_score: Minimum risk score threshold
-        limit: Maximum number of sites to return
+    signals = iter_keyset(
+        lambda: db.table("execution_signals").select(signal_columns).eq("site_id", site_id),
+        *SIGNAL_KEYS,
+        page_size=STREAM_PAGE_SIZE
+    )
+    async for row in signals:
+        yield {"type": "signal", "data": row}
+    
+    risk_history = iter_keyset(
+        lambda: db.table("risk_scores").select(risk_columns).eq("site_id", site_id),
+        *RISK_SCORE_KEYS,
+        page_size=STREAM_PAGE_SIZE
+    )
+    async for row in risk_history:
+        yield {"type": "risk_score", "data": row}
+
+
+@router.get("/{site_id}/signals")
+async def get_site_signals(
+    site_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(default=None, description="Cursor from the previous page"),
+    limit: int = Query(default=HISTORY_PAGE_SIZE, ge=1, le=MAX_HISTORY_PAGE_SIZE),
+    fields: Optional[str] = Query(default=None, description="Comma-separated signal fields (default: all)")
+):
+    """Page through a site's signals, newest first"""
+    try:
+        columns = _projection(fields, ExecutionSignal, SIGNAL_KEYS)
+        db = Database.get_async_client()
         
-    Returns:
-        Ranked list of sites by risk score
-    """
+        _, etag = await site_validator(db, request, site_id)
+        unchanged = not_modified(request, etag)
+        if unchanged is not None:
+            return unchanged
+        
+        signals, next_cursor = await _history_page(
+            db, "execution_signals", site_id, columns, SIGNAL_KEYS, limit, cursor
+        )
+        
+        set_validators(response, etag)
+        return {
+            "site_id": site_id,
+            "signals": signals,
+            "next_cursor": next_cursor
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{site_id}/risk-history")
+async def get_site_risk_history(
+    site_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(default=None, description="Cursor from the previous page"),
+    limit: int = Query(default=HISTORY_PAGE_SIZE, ge=1, le=MAX_HISTORY_PAGE_SIZE),
+    fields: Optional[str] = Query(default=None, description="Comma-separated risk score fields (default: all)")
+):
+    """Page through a site's risk score history, newest first"""
     try:
-        db = Database.get_client()
-        
-        # Get latest risk scores for all sites above threshold
-        risk_result = db.table("risk_scores").select("*").gte("score", min_score).order("calculated_date", desc=True).execute()
-        
-        # Group by site (keep only latest score per site)
-        site_scores = {}
-        for score in risk_result.data:
-            site_id = score["site_id"]
-            if site_id not in site_scores:
-                site_scores[site_id] = score
-        
-        # Get site details
-        sites_with_scores = []
-        for site_id, score in site_scores.items():
-            site_result = db.table("sites").select("*").eq("site_id", site_id).execute()
-            if site_result.data:
-                site = site_result.data[0]
-                site["risk_score"] = score
-                sites_with_scores.append(site)
-        
-        # Sort by risk score (highest first)
-        sites_with_scores.sort(key=lambda x: x["risk_score"]["score"], reverse=True)
+        columns = _projection(fields, RiskScore, RISK_SCORE_KEYS)
+        db = Database.get_async_client()
+        
+        _, etag = await site_validator(db, request, site_id)
+        unchanged = not_modified(request, etag)
+        if unchanged is not None:
+            return unchanged
         
+        risk_history, next_cursor = await _history_page(
+            db, "risk_scores", site_id, columns, RISK_SCORE_KEYS, limit, cursor
+        )
+        
+        set_validators(response, etag)
         return {
-            "sites": sites_with_scores[:limit],
-            "count": len(sites_with_scores),
-            "min_score_threshold": min_score
+            "site_id": site_id,
+            "risk_history": risk_history,
+            "next_cursor": next_cursor
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
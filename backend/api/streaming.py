@@ -0,0 +1,30 @@
+"""Streaming (NDJSON) responses for large list endpoints"""
+
+import json
+from typing import AsyncIterable
+
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rows fetched from the database per round trip while streaming
+STREAM_PAGE_SIZE = 500
+
+
+def ndjson_response(records: AsyncIterable[dict]) -> StreamingResponse:
+    """
+    Stream records as newline-delimited JSON
+
+    Records are serialized and sent as they are produced, so memory use
+    stays bounded by one database page. The status code is sent before
+    the first record, so a failure mid-stream is reported as a final
+    `{"error": ...}` line.
+    """
+    async def body():
+        try:
+            async for record in records:
+                yield json.dumps(record, default=str) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
@@ -1,17 +1,30 @@
 """Work Orders API endpoints"""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from datetime import datetime
+from typing import Literal, Optional
 import uuid
 
 from backend.models import WorkOrder
-from backend.agents import SignalExtractorAgent
+from backend.agents import SignalExtractorAgent, RiskScorerAgent
 from backend.db.config import Database
+from backend.db.bulk import BulkWriter
+from backend.services.risk_maintenance import RiskScoreMaintainer
+from backend.services.work_order_pipeline import WorkOrderBulkIngestor
+from backend.services.upload_stream import iter_upload_rows
+from backend.services.overdue_sweeper import OverdueWorkOrderSweeper
+from backend.db.pagination import iter_keyset
+from backend.api.streaming import ndjson_response, STREAM_PAGE_SIZE
+from backend.api.conditional import make_etag, site_validator, not_modified, set_validators
 
 router = APIRouter(prefix="/api/work-orders", tags=["work_orders"])
 
-# Initialize signal extractor
+# Initialize signal extractor and risk scorer
 signal_extractor = SignalExtractorAgent()
+risk_scorer = RiskScorerAgent()
+
+# Flags orders that become overdue after ingestion; started by the app lifespan
+overdue_sweeper = OverdueWorkOrderSweeper(Database.get_async_client, signal_extractor, risk_scorer)
 
 
 @router.post("/ingest")
@@ -26,10 +39,7 @@ async def ingest_work_order(work_order: WorkOrder):
         Processing status and extracted signals
     """
     try:
-        db = Database.get_client()
-        
-        # Store work order
-        db.table("work_orders").insert(work_order.model_dump(mode="json")).execute()
+        db = Database.get_async_client()
         
         # Extract signals (late work orders, etc.)
         signals = await signal_extractor.extract_from_work_order(
@@ -41,10 +51,26 @@ async def ingest_work_order(work_order: WorkOrder):
             status=work_order.status
         )
         
-        # Store signals
-        if signals:
-            signals_data = [s.model_dump(mode="json") for s in signals]
-            db.table("execution_signals").insert(signals_data).execute()
+        # Store the order and its signals together; a retry updates the
+        # order in place and keeps the {work_order_id}_late signal as stored
+        writer = BulkWriter(db)
+        writer.add("work_orders", [work_order.model_dump(mode="json")], ref=work_order.work_order_id, on_conflict="work_order_id")
+        writer.add(
+            "execution_signals",
+            [s.model_dump(mode="json") for s in signals],
+            ref=work_order.work_order_id,
+            on_conflict="signal_id",
+            ignore_duplicates=True
+        )
+        outcome = await writer.flush()
+        if outcome.failed:
+            raise HTTPException(status_code=500, detail=outcome.failed[work_order.work_order_id])
+        
+        # Fold new signals into the site's running risk score
+        inserted = {row["signal_id"] for row in outcome.rows("execution_signals")}
+        new_signals = [s for s in signals if s.signal_id in inserted]
+        if new_signals:
+            await RiskScoreMaintainer(db, risk_scorer).apply(added=new_signals)
         
         return {
             "status": "success",
@@ -60,20 +86,103 @@ async def ingest_work_order(work_order: WorkOrder):
             ]
         }
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post(
+    "/ingest/bulk",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"]
+                    }
+                }
+            }
+        }
+    }
+)
+async def ingest_work_orders_bulk(
+    request: Request,
+    upload_format: Optional[Literal["csv", "ndjson"]] = Query(
+        default=None,
+        alias="format",
+        description="Body format; inferred from Content-Type when omitted (multipart defaults to CSV)"
+    )
+):
+    """
+    Ingest many work orders from an NDJSON or CSV upload
+    
+    Rows are validated and written in batches with multi-row upserts, and
+    lateness is evaluated for the whole upload against one reference time.
+    Invalid rows are reported and skipped without aborting the sync.
+    
+    Returns:
+        Ingestion summary with counts and row errors
+    """
+    try:
+        rows = iter_upload_rows(
+            request.stream(),
+            request.headers.get("content-type", ""),
+            upload_format=upload_format
+        )
+        
+        db = Database.get_async_client()
+        ingestor = WorkOrderBulkIngestor(
+            db,
+            signal_extractor,
+            risk_maintainer=RiskScoreMaintainer(db, risk_scorer)
+        )
+        summary = await ingestor.run(rows)
+        
+        if not summary["rows_failed"]:
+            status = "success"
+        elif summary["work_orders_ingested"]:
+            status = "partial"
+        else:
+            status = "failed"
+        
+        return {"status": status, **summary}
+        
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{work_order_id}")
-async def get_work_order(work_order_id: str):
-    """Get work order by ID"""
+async def get_work_order(work_order_id: str, request: Request, response: Response):
+    """
+    Get work order by ID
+    
+    The ETag is derived from `updated_at`, so If-None-Match is answered
+    from a one-column lookup without reading the full row.
+    """
     try:
-        db = Database.get_client()
-        result = db.table("work_orders").select("*").eq("work_order_id", work_order_id).execute()
+        db = Database.get_async_client()
+        
+        stamp = await db.table("work_orders").select("updated_at").eq("work_order_id", work_order_id).execute()
+        if not stamp.data:
+            raise HTTPException(status_code=404, detail="Work order not found")
+        
+        etag = make_etag(request, stamp.data[0]["updated_at"])
+        unchanged = not_modified(request, etag)
+        if unchanged is not None:
+            return unchanged
+        
+        result = await db.table("work_orders").select("*").eq("work_order_id", work_order_id).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Work order not found")
         
+        set_validators(response, etag)
         return result.data[0]
         
     except HTTPException:
@@ -83,17 +192,42 @@ async def get_work_order(work_order_id: str):
 
 
 @router.get("/site/{site_id}")
-async def get_site_work_orders(site_id: str, status: str = None):
-    """Get all work orders for a site, optionally filtered by status"""
+async def get_site_work_orders(
+    site_id: str,
+    request: Request,
+    response: Response,
+    status: str = None,
+    stream: bool = Query(default=False, description="Stream work orders as NDJSON, newest first")
+):
+    """
+    Get all work orders for a site, optionally filtered by status
+    
+    Supports If-None-Match against the site's version.
+    """
     try:
-        db = Database.get_client()
-        query = db.table("work_orders").select("*").eq("site_id", site_id)
+        db = Database.get_async_client()
+        
+        _, etag = await site_validator(db, request, site_id)
+        unchanged = not_modified(request, etag)
+        if unchanged is not None:
+            return unchanged
+        
+        def site_query():
+            query = db.table("work_orders").select("*").eq("site_id", site_id)
+            if status:
+                query = query.eq("status", status)
+            return query
         
-        if status:
-            query = query.eq("status", status)
+        if stream:
+            streamed = ndjson_response(iter_keyset(
+                site_query, "created_date", "work_order_id", page_size=STREAM_PAGE_SIZE
+            ))
+            set_validators(streamed, etag)
+            return streamed
         
-        result = query.order("created_date", desc=True).execute()
+        result = await site_query().order("created_date", desc=True).execute()
         
+        set_validators(response, etag)
         return {
             "site_id": site_id,
             "work_orders": result.data,
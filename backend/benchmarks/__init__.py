@@ -0,0 +1,15 @@
+"""
+Groundswell - Benchmarks
+Offline performance harness: in-memory database, fake extractor and data generators
+"""
+
+from .memory_db import MemoryClient
+from .fake_extractor import FakeSignalExtractor
+from .generators import populate, generate_inspection_csv
+
+__all__ = [
+    "MemoryClient",
+    "FakeSignalExtractor",
+    "populate",
+    "generate_inspection_csv",
+]
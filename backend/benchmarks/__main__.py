@@ -0,0 +1,9 @@
+"""Run the offline benchmarks: python -m backend.benchmarks --help"""
+
+import sys
+
+from backend.benchmarks.runner import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Deterministic stand-in for the extraction model"""
+
+import asyncio
+import hashlib
+import re
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Optional
+
+from backend.agents import SignalExtractorAgent, NotePrefilter, ExtractionCache
+from backend.agents.note_prefilter import CLEAN_PATTERNS
+from backend.agents.signal_extractor import (
+    ExtractedSignal,
+    SignalExtractionResult,
+    NoteExtractionResult,
+    BatchSignalExtractionResult,
+)
+
+
+SEVERITIES = ("low", "medium", "high", "critical")
+
+# Keyword patterns for each signal type from the extraction prompt; a note
+# gets one fake signal per type whose keywords appear outside its clean phrases
+SIGNAL_PATTERNS = {
+    "missed_inspection": [
+        r"\bmissed\b",
+        r"\bskipped\b",
+        r"\bnot (?:performed|conducted|completed|done)\b",
+        r"\bno[- ]show\b",
+        r"\bcould not (?:access|inspect|complete)\b",
+    ],
+    "late_work_order": [
+        r"\b(?:late|overdue|past due|delayed|backlog(?:ged)?)\b",
+        r"\bstill (?:open|pending|waiting|outstanding)\b",
+    ],
+    "incomplete_task": [
+        r"\bneeds? (?:to be )?(?:replac\w*|repair\w*|fix\w*|servic\w*|attention|cleaning)\b",
+        r"\b(?:broken|damaged?|leak\w*|clogged|cracked|worn|stain\w*|mold|rust\w*|corro\w*)\b",
+        r"\bnot (?:working|functional|functioning|operational|cooling|heating|running)\b",
+        r"\b(?:out of order|malfunction\w*|inoperable|failed|failing)\b",
+        r"\bbulbs? (?:out|burnt|burned)\b",
+        r"\b(?:incomplete|unfinished|pending|deferred)\b",
+    ],
+    "doc_gap": [
+        r"\b(?:missing|incomplete|no|expired|outdated|unsigned) (?:documentation|records?|logs?|paperwork|certificat\w*|permits?|tags?|sign[- ]?offs?)\b",
+        r"\bnot (?:documented|logged|recorded|signed)\b",
+    ],
+    "sla_breach": [
+        r"\bsla\b",
+        r"\bresponse time\b",
+        r"\b(?:vendor|contractor|technician)s? (?:did not|didn't|never|failed|has not|hasn't|was late)\b",
+    ],
+    "safety_issue": [
+        r"\b(?:hazard\w*|unsafe|danger\w*|violation\w*|injur\w*|osha|non[- ]?complian\w*)\b",
+        r"\b(?:fire|exit|extinguisher|sprinkler|alarm|smoke detector|egress)\b",
+        r"\b(?:trip\w*|slip\w*|exposed wir\w*|blocked)\b",
+    ],
+}
+
+_NOTE_TAG = re.compile(r'<note id="(\d+)">\n(.*?)\n</note>', re.DOTALL)
+_SINGLE_NOTE = re.compile(r"\*\*Inspection Note:\*\*\n(.*?)\n\nExtract all", re.DOTALL)
+
+
+@dataclass
+class _FakeCost:
+    """Token counts in the shape of a pydantic_ai Cost"""
+    request_tokens: int
+    response_tokens: int
+    total_tokens: int
+
+
+@dataclass
+class _FakeRunResult:
+    data: object
+    _cost: _FakeCost
+
+    def cost(self) -> _FakeCost:
+        return self._cost
+
+
+class FakeSignalExtractor(SignalExtractorAgent):
+    """
+    SignalExtractorAgent whose model calls are answered locally
+
+    Pre-filtering, caching, batching and signal building are the real code
+    paths; only the model request is replaced. Each call sleeps
+    `latency_ms` (plus `per_note_ms` per note in the request) and returns
+    one signal per keyword category the note matches, with a severity and
+    confidence derived from a hash of the note, so results are stable
+    across runs.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        per_note_ms: float = 0.0,
+        cache: Optional[ExtractionCache] = None,
+        prefilter: Optional[NotePrefilter] = None
+    ):
+        """
+        Initialize the fake extractor
+
+        Args:
+            latency_ms: Simulated latency per model request
+            per_note_ms: Extra simulated latency per note in a request
+            cache: Extraction cache (defaults to a fresh in-memory cache)
+            prefilter: Clean-note classifier (defaults to EXTRACTION_PREFILTER setting)
+        """
+        super().__init__(
+            cache=cache if cache is not None else ExtractionCache(),
+            prefilter=prefilter
+        )
+        self.latency_seconds = latency_ms / 1000
+        self.per_note_seconds = per_note_ms / 1000
+        self.model_calls = 0
+        self._clean = [re.compile(p, re.IGNORECASE) for p in CLEAN_PATTERNS]
+        self._signals = {
+            signal_type: [re.compile(p, re.IGNORECASE) for p in patterns]
+            for signal_type, patterns in SIGNAL_PATTERNS.items()
+        }
+
+    async def _call_model(
+        self,
+        agent,
+        user_prompt: str,
+        mode: str,
+        request_slots: Optional[asyncio.Semaphore] = None,
+        parts=None
+    ):
+        """Answer a model request without the network"""
+        if mode == "batch":
+            notes = {int(note_id): text for note_id, text in _NOTE_TAG.findall(user_prompt)}
+        else:
+            match = _SINGLE_NOTE.search(user_prompt)
+            notes = {0: match.group(1) if match else user_prompt}
+
+        async with request_slots or nullcontext():
+            self.model_calls += 1
+            delay = self.latency_seconds + self.per_note_seconds * len(notes)
+            if delay:
+                await asyncio.sleep(delay)
+
+        results = {note_id: self.extract_locally(text) for note_id, text in notes.items()}
+        if mode == "batch":
+            data = BatchSignalExtractionResult(notes=[
+                NoteExtractionResult(note_id=note_id, signals=result.signals)
+                for note_id, result in results.items()
+            ])
+        else:
+            data = results[0]
+
+        request_tokens = len(user_prompt) // 4 + 400
+        response_tokens = 60 * sum(len(r.signals) for r in results.values()) + 10
+        return _FakeRunResult(data, _FakeCost(request_tokens, response_tokens, request_tokens + response_tokens))
+
+    def extract_locally(self, notes: str) -> SignalExtractionResult:
+        """Deterministic extraction result for one note"""
+        digest = hashlib.sha1(notes.encode("utf-8")).digest()
+        signals = [
+            ExtractedSignal(
+                signal_type=signal_type,
+                severity=SEVERITIES[(digest[idx % len(digest)] + idx) % len(SEVERITIES)],
+                confidence_score=0.6 + (digest[(idx + 7) % len(digest)] % 40) / 100,
+                evidence_quote=notes[:120],
+                explanation=f"Note mentions {signal_type.replace('_', ' ')} keywords"
+            )
+            for idx, signal_type in enumerate(self.matched_signal_types(notes))
+        ]
+        return SignalExtractionResult(signals=signals)
+
+    def matched_signal_types(self, notes: str) -> list[str]:
+        """Signal types whose keywords appear outside the clean phrases"""
+        residual = notes
+        for pattern in self._clean:
+            residual = pattern.sub(" ", residual)
+        return [
+            signal_type
+            for signal_type, patterns in self._signals.items()
+            if any(p.search(residual) for p in patterns)
+        ]
@@ -0,0 +1,222 @@
+"""
+Synthetic portfolio generators
+
+Scales the demo scenarios in seed_data.py up to benchmark sizes (10k sites
+and 1M signals for the full profile). Everything is derived from one seed,
+so two runs with the same arguments load identical data.
+"""
+
+import csv
+import io
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+
+from backend.agents import RiskScorerAgent, SignalBatch
+from backend.seed_data import NEGLECTED_SITE_NOTES, MANAGED_SITE_NOTES, LATE_HVAC_DESCRIPTION
+
+
+SITE_TYPES = ("retail", "healthcare", "hospitality", "commercial")
+REGIONS = ("Southwest", "Northeast", "Midwest", "Southeast", "West")
+SIGNAL_TYPES = ("missed_inspection", "late_work_order", "incomplete_task", "doc_gap", "sla_breach", "safety_issue")
+SEVERITIES = ("low", "medium", "high", "critical")
+SEVERITY_WEIGHTS = (0.45, 0.3, 0.18, 0.07)
+
+# Inspection notes for CSV uploads: the seed scenarios plus variations.
+# Roughly a third are clean, so the pre-filter path is exercised too.
+PROBLEM_NOTES = (
+    NEGLECTED_SITE_NOTES,
+    "Roof leak above stockroom still not repaired. Buckets in place. Vendor did not respond within SLA.",
+    "Fire extinguisher inspection tags expired. Sprinkler head blocked by stacked boxes.",
+    "Monthly generator test was skipped. No log entry for the last two cycles.",
+    "Walk-in freezer door gasket damaged and ice buildup noted. Needs replacement.",
+    "Parking lot lights out on the east side. Trip hazard from broken curb near entrance.",
+    "Restroom exhaust fan not working. Mold starting on ceiling above showers.",
+    "Elevator inspection certificate missing from cab. Maintenance records incomplete.",
+)
+CLEAN_NOTES = (
+    MANAGED_SITE_NOTES,
+    "Routine walkthrough completed. No issues found. All equipment operational.",
+    "Quarterly fire alarm test passed. Documentation is up to date.",
+)
+
+WORK_ORDER_TITLES = ("HVAC System Repair", "Roof Leak", "Lighting Replacement", "Plumbing Repair", "Door Hardware")
+
+
+def generate_sites(count: int, seed: int = 0) -> list[dict]:
+    """Site rows in the shape of Site.model_dump(mode="json")"""
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1).isoformat()
+    return [
+        {
+            "site_id": f"site_{i:06d}",
+            "name": f"{rng.choice(REGIONS)} {rng.choice(SITE_TYPES).title()} #{i}",
+            "location": f"{100 + i % 9000} Main St",
+            "site_type": SITE_TYPES[i % len(SITE_TYPES)],
+            "region": REGIONS[i % len(REGIONS)],
+            "status": "active",
+            "metadata": {},
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def generate_signals(
+    site_ids: list[str],
+    count: int,
+    now: datetime,
+    seed: int = 0,
+    horizon_days: int = 180,
+    resolved_fraction: float = 0.3
+) -> list[dict]:
+    """
+    Signal rows spread over `site_ids` with a long-tailed distribution
+
+    A few sites collect many signals and most have a handful, like a real
+    portfolio with some neglected regions.
+    """
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, len(site_ids) + 1) ** 0.8
+    site_index = rng.choice(len(site_ids), size=count, p=weights / weights.sum())
+    type_index = rng.integers(0, len(SIGNAL_TYPES), size=count)
+    severity_index = rng.choice(len(SEVERITIES), size=count, p=SEVERITY_WEIGHTS)
+    confidence = np.round(rng.uniform(0.6, 1.0, size=count), 2)
+    age_seconds = rng.integers(0, horizon_days * 86400, size=count)
+    resolved = rng.random(size=count) < resolved_fraction
+
+    # Shared, immutable-by-convention nested values keep 1M rows affordable
+    empty: dict = {}
+    evidence = {
+        signal_type: {"quote": f"Synthetic {signal_type.replace('_', ' ')} evidence"}
+        for signal_type in SIGNAL_TYPES
+    }
+    explanation = {signal_type: f"Synthetic {signal_type} signal" for signal_type in SIGNAL_TYPES}
+
+    rows = []
+    for i in range(count):
+        signal_type = SIGNAL_TYPES[type_index[i]]
+        detected = (now - timedelta(seconds=int(age_seconds[i]))).isoformat()
+        rows.append({
+            "signal_id": f"sig_{i:08d}",
+            "site_id": site_ids[site_index[i]],
+            "signal_type": signal_type,
+            "severity": SEVERITIES[severity_index[i]],
+            "detected_date": detected,
+            "confidence_score": float(confidence[i]),
+            "evidence": evidence[signal_type],
+            "explanation": explanation[signal_type],
+            "source_type": "inspection",
+            "source_id": None,
+            "resolved": bool(resolved[i]),
+            "resolved_date": detected if resolved[i] else None,
+            "metadata": empty,
+            "created_at": detected,
+        })
+    return rows
+
+
+def generate_work_orders(site_ids: list[str], per_site: int, now: datetime, seed: int = 0) -> list[dict]:
+    """Work order rows, about a quarter of them open and past due"""
+    rng = random.Random(seed)
+    rows = []
+    for site_id in site_ids:
+        for n in range(per_site):
+            created = now - timedelta(days=rng.randint(1, 90))
+            due = created + timedelta(days=rng.randint(1, 21))
+            status = "completed" if rng.random() < 0.6 else rng.choice(("open", "in_progress"))
+            rows.append({
+                "work_order_id": f"wo_{site_id}_{n}",
+                "site_id": site_id,
+                "vendor_id": None,
+                "title": rng.choice(WORK_ORDER_TITLES),
+                "description": LATE_HVAC_DESCRIPTION,
+                "priority": rng.choice(("low", "medium", "high")),
+                "status": status,
+                "created_date": created.isoformat(),
+                "due_date": due.isoformat(),
+                "completed_date": due.isoformat() if status == "completed" else None,
+                "estimated_cost": float(rng.randint(100, 5000)),
+                "actual_cost": None,
+                "metadata": {},
+                "created_at": created.isoformat(),
+                "updated_at": created.isoformat(),
+            })
+    return rows
+
+
+def generate_inspection_csv(site_ids: list[str], rows: int, seed: int = 0, unique_notes: bool = False) -> bytes:
+    """
+    CSV upload body for /api/inspections/ingest/csv
+
+    Notes repeat from a small corpus unless `unique_notes` is set, in which
+    case a row number is appended so every note misses the extraction cache.
+    """
+    rng = random.Random(seed)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["site_id", "inspector_name", "inspection_date", "notes", "status", "inspection_type"])
+    for i in range(rows):
+        notes = rng.choice(PROBLEM_NOTES) if rng.random() < 0.67 else rng.choice(CLEAN_NOTES)
+        if unique_notes:
+            notes = f"{notes} Ref {seed}-{i}."
+        writer.writerow([
+            rng.choice(site_ids),
+            "Benchmark Inspector",
+            (datetime(2026, 1, 1) + timedelta(hours=i)).isoformat(),
+            notes,
+            "completed",
+            "routine",
+        ])
+    return buffer.getvalue().encode("utf-8")
+
+
+def populate(
+    client,
+    sites: int,
+    signals: int,
+    work_orders_per_site: int = 2,
+    seed: int = 0,
+    now: Optional[datetime] = None
+) -> dict:
+    """
+    Load a synthetic portfolio into a MemoryClient
+
+    Current risk scores are computed from the generated signals with the
+    real scoring engine, as the nightly rescore would.
+
+    Returns:
+        Row counts per table and the generated site IDs
+    """
+    now = now or datetime.utcnow()
+    site_rows = generate_sites(sites, seed)
+    site_ids = [row["site_id"] for row in site_rows]
+    signal_rows = generate_signals(site_ids, signals, now, seed)
+
+    client.load("sites", site_rows)
+    client.load("execution_signals", signal_rows)
+    client.load("work_orders", generate_work_orders(site_ids, work_orders_per_site, now, seed))
+
+    active = [row for row in signal_rows if not row["resolved"]]
+    batch = SignalBatch.from_columns(
+        site_ids=[r["site_id"] for r in active],
+        signal_ids=[r["signal_id"] for r in active],
+        signal_types=[r["signal_type"] for r in active],
+        severities=[r["severity"] for r in active],
+        confidence_scores=[r["confidence_score"] for r in active],
+        detected_dates=[datetime.fromisoformat(r["detected_date"]) for r in active],
+        resolved=[False] * len(active)
+    )
+    scores = RiskScorerAgent().calculate_portfolio_risk(batch, site_ids=site_ids, now=now)
+    client.load("risk_scores", [score.model_dump(mode="json") for score in scores.values()])
+
+    return {
+        "site_ids": site_ids,
+        "sites": len(site_rows),
+        "signals": len(signal_rows),
+        "work_orders": len(site_ids) * work_orders_per_site,
+        "risk_scores": len(scores),
+    }
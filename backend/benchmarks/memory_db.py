@@ -0,0 +1,539 @@
+"""
+In-memory stand-in for the Supabase client
+
+Implements the subset of the PostgREST builder surface the app uses
+(select/insert/upsert/update/delete, comparison and logical filters,
+order/limit/range, exact counts), the `site_current_risk` projection,
+the `signal_breakdown`, `append_risk_scores` and `portfolio_version` RPCs
+and the `site_versions` triggers from schema.sql.
+It plugs in underneath the real AsyncClient via Database.set_async_client(), so
+benchmarks exercise the same thread pool and metrics path as production.
+Rows are indexed by primary key and site_id; anything else is a scan.
+"""
+
+import itertools
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional
+
+from postgrest.exceptions import APIError
+from backend.agents.ranking import descending, top_k
+from backend.db.pagination import split_logic, unquote
+from backend.timeutils import to_naive_utc
+
+
+PRIMARY_KEYS = {
+    "sites": "site_id",
+    "inspections": "inspection_id",
+    "vendors": "vendor_id",
+    "work_orders": "work_order_id",
+    "execution_signals": "signal_id",
+    "risk_scores": "risk_score_id",
+    "maintenance_watermarks": "name",
+    "site_versions": "site_id",
+}
+
+# Tables whose writes bump site_versions (see the triggers in schema.sql)
+SITE_VERSIONED_TABLES = {"sites", "inspections", "work_orders", "execution_signals", "risk_scores"}
+
+# Read-only here: maintained from risk_scores writes
+VIEWS = {"site_current_risk"}
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+@dataclass
+class MemoryResponse:
+    """Shape of a postgrest APIResponse"""
+    data: Any
+    count: Optional[int] = None
+
+
+def _coerce(value: Any) -> Any:
+    """Comparable form of a stored or filter value (ISO strings become naive UTC datetimes)"""
+    if isinstance(value, str) and _ISO_DATE.match(value):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return value
+        return to_naive_utc(parsed)
+    if isinstance(value, datetime):
+        return to_naive_utc(value)
+    return value
+
+
+def _align(stored: Any, value: Any) -> tuple[Any, Any]:
+    """Coerce a filter value to the stored value's type, as Postgres casts literals"""
+    stored, value = _coerce(stored), _coerce(value)
+    if isinstance(value, str) and not isinstance(stored, str):
+        if isinstance(stored, bool):
+            value = value.lower() == "true"
+        elif isinstance(stored, (int, float)):
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+    return stored, value
+
+
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+
+def _compare(op: str, column: str, value: Any) -> Callable[[dict], bool]:
+    """Row predicate for a comparison filter (NULL never matches)"""
+    compare = _OPERATORS[op]
+
+    def predicate(row: dict) -> bool:
+        stored = row.get(column)
+        if stored is None or value is None:
+            return False
+        try:
+            return compare(*_align(stored, value))
+        except TypeError:
+            return False
+
+    return predicate
+
+
+def _parse_logic(expression: str) -> Callable[[dict], bool]:
+    """Predicate for one PostgREST logic term: `col.op.value`, `and(...)` or `or(...)`"""
+    for combinator, combine in (("and(", all), ("or(", any)):
+        if expression.startswith(combinator) and expression.endswith(")"):
+            terms = [_parse_logic(t) for t in split_logic(expression[len(combinator):-1])]
+            return lambda row: combine(term(row) for term in terms)
+
+    column, op, value = expression.split(".", 2)
+    if op not in _OPERATORS:
+        raise APIError({"message": f"Unsupported operator in memory database: {op}", "code": "PGRST100"})
+    return _compare(op, column, unquote(value))
+
+
+class _Table:
+    """Rows of one table, indexed by primary key and site_id"""
+
+    def __init__(self, primary_key: str):
+        self.primary_key = primary_key
+        self.rows: dict[Any, dict] = {}
+        self.by_site: dict[Any, dict[Any, dict]] = defaultdict(dict)
+
+    def put(self, row: dict):
+        key = row[self.primary_key]
+        previous = self.rows.get(key)
+        if previous is not None and previous.get("site_id") != row.get("site_id"):
+            self.by_site[previous.get("site_id")].pop(key, None)
+        self.rows[key] = row
+        if "site_id" in row:
+            self.by_site[row["site_id"]][key] = row
+
+    def remove(self, key: Any) -> Optional[dict]:
+        row = self.rows.pop(key, None)
+        if row is not None and "site_id" in row:
+            self.by_site[row["site_id"]].pop(key, None)
+        return row
+
+
+class MemoryQuery:
+    """Single-use request builder over a MemoryClient table or view"""
+
+    def __init__(self, client: "MemoryClient", name: str):
+        self._client = client
+        self._name = name
+        self._action = "select"
+        self.http_method = "GET"
+        self._columns = "*"
+        self._count: Optional[str] = None
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+        self._ignore_duplicates = False
+        self._filters: list[Callable[[dict], bool]] = []
+        self._index_filters: list[tuple[str, list]] = []
+        self._order: list[tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+
+    # Actions
+
+    def select(self, *columns: str, count: Optional[str] = None, head: bool = False) -> "MemoryQuery":
+        self._columns = ",".join(columns) or "*"
+        self._count = count
+        self.http_method = "HEAD" if head else "GET"
+        return self
+
+    def insert(self, json: Any, count: Optional[str] = None, **_) -> "MemoryQuery":
+        return self._write("insert", json, count)
+
+    def upsert(
+        self,
+        json: Any,
+        count: Optional[str] = None,
+        ignore_duplicates: bool = False,
+        on_conflict: str = "",
+        **_
+    ) -> "MemoryQuery":
+        self._on_conflict = on_conflict or None
+        self._ignore_duplicates = ignore_duplicates
+        return self._write("upsert", json, count)
+
+    def update(self, json: dict, count: Optional[str] = None, **_) -> "MemoryQuery":
+        self.http_method = "PATCH"
+        return self._write("update", json, count)
+
+    def delete(self, count: Optional[str] = None, **_) -> "MemoryQuery":
+        self.http_method = "DELETE"
+        return self._write("delete", None, count)
+
+    def _write(self, action: str, payload: Any, count: Optional[str]) -> "MemoryQuery":
+        if self._name in VIEWS:
+            raise APIError({"message": f"View {self._name} is read-only", "code": "PGRST100"})
+        self._action = action
+        self._payload = payload
+        self._count = count
+        if self.http_method == "GET":
+            self.http_method = "POST"
+        return self
+
+    # Filters
+
+    def eq(self, column: str, value: Any) -> "MemoryQuery":
+        self._index_filters.append((column, [value]))
+        return self._filter(_compare("eq", column, value))
+
+    def neq(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(_compare("neq", column, value))
+
+    def gt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(_compare("gt", column, value))
+
+    def gte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(_compare("gte", column, value))
+
+    def lt(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(_compare("lt", column, value))
+
+    def lte(self, column: str, value: Any) -> "MemoryQuery":
+        return self._filter(_compare("lte", column, value))
+
+    def in_(self, column: str, values: Iterable[Any]) -> "MemoryQuery":
+        values = list(values)
+        self._index_filters.append((column, values))
+        predicates = [_compare("eq", column, value) for value in values]
+        return self._filter(lambda row: any(p(row) for p in predicates))
+
+    def is_(self, column: str, value: Any) -> "MemoryQuery":
+        if value in (None, "null"):
+            return self._filter(lambda row: row.get(column) is None)
+        return self._filter(lambda row: row.get(column) is _coerce_bool(value))
+
+    def or_(self, filters: str, **_) -> "MemoryQuery":
+        terms = [_parse_logic(term) for term in split_logic(filters)]
+        return self._filter(lambda row: any(term(row) for term in terms))
+
+    def _filter(self, predicate: Callable[[dict], bool]) -> "MemoryQuery":
+        self._filters.append(predicate)
+        return self
+
+    # Modifiers
+
+    def order(self, column: str, desc: bool = False, **_) -> "MemoryQuery":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int, **_) -> "MemoryQuery":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **_) -> "MemoryQuery":
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def execute(self) -> MemoryResponse:
+        """Run the statement against the client (after the simulated round trip)"""
+        self._client.simulate_latency()
+        with self._client.lock:
+            if self._action == "select":
+                return self._execute_select()
+            return self._execute_write()
+
+    # Evaluation
+
+    def _candidates(self) -> Iterable[dict]:
+        """Rows that can match, narrowed by a primary key or site_id filter when present"""
+        if self._name in VIEWS:
+            sites = self._client.table_rows("sites").rows
+            latest = self._client.latest_scores
+            for column, values in self._index_filters:
+                if column == "site_id":
+                    return [latest[v] for v in values if v in latest and v in sites]
+            return [row for site_id, row in latest.items() if site_id in sites]
+
+        table = self._client.table_rows(self._name)
+        for column, values in self._index_filters:
+            if column == table.primary_key:
+                return [table.rows[v] for v in values if v in table.rows]
+        for column, values in self._index_filters:
+            if column == "site_id":
+                return [row for v in values for row in table.by_site.get(v, {}).values()]
+        return table.rows.values()
+
+    def _matching(self) -> list[dict]:
+        return [row for row in self._candidates() if all(f(row) for f in self._filters)]
+
+    def _execute_select(self) -> MemoryResponse:
+        rows = self._matching()
+        count = len(rows) if self._count else None
+
+        if self._limit is None:
+            for column, desc in reversed(self._order):
+                rows.sort(key=lambda row: _sort_key(row.get(column)), reverse=desc)
+            rows = rows[self._offset:]
+        else:
+            # Like Postgres' top-N heapsort: keep only the rows the page needs
+            rows = top_k(rows, self._offset + self._limit, key=_order_key(self._order), reverse=False)[self._offset:]
+
+        if self.http_method == "HEAD":
+            return MemoryResponse(data=[], count=count)
+        return MemoryResponse(data=[_project(row, self._columns) for row in rows], count=count)
+
+    def _execute_write(self) -> MemoryResponse:
+        table = self._client.table_rows(self._name)
+        written: list[dict] = []
+        touched_sites: set = set()
+
+        if self._action in ("insert", "upsert"):
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            if self._on_conflict not in (None, table.primary_key):
+                raise APIError({"message": f"on_conflict={self._on_conflict} is not supported in memory", "code": "PGRST100"})
+
+            if self._action == "insert":
+                keys = [row[table.primary_key] for row in payload]
+                if len(set(keys)) != len(keys) or any(key in table.rows for key in keys):
+                    raise APIError({
+                        "message": f'duplicate key value violates unique constraint "{self._name}_pkey"',
+                        "code": "23505"
+                    })
+
+            for row in payload:
+                current = table.rows.get(row[table.primary_key])
+                if current is not None:
+                    if self._ignore_duplicates:
+                        continue
+                    row = {**current, **row}
+                    touched_sites.add(current.get("site_id"))
+                else:
+                    row = dict(row)
+                table.put(row)
+                written.append(row)
+
+        elif self._action == "update":
+            for row in self._matching():
+                touched_sites.add(row.get("site_id"))
+                updated = {**row, **self._payload}
+                table.put(updated)
+                written.append(updated)
+
+        else:
+            for row in self._matching():
+                table.remove(row[table.primary_key])
+                written.append(row)
+
+        touched_sites.update(row.get("site_id") for row in written)
+        self._client.after_write(self._name, written, touched_sites, deleted=self._action == "delete")
+        return MemoryResponse(
+            data=[dict(row) for row in written],
+            count=len(written) if self._count else None
+        )
+
+
+def _coerce_bool(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.lower() == "true"
+    return value
+
+
+def _sort_key(value: Any) -> tuple:
+    """Sort key with Postgres NULL placement (last ascending, first descending)"""
+    return (True, 0) if value is None else (False, _coerce(value))
+
+
+def _order_key(order: list[tuple[str, bool]]) -> Callable[[dict], Any]:
+    """Single ascending key for a multi-column ORDER BY"""
+    if len(order) == 1:
+        column, desc = order[0]
+        if desc:
+            return lambda row: descending(_sort_key(row.get(column)))
+        return lambda row: _sort_key(row.get(column))
+
+    return lambda row: tuple([
+        descending(_sort_key(row.get(column))) if desc else _sort_key(row.get(column))
+        for column, desc in order
+    ])
+
+
+def _project(row: dict, columns: str) -> dict:
+    if columns == "*":
+        return dict(row)
+    return {column: row.get(column) for column in (c.strip() for c in columns.split(",")) if column}
+
+
+class _MemoryRPC:
+    """Request builder for a Postgres function call"""
+
+    http_method = "POST"
+
+    def __init__(self, client: "MemoryClient", fn: str, params: dict):
+        self._client = client
+        self._fn = fn
+        self._params = params
+
+    def execute(self) -> MemoryResponse:
+        handler = getattr(self._client, f"_rpc_{self._fn}", None)
+        if handler is None:
+            raise APIError({"message": f"Function {self._fn} is not available in memory", "code": "PGRST202"})
+        self._client.simulate_latency()
+        with self._client.lock:
+            return MemoryResponse(data=handler(**self._params))
+
+
+class MemoryClient:
+    """
+    Thread-safe in-memory database with the Supabase client interface
+
+    Statements are serialized by one lock, like a single-connection
+    database. `latency_ms` is slept before every statement (outside the
+    lock) to stand in for the network round trip to PostgREST.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        """
+        Initialize an empty database
+
+        Args:
+            latency_ms: Simulated round trip per statement
+        """
+        self.latency_seconds = latency_ms / 1000
+        self.lock = threading.RLock()
+        self.tables = {name: _Table(pk) for name, pk in PRIMARY_KEYS.items()}
+        self.latest_scores: dict[str, dict] = {}
+        self._versions = itertools.count(1)
+        self._portfolio_version = 0
+        self.statements = 0
+
+    def table(self, name: str) -> MemoryQuery:
+        """Start a query against a table or view"""
+        if name not in self.tables and name not in VIEWS:
+            raise APIError({"message": f'relation "{name}" does not exist', "code": "42P01"})
+        return MemoryQuery(self, name)
+
+    def from_(self, name: str) -> MemoryQuery:
+        return self.table(name)
+
+    def rpc(self, fn: str, params: Optional[dict] = None) -> _MemoryRPC:
+        """Call one of the emulated Postgres functions"""
+        return _MemoryRPC(self, fn, params or {})
+
+    def table_rows(self, name: str) -> _Table:
+        return self.tables[name]
+
+    def simulate_latency(self):
+        self.statements += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+    def load(self, name: str, rows: Iterable[dict]):
+        """Bulk load rows without per-statement overhead (for generated data)"""
+        with self.lock:
+            table = self.tables[name]
+            loaded = []
+            for row in rows:
+                table.put(row)
+                loaded.append(row)
+            self.after_write(name, loaded, {row.get("site_id") for row in loaded})
+
+    def after_write(self, name: str, rows: list[dict], site_ids: set, deleted: bool = False):
+        """Emulate the schema triggers: site_current_risk and site versions"""
+        if name == "risk_scores":
+            if deleted:
+                self._refresh_latest_scores(site_ids)
+            else:
+                for row in rows:
+                    current = self.latest_scores.get(row["site_id"])
+                    if current is None or _coerce(row["calculated_date"]) >= _coerce(current["calculated_date"]):
+                        self.latest_scores[row["site_id"]] = row
+
+        site_ids = {site_id for site_id in site_ids if site_id is not None}
+        if name in SITE_VERSIONED_TABLES and site_ids:
+            version = next(self._versions)
+            now = datetime.utcnow().isoformat()
+            self._portfolio_version = version
+            versions = self.tables["site_versions"]
+            for site_id in site_ids:
+                versions.put({"site_id": site_id, "version": version, "updated_at": now})
+
+    def _refresh_latest_scores(self, site_ids: Iterable[str]):
+        scores = self.tables["risk_scores"]
+        for site_id in site_ids:
+            rows = scores.by_site.get(site_id, {}).values()
+            latest = max(rows, key=lambda row: _coerce(row["calculated_date"]), default=None)
+            if latest is None:
+                self.latest_scores.pop(site_id, None)
+            else:
+                self.latest_scores[site_id] = latest
+
+    def _rpc_portfolio_version(self) -> str:
+        """Latest site version; writes apply one at a time here, so it identifies the visible state"""
+        return str(self._portfolio_version)
+
+    def _rpc_append_risk_scores(self, p_scores: list[dict], p_expected: dict) -> list[str]:
+        """Python port of the append_risk_scores SQL function"""
+        conflicted = sorted({
+            row["site_id"]
+            for row in p_scores
+            if self.latest_scores.get(row["site_id"], {}).get("risk_score_id") != p_expected.get(row["site_id"])
+        })
+        self.load("risk_scores", [dict(row) for row in p_scores if row["site_id"] not in conflicted])
+        return conflicted
+
+    def _rpc_signal_breakdown(
+        self,
+        p_site_id: Optional[str] = None,
+        p_signal_type: Optional[str] = None,
+        p_severity: Optional[str] = None,
+        p_resolved: Optional[bool] = None,
+        p_top_sites: int = 10
+    ) -> list[dict]:
+        """Python port of the signal_breakdown SQL function"""
+        signals = self.tables["execution_signals"]
+        rows = signals.by_site.get(p_site_id, {}).values() if p_site_id else signals.rows.values()
+
+        by_type, by_severity, by_site = Counter(), Counter(), Counter()
+        total = 0
+        for row in rows:
+            if p_signal_type is not None and row.get("signal_type") != p_signal_type:
+                continue
+            if p_severity is not None and row.get("severity") != p_severity:
+                continue
+            if p_resolved is not None and row.get("resolved") != p_resolved:
+                continue
+            total += 1
+            by_type[row.get("signal_type")] += 1
+            by_severity[row.get("severity")] += 1
+            by_site[row.get("site_id")] += 1
+
+        result = [{"dimension": "total", "bucket": None, "signal_count": total}]
+        result += [{"dimension": "type", "bucket": k, "signal_count": v} for k, v in by_type.items()]
+        result += [{"dimension": "severity", "bucket": k, "signal_count": v} for k, v in by_severity.items()]
+        top_sites = top_k(by_site.items(), p_top_sites, key=lambda item: (-item[1], item[0]), reverse=False)
+        result += [{"dimension": "site", "bucket": k, "signal_count": v} for k, v in top_sites]
+        return result
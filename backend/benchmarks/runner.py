@@ -0,0 +1,358 @@
+"""
+Offline benchmark runner
+
+Loads a synthetic portfolio into the in-memory database, drives the real
+FastAPI app in-process with the fake extractor, and reports throughput and
+p50/p99 latency per scenario. With --baseline the results are compared to
+a previous run and the exit status is 1 when any scenario regressed.
+
+    python -m backend.benchmarks --scale small --save-baseline bench.json
+    python -m backend.benchmarks --scale small --baseline bench.json
+
+Absolute numbers reflect the in-memory stand-in, not Postgres; compare
+runs made on the same machine with the same arguments.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+
+SCALES = {
+    "small": {"sites": 1_000, "signals": 50_000},
+    "full": {"sites": 10_000, "signals": 1_000_000},
+}
+
+# Metrics compared against a baseline: (larger is better, tolerance multiplier).
+# Tail latency is noisier, so p99 gets twice the allowed slowdown.
+COMPARED_METRICS = {
+    "p50_ms": (False, 1.0),
+    "p99_ms": (False, 2.0),
+    "throughput_per_s": (True, 1.0),
+}
+
+# Latency changes smaller than this are noise, whatever the ratio
+MIN_LATENCY_DELTA_MS = 0.5
+
+
+@dataclass
+class Scenario:
+    """One benchmarked operation"""
+    name: str
+    operation: Callable[[int], Awaitable[None]]
+    iterations: int
+    concurrency: int = 1
+    items_per_operation: int = 1
+    setup: Optional[Callable[[], None]] = None
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies_ms: list[float] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    items: int = 0
+    errors: int = 0
+
+    def summary(self) -> dict:
+        latencies = np.asarray(self.latencies_ms)
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0.0, 0.0)
+        return {
+            "operations": len(self.latencies_ms),
+            "errors": self.errors,
+            "throughput_per_s": round(self.items / self.elapsed_seconds, 2) if self.elapsed_seconds else 0.0,
+            "p50_ms": round(float(p50), 3),
+            "p99_ms": round(float(p99), 3),
+            "mean_ms": round(float(latencies.mean()), 3) if len(latencies) else 0.0,
+        }
+
+
+async def run_scenario(scenario: Scenario) -> ScenarioResult:
+    """Run `iterations` operations with up to `concurrency` in flight"""
+    result = ScenarioResult(scenario.name)
+    counter = iter(range(scenario.iterations))
+
+    async def worker():
+        for i in counter:
+            if scenario.setup is not None:
+                scenario.setup()
+            start = time.perf_counter()
+            try:
+                await scenario.operation(i)
+            except Exception as e:
+                result.errors += 1
+                if result.errors == 1:
+                    print(f"  ! {scenario.name}: {e}", file=sys.stderr)
+            else:
+                result.items += scenario.items_per_operation
+            result.latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(max(1, scenario.concurrency))])
+    result.elapsed_seconds = time.perf_counter() - started
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Describe every metric that is worse than the baseline by more than `tolerance`"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        for metric, (higher_is_better, multiplier) in COMPARED_METRICS.items():
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            allowed = tolerance * multiplier
+            if higher_is_better:
+                worse = after < before * (1 - allowed)
+            else:
+                worse = after > before * (1 + allowed) and after - before > MIN_LATENCY_DELTA_MS
+            if worse:
+                regressions.append(f"{name}.{metric}: {before} -> {after} ({(after - before) / before:+.0%})")
+    return regressions
+
+
+def print_table(results: dict, baseline: Optional[dict] = None):
+    header = f"{'scenario':<34}{'ops':>7}{'err':>5}{'thru/s':>11}{'p50 ms':>10}{'p99 ms':>10}"
+    if baseline:
+        header += f"{'p50 vs base':>13}"
+    print(header)
+    print("-" * len(header))
+    for name, summary in results.items():
+        line = (
+            f"{name:<34}{summary['operations']:>7}{summary['errors']:>5}"
+            f"{summary['throughput_per_s']:>11.1f}{summary['p50_ms']:>10.2f}{summary['p99_ms']:>10.2f}"
+        )
+        previous = (baseline or {}).get("results", {}).get(name)
+        if previous and previous.get("p50_ms"):
+            line += f"{(summary['p50_ms'] - previous['p50_ms']) / previous['p50_ms']:>+13.0%}"
+        print(line)
+
+
+async def run_benchmarks(args) -> dict:
+    """Build the stand-ins, load data and run every selected scenario"""
+    import httpx
+
+    from backend.db.async_client import AsyncClient
+    from backend.db.config import Database, DB_MAX_WORKERS
+    from backend.benchmarks.memory_db import MemoryClient
+    from backend.benchmarks.fake_extractor import FakeSignalExtractor
+    from backend.benchmarks.generators import populate, generate_inspection_csv
+    from backend.agents import RiskScorerAgent, SignalBatch, SignalExtractorAgent, ExtractionCache, LLMReplayStore
+    from backend.models import ExecutionSignal, RiskScore
+    from backend.cache import read_cache
+    from backend.observability import register_cache
+    import backend.api.inspections as inspections_api
+    from backend.main import app
+
+    client = MemoryClient(latency_ms=args.db_latency_ms)
+    Database.set_client(client)
+    Database.set_async_client(AsyncClient(client, max_workers=DB_MAX_WORKERS))
+
+    print(f"Loading {args.sites} sites and {args.signals} signals...", file=sys.stderr)
+    loaded_at = time.perf_counter()
+    data = populate(client, sites=args.sites, signals=args.signals, seed=args.seed)
+    print(f"Loaded in {time.perf_counter() - loaded_at:.1f}s", file=sys.stderr)
+
+    if args.llm_replay:
+        # Recorded production responses, replayed with their recorded latency
+        extractor = SignalExtractorAgent(
+            cache=ExtractionCache(),
+            replay=LLMReplayStore(args.llm_replay, mode="replay", latency_ms=None)
+        )
+    else:
+        extractor = FakeSignalExtractor(latency_ms=args.llm_latency_ms, per_note_ms=args.llm_per_note_ms)
+    inspections_api.signal_extractor = extractor
+    register_cache("extraction", extractor.cache)
+
+    site_ids = data["site_ids"]
+    rng = random.Random(args.seed)
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+    etags: dict[str, str] = {}
+
+    async def get(url: str, headers: Optional[dict] = None, expect: tuple = (200,)):
+        response = await http.get(url, headers=headers)
+        if response.status_code not in expect:
+            raise RuntimeError(f"GET {url} -> {response.status_code}: {response.text[:200]}")
+        return response
+
+    async def at_risk(_):
+        await get("/api/sites/at-risk?min_score=50&limit=50")
+
+    async def site_detail(_):
+        await get(f"/api/sites/{rng.choice(site_ids)}")
+
+    async def site_history(_):
+        site_id = rng.choice(site_ids[:200])
+        response = await get(f"/api/sites/{site_id}/history?limit=50")
+        etags[site_id] = response.headers.get("etag", "")
+
+    async def site_history_not_modified(_):
+        site_id = rng.choice(list(etags))
+        await get(f"/api/sites/{site_id}/history?limit=50", headers={"If-None-Match": etags[site_id]}, expect=(304,))
+
+    async def breakdown_site(_):
+        await get(f"/api/signals/breakdown?site_id={rng.choice(site_ids)}")
+
+    async def breakdown_portfolio(_):
+        await get("/api/signals/breakdown")
+
+    async def ingest_csv(i):
+        body = generate_inspection_csv(site_ids, args.csv_rows, seed=args.seed + i)
+        response = await http.post(
+            "/api/inspections/ingest/csv",
+            content=body,
+            headers={"Content-Type": "text/csv"}
+        )
+        if response.status_code != 200 or response.json()["inspections_failed"]:
+            raise RuntimeError(f"CSV ingest -> {response.status_code}: {response.text[:200]}")
+
+    # Scoring inputs, built once so only the scoring engine is timed
+    scorer = RiskScorerAgent()
+    busiest = max(site_ids[:50], key=lambda s: len(client.tables["execution_signals"].by_site.get(s, {})))
+    site_signals = [ExecutionSignal(**row) for row in client.tables["execution_signals"].by_site[busiest].values()]
+    previous_score = RiskScore(**client.latest_scores[busiest])
+    delta_signals = site_signals[:5]
+    portfolio_batch = SignalBatch.from_rows(client.tables["execution_signals"].rows.values())
+    current_scores = [RiskScore(**row) for row in client.latest_scores.values()]
+    decaying_scorer = RiskScorerAgent(recency_mode="exponential")
+    decaying_scores = list(decaying_scorer.calculate_portfolio_risk(portfolio_batch, site_ids=site_ids).values())
+
+    async def score_site(_):
+        scorer.calculate_site_risk(busiest, site_signals)
+
+    async def score_delta(_):
+        scorer.apply_signal_delta(busiest, previous_score, added=delta_signals)
+
+    async def score_portfolio(_):
+        scorer.calculate_portfolio_risk(portfolio_batch, site_ids=site_ids)
+
+    async def rank_top(_):
+        scorer.rank_sites(current_scores, limit=100)
+
+    async def age_scores(_):
+        aged_at = datetime.utcnow() + timedelta(days=1)
+        for score in decaying_scores:
+            decaying_scorer.age_score(score, aged_at)
+
+    n = args.iterations
+    scenarios = [
+        Scenario("GET at-risk (cold cache)", at_risk, max(5, n // 10), setup=read_cache.clear),
+        Scenario("GET at-risk (warm cache)", at_risk, n, concurrency=args.concurrency),
+        Scenario("GET site", site_detail, n, concurrency=args.concurrency),
+        Scenario("GET site history", site_history, n, concurrency=args.concurrency),
+        Scenario("GET site history (304)", site_history_not_modified, n, concurrency=args.concurrency),
+        Scenario("GET breakdown (site)", breakdown_site, n, concurrency=args.concurrency),
+        Scenario("GET breakdown (portfolio, cold)", breakdown_portfolio, max(3, n // 40), setup=read_cache.clear),
+        Scenario("POST ingest/csv", ingest_csv, args.csv_uploads, items_per_operation=args.csv_rows),
+        Scenario("RiskScorer.calculate_site_risk", score_site, n),
+        Scenario("RiskScorer.apply_signal_delta", score_delta, n),
+        Scenario("RiskScorer.calculate_portfolio_risk", score_portfolio, 3),
+        Scenario("RiskScorer.rank_sites (top 100)", rank_top, n),
+        Scenario("RiskScorer.age_score (portfolio)", age_scores, 3, items_per_operation=len(decaying_scores)),
+    ]
+    if args.only:
+        scenarios = [s for s in scenarios if any(term.lower() in s.name.lower() for term in args.only)]
+
+    results = {}
+    try:
+        for scenario in scenarios:
+            print(f"Running {scenario.name}...", file=sys.stderr)
+            results[scenario.name] = (await run_scenario(scenario)).summary()
+    finally:
+        await http.aclose()
+
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "config": {
+            "sites": args.sites,
+            "signals": args.signals,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "csv_rows": args.csv_rows,
+            "db_latency_ms": args.db_latency_ms,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_per_note_ms": args.llm_per_note_ms,
+            "llm_replay": bool(args.llm_replay),
+            "seed": args.seed,
+        },
+        "model_calls": extractor.replay.replayed if args.llm_replay else extractor.model_calls,
+        "db_statements": client.statements,
+        "results": results,
+    }
+
+
+def parse_args(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Offline Groundswell benchmarks")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Data size preset")
+    parser.add_argument("--sites", type=int, help="Override the number of sites")
+    parser.add_argument("--signals", type=int, help="Override the number of signals")
+    parser.add_argument("--iterations", type=int, default=200, help="Operations per read scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests for read scenarios")
+    parser.add_argument("--csv-rows", type=int, default=200, help="Rows per CSV upload")
+    parser.add_argument("--csv-uploads", type=int, default=5, help="CSV uploads to time")
+    parser.add_argument("--db-latency-ms", type=float, default=1.0, help="Simulated round trip per statement")
+    parser.add_argument("--llm-latency-ms", type=float, default=250.0, help="Simulated latency per model request")
+    parser.add_argument("--llm-per-note-ms", type=float, default=20.0, help="Extra model latency per note in a request")
+    parser.add_argument("--llm-replay", help="Replay extraction from an LLM_REPLAY_MODE=record file instead of the fake extractor")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", nargs="*", help="Run scenarios whose name contains any of these terms")
+    parser.add_argument("--json", dest="json_path", help="Write the full results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous results file")
+    parser.add_argument("--save-baseline", help="Write the results as a new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before failing")
+    args = parser.parse_args(argv)
+
+    scale = SCALES[args.scale]
+    args.sites = args.sites or scale["sites"]
+    args.signals = args.signals or scale["signals"]
+    return args
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+
+    # The app reads these at import time; keep benchmarks off real services
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark-not-used")
+    os.environ.setdefault("JOB_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="groundswell-bench-"), "jobs.sqlite3"))
+    os.environ["EXTRACTION_CACHE_PATH"] = ""
+
+    report = asyncio.run(run_benchmarks(args))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print("warning: baseline was recorded with different settings", file=sys.stderr)
+
+    print()
+    print_table(report["results"], baseline)
+
+    for path in (args.json_path, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(report["results"], baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+    return 0
@@ -0,0 +1,14 @@
+"""
+Groundswell - Caching
+In-process caches shared by agents and API routes
+"""
+
+from .lru import TTLCache
+from .read_cache import ReadThroughCache, read_cache, invalidate_site_reads
+
+__all__ = [
+    "TTLCache",
+    "ReadThroughCache",
+    "read_cache",
+    "invalidate_site_reads",
+]
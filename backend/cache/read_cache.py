@@ -0,0 +1,135 @@
+"""Read-through cache with tag invalidation and request coalescing"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+from .lru import TTLCache
+
+
+# Tags for cached site and signal reads
+SCORES_TAG = "scores"
+SIGNALS_TAG = "signals"
+
+
+def site_tag(site_id: str) -> str:
+    """Site details and current score of one site"""
+    return f"site:{site_id}"
+
+
+def site_signals_tag(site_id: str) -> str:
+    """Signal aggregates filtered to one site"""
+    return f"signals:{site_id}"
+
+
+class ReadThroughCache:
+    """
+    Caches the results of async loaders under tags that writes invalidate
+
+    Every tag has a generation counter. An entry records the generations of
+    its tags when its load started and is only served while they are all
+    unchanged, so invalidation is O(1) per tag and a load that races with a
+    write can never be served after it. Concurrent misses for the same key
+    (and generation) share one in-flight load. Invalidation is local to this
+    process; the TTL bounds staleness across processes.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 30.0):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum cached results (least recently used are evicted)
+            ttl_seconds: Result lifetime in seconds
+        """
+        self.entries = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._generations: dict[str, int] = {}
+        self._in_flight: dict[tuple, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls) -> "ReadThroughCache":
+        """Build a cache from READ_CACHE_* settings (size 0 disables caching)"""
+        return cls(
+            max_entries=int(os.getenv("READ_CACHE_SIZE", "2048")),
+            ttl_seconds=float(os.getenv("READ_CACHE_TTL_SECONDS", "30"))
+        )
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served without a backend query"""
+        lookups = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / lookups if lookups else 0.0
+
+    def _snapshot(self, tags: tuple[str, ...]) -> tuple[int, ...]:
+        return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        tags: Iterable[str],
+        loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Return the cached value for `key`, loading it on a miss
+
+        Args:
+            key: Cache key (include every parameter the result depends on)
+            tags: Invalidation tags the result depends on
+            loader: Coroutine function producing the value; errors are not cached
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        tags = tuple(tags)
+        generations = self._snapshot(tags)
+
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == generations:
+            self.hits += 1
+            return entry[1]
+
+        flight_key = (key, generations)
+        task = self._in_flight.get(flight_key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # The load runs as its own task so a cancelled caller does not
+            # abort it for the others waiting on the same key
+            task = asyncio.ensure_future(loader())
+            self._in_flight[flight_key] = task
+            task.add_done_callback(lambda t: self._finish_load(t, key, flight_key))
+
+        return await asyncio.shield(task)
+
+    def _finish_load(self, task: asyncio.Task, key: Hashable, flight_key: tuple):
+        """Store a completed load; failed loads are not cached"""
+        self._in_flight.pop(flight_key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.entries.set(key, (flight_key[1], task.result()))
+
+    def invalidate(self, *tags: str):
+        """Invalidate every entry that depends on any of `tags`"""
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def clear(self):
+        """Drop all entries"""
+        self.entries.clear()
+
+
+# Shared by API routes and the services that write signals and scores
+read_cache = ReadThroughCache.from_env()
+
+
+def invalidate_site_reads(site_ids: Iterable[str]):
+    """Invalidate cached reads affected by signal or score writes for these sites"""
+    tags = [SCORES_TAG, SIGNALS_TAG]
+    for site_id in site_ids:
+        tags.append(site_tag(site_id))
+        tags.append(site_signals_tag(site_id))
+    read_cache.invalidate(*tags)
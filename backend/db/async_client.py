@@ -0,0 +1,103 @@
+"""
+Non-blocking database access for async route handlers
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from backend.observability import DB_IN_FLIGHT, record_db_query
+
+# HTTP methods PostgREST uses for reads; everything else writes
+READ_METHODS = {"GET", "HEAD"}
+
+
+class AsyncQuery:
+    """
+    Chainable query builder whose execute() is awaitable
+
+    Wraps a Supabase/PostgREST request builder. Filter and modifier calls are
+    forwarded to the underlying builder unchanged; only execute(), which does
+    the network round trip, is offloaded to the database thread pool.
+    Each round trip is recorded as a db_read or db_write stage timing.
+    """
+
+    def __init__(
+        self,
+        builder: Any,
+        executor: ThreadPoolExecutor,
+        table: Optional[str] = None,
+        operation: Optional[str] = None
+    ):
+        self._builder = builder
+        self._executor = executor
+        self._table = table
+        self._operation = operation
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def chain(*args, **kwargs):
+            return AsyncQuery(attr(*args, **kwargs), self._executor, self._table, self._operation)
+
+        return chain
+
+    async def execute(self):
+        """Run the query without blocking the event loop"""
+        operation = self._operation
+        if operation is None:
+            method = getattr(self._builder, "http_method", "GET")
+            operation = "read" if method in READ_METHODS else "write"
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        failed = False
+        DB_IN_FLIGHT.inc()
+        try:
+            return await loop.run_in_executor(self._executor, self._builder.execute)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            DB_IN_FLIGHT.dec()
+            record_db_query(operation, self._table, time.perf_counter() - start, failed)
+
+
+class AsyncClient:
+    """
+    Async facade over the synchronous Supabase client
+
+    Blocking calls run on a bounded thread pool so a slow query only occupies
+    one worker thread instead of stalling every request on the event loop.
+    """
+
+    def __init__(self, client: Any, max_workers: int):
+        self._client = client
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="db"
+        )
+
+    def table(self, table_name: str) -> AsyncQuery:
+        """Start a query against a table"""
+        return AsyncQuery(self._client.table(table_name), self._executor, table_name)
+
+    def rpc(self, fn: str, params: Optional[dict] = None, operation: str = "read") -> AsyncQuery:
+        """Call a Postgres function (`operation` classifies it for metrics)"""
+        return AsyncQuery(self._client.rpc(fn, params or {}), self._executor, fn, operation)
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run an arbitrary blocking callable on the database thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def aclose(self):
+        """Shut down the worker threads (shared interface with PostgresClient)"""
+        self.close()
+
+    def close(self):
+        """Shut down the worker threads"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,177 @@
+"""
+Chunked multi-row writes with per-row error reporting
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Hashable, Iterable, Optional
+
+from postgrest.exceptions import APIError
+
+
+# Rows per insert/upsert statement
+BULK_WRITE_CHUNK_SIZE = int(os.getenv("BULK_WRITE_CHUNK_SIZE", "500"))
+
+# SQLSTATE classes caused by the rows themselves (22: data exception,
+# 23: integrity constraint violation); only these are worth bisecting
+ROW_ERROR_CLASSES = ("22", "23")
+
+
+@dataclass
+class RowError:
+    """A row that could not be written"""
+    table: str
+    key: Any
+    refs: list
+    error: str
+
+
+@dataclass
+class BulkWriteResult:
+    """Outcome of a BulkWriter flush"""
+    written: dict[str, list[dict]] = field(default_factory=dict)
+    errors: list[RowError] = field(default_factory=list)
+    failed: dict[Hashable, str] = field(default_factory=dict)
+    statements: int = 0
+
+    def rows(self, table: str) -> list[dict]:
+        """Rows the database returned for `table` (for ignore_duplicates, only inserted ones)"""
+        return self.written.get(table, [])
+
+
+@dataclass
+class _Group:
+    """Pending rows for one (table, conflict handling) combination"""
+    table: str
+    on_conflict: Optional[str]
+    ignore_duplicates: bool
+    default_to_null: bool
+    rows: dict[Any, dict] = field(default_factory=dict)
+    refs: dict[Any, list] = field(default_factory=dict)
+
+
+def _is_row_error(error: Exception) -> bool:
+    """True if the failure comes from a row's contents rather than the connection"""
+    return isinstance(error, APIError) and str(error.code or "")[:2] in ROW_ERROR_CLASSES
+
+
+class BulkWriter:
+    """
+    Buffers rows from many source documents and writes them in few statements
+
+    Rows are grouped per table and conflict setting, de-duplicated on the
+    conflict key (a later row replaces an earlier one, or the first is kept
+    with ignore_duplicates) and written as multi-row upserts of up to
+    `chunk_size` rows. Tables are flushed in the order they were first
+    added, so parents can be added before the rows that reference them.
+
+    When a chunk fails on bad data, it is split in half and retried until the
+    offending rows are isolated; every other row is still written. Each
+    failure is reported per row and against the `ref` given when the row was
+    added (e.g. the source document), and rows whose ref already failed in an
+    earlier table are skipped. Connection-level errors fail the whole chunk
+    without retries.
+    """
+
+    def __init__(self, db, chunk_size: int = BULK_WRITE_CHUNK_SIZE):
+        """
+        Initialize the writer
+
+        Args:
+            db: Async database client
+            chunk_size: Maximum rows per statement
+        """
+        self.db = db
+        self.chunk_size = max(1, chunk_size)
+        self._groups: dict[tuple, _Group] = {}
+
+    def add(
+        self,
+        table: str,
+        rows: Iterable[dict],
+        ref: Hashable = None,
+        on_conflict: Optional[str] = None,
+        ignore_duplicates: bool = False,
+        default_to_null: bool = True
+    ):
+        """
+        Queue rows for writing
+
+        Args:
+            table: Target table
+            rows: Rows in the shape of model_dump(mode="json")
+            ref: Identifies the source of these rows in the flush result
+            on_conflict: Comma-separated conflict columns; None inserts plainly
+            ignore_duplicates: Keep existing rows instead of updating them
+            default_to_null: Treat keys missing from a row as NULL (else column default)
+        """
+        group_key = (table, on_conflict, ignore_duplicates, default_to_null)
+        group = self._groups.get(group_key)
+        if group is None:
+            group = self._groups[group_key] = _Group(table, on_conflict, ignore_duplicates, default_to_null)
+
+        conflict_columns = [c.strip() for c in on_conflict.split(",")] if on_conflict else None
+        for row in rows:
+            if conflict_columns is None:
+                key = len(group.rows)
+            else:
+                key = tuple(row.get(c) for c in conflict_columns)
+
+            # One statement cannot touch the same conflict key twice
+            if key not in group.rows or not ignore_duplicates:
+                group.rows[key] = row
+            group.refs.setdefault(key, []).append(ref)
+
+    @property
+    def pending(self) -> int:
+        """Rows queued and not yet flushed"""
+        return sum(len(group.rows) for group in self._groups.values())
+
+    async def flush(self) -> BulkWriteResult:
+        """Write every queued row and report what was stored and what failed"""
+        result = BulkWriteResult()
+        groups, self._groups = self._groups, {}
+
+        for group in groups.values():
+            keys = [
+                key for key in group.rows
+                if not all(ref is not None and ref in result.failed for ref in group.refs[key])
+            ]
+            for start in range(0, len(keys), self.chunk_size):
+                await self._write_chunk(group, keys[start:start + self.chunk_size], result)
+
+        return result
+
+    def _statement(self, group: _Group, rows: list[dict]):
+        table = self.db.table(group.table)
+        if group.on_conflict is None:
+            return table.insert(rows, default_to_null=group.default_to_null)
+        return table.upsert(
+            rows,
+            on_conflict=group.on_conflict,
+            ignore_duplicates=group.ignore_duplicates,
+            default_to_null=group.default_to_null
+        )
+
+    async def _write_chunk(self, group: _Group, keys: list, result: BulkWriteResult):
+        """Write one chunk, bisecting on row-level errors"""
+        result.statements += 1
+        try:
+            response = await self._statement(group, [group.rows[key] for key in keys]).execute()
+        except Exception as e:
+            if len(keys) > 1 and _is_row_error(e):
+                middle = len(keys) // 2
+                await self._write_chunk(group, keys[:middle], result)
+                await self._write_chunk(group, keys[middle:], result)
+                return
+
+            message = getattr(e, "message", None) or str(e)
+            for key in keys:
+                refs = group.refs[key]
+                result.errors.append(RowError(group.table, key, refs, message))
+                for ref in refs:
+                    if ref is not None:
+                        result.failed.setdefault(ref, f"{group.table}: {message}")
+            return
+
+        result.written.setdefault(group.table, []).extend(response.data)
@@ -3,14 +3,26 @@ Database configuration and utilities
 """
 
 import os
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Union
 from supabase import create_client, Client
 
+from backend.db.async_client import AsyncClient
+
+if TYPE_CHECKING:
+    from backend.db.postgres import PostgresClient
+
+# Backends for async route handlers, selected with DATABASE_BACKEND
+BACKENDS = ("supabase", "postgres")
+
+# Worker threads behind the async wrapper of the Supabase client
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "16"))
+
 
 class Database:
     """Database connection manager for Supabase"""
     
     _instance: Optional[Client] = None
+    _async_instance = None
     
     @classmethod
     def get_client(cls) -> Client:
@@ -28,7 +40,69 @@ class Database:
         
         return cls._instance
     
+    @classmethod
+    def get_async_client(cls) -> Union[AsyncClient, "PostgresClient"]:
+        """
+        Get or create the non-blocking client used by async route handlers
+        
+        DATABASE_BACKEND=supabase (the default) wraps the Supabase REST client;
+        DATABASE_BACKEND=postgres connects to DATABASE_URL directly through a
+        pooled asyncpg client with the same query interface. The choice
+        depends on the env var alone; use set_async_client() to inject a
+        different client.
+        """
+        if cls._async_instance is None:
+            backend = os.getenv("DATABASE_BACKEND", "supabase").lower()
+            if backend not in BACKENDS:
+                raise ValueError(f"DATABASE_BACKEND must be one of {', '.join(BACKENDS)}")
+            
+            if backend == "postgres":
+                cls._async_instance = cls._create_postgres_client()
+            else:
+                cls._async_instance = AsyncClient(cls.get_client(), max_workers=DB_MAX_WORKERS)
+        
+        return cls._async_instance
+    
+    @staticmethod
+    def _create_postgres_client() -> "PostgresClient":
+        # Imported here so Supabase-only deployments do not need asyncpg
+        from backend.db.postgres import PostgresClient
+        
+        dsn = os.getenv("DATABASE_URL")
+        if not dsn:
+            raise ValueError("DATABASE_URL must be set when DATABASE_BACKEND=postgres")
+        
+        return PostgresClient(
+            dsn,
+            min_size=int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            max_size=int(os.getenv("DB_POOL_MAX_SIZE", "16")),
+            statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+        )
+    
+    @classmethod
+    def set_client(cls, client: Client):
+        """Use `client` in place of the Supabase client (local stand-ins and benchmarks)"""
+        cls.reset()
+        cls._instance = client
+    
+    @classmethod
+    def set_async_client(cls, client: Union[AsyncClient, "PostgresClient"]):
+        """Use `client` for async route handlers whatever DATABASE_BACKEND says (stand-ins, benchmarks and tests)"""
+        if cls._async_instance is not None and cls._async_instance is not client:
+            cls._async_instance.close()
+        cls._async_instance = client
+    
+    @classmethod
+    async def aclose(cls):
+        """Release the async client's connections or worker threads on shutdown"""
+        if cls._async_instance is not None:
+            await cls._async_instance.aclose()
+        cls._async_instance = None
+    
     @classmethod
     def reset(cls):
         """Reset the client (useful for testing)"""
+        if cls._async_instance is not None:
+            cls._async_instance.close()
         cls._instance = None
+        cls._async_instance = None
@@ -0,0 +1,146 @@
+"""
+Keyset (cursor) pagination helpers for PostgREST queries
+"""
+
+import base64
+import json
+from typing import Any, AsyncIterator, Callable, Optional
+
+
+def encode_cursor(row: dict, sort_column: str, tie_column: str) -> str:
+    """Opaque cursor pointing just past `row`"""
+    payload = json.dumps([row[sort_column], row[tie_column]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, Any]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, tie_value = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    return sort_value, tie_value
+
+
+def _quote(value: Any) -> str:
+    """Quote a value for use inside a PostgREST logical filter"""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def unquote(value: str) -> str:
+    """Inverse of _quote for a value taken from a PostgREST logical filter"""
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        value = value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def split_logic(text: str) -> list[str]:
+    """Split a PostgREST logic list on commas outside parentheses and quotes"""
+    parts, depth, quoted, current = [], 0, False, []
+    escaped = False
+    for char in text:
+        if escaped:
+            current.append(char)
+            escaped = False
+            continue
+        if char == "\\":
+            current.append(char)
+            escaped = True
+            continue
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+def keyset_page(
+    query,
+    sort_column: str,
+    tie_column: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    desc: bool = True
+):
+    """
+    Restrict a query to one page in (sort_column, tie_column) order
+
+    One extra row is requested so split_page() can tell whether another page
+    follows. With an index on the filter columns plus both keys, each page
+    is an index range scan whose cost does not depend on how many rows came
+    before it.
+
+    Args:
+        query: Filtered select query
+        sort_column: Primary ordering column
+        tie_column: Unique column that breaks ties in sort_column
+        limit: Page size
+        cursor: Cursor from the previous page, if any
+        desc: Newest first when True
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if cursor:
+        sort_value, tie_value = decode_cursor(cursor)
+        op = "lt" if desc else "gt"
+        query = query.or_(
+            f"{sort_column}.{op}.{_quote(sort_value)},"
+            f"and({sort_column}.eq.{_quote(sort_value)},{tie_column}.{op}.{_quote(tie_value)})"
+        )
+
+    return query.order(sort_column, desc=desc).order(tie_column, desc=desc).limit(limit + 1)
+
+
+def split_page(rows: list[dict], limit: int, sort_column: str, tie_column: str) -> tuple[list[dict], Optional[str]]:
+    """Trim the look-ahead row and return (page rows, next cursor or None)"""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1], sort_column, tie_column)
+
+
+async def iter_keyset(
+    make_query: Callable[[], Any],
+    sort_column: str,
+    tie_column: str,
+    page_size: int,
+    cursor: Optional[str] = None,
+    desc: bool = True
+) -> AsyncIterator[dict]:
+    """
+    Yield every row of an async query, one keyset page at a time
+
+    Args:
+        make_query: Returns a fresh filtered select query (builders are single-use)
+        sort_column: Primary ordering column
+        tie_column: Unique column that breaks ties in sort_column
+        page_size: Rows fetched per round trip
+        cursor: Cursor to resume from, if any
+        desc: Newest first when True
+    """
+    while True:
+        query = keyset_page(make_query(), sort_column, tie_column, page_size, cursor=cursor, desc=desc)
+        result = await query.execute()
+        rows, cursor = split_page(result.data, page_size, sort_column, tie_column)
+
+        for row in rows:
+            yield row
+
+        if cursor is None:
+            return
@@ -0,0 +1,604 @@
+"""
+Direct PostgreSQL backend (DATABASE_BACKEND=postgres)
+
+Exposes the same chainable query interface as AsyncClient, so routers and
+services run unchanged, but compiles each builder chain to SQL and runs it
+on an asyncpg connection pool instead of sending a PostgREST HTTP request.
+asyncpg prepares each distinct statement once per connection and caches it,
+and rows come back in the binary protocol, so a repeated query skips both
+JSON encoding and planning. Statements take their values as parameters,
+never as SQL text, so page sizes, IDs and cursors all reuse one prepared
+statement per query shape.
+"""
+
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Optional
+from uuid import UUID
+
+import asyncpg
+from postgrest.exceptions import APIError
+
+from backend.db.pagination import split_logic, unquote
+from backend.observability import DB_IN_FLIGHT, record_db_query
+from backend.timeutils import to_naive_utc
+
+# PostgREST filter operators and their SQL spelling
+OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+# Postgres caps a statement at 32767 bind parameters
+MAX_PARAMETERS = 32767
+
+_RELATION_SQL = """
+SELECT a.attname, t.typname, COALESCE(i.indisprimary, false) AS is_primary
+FROM pg_attribute a
+JOIN pg_type t ON t.oid = a.atttypid
+LEFT JOIN pg_index i
+    ON i.indrelid = a.attrelid AND i.indisprimary AND a.attnum = ANY(i.indkey)
+WHERE a.attrelid = to_regclass($1) AND a.attnum > 0 AND NOT a.attisdropped
+ORDER BY a.attnum
+"""
+
+
+@dataclass
+class QueryResult:
+    """Rows in the shape of a postgrest APIResponse"""
+    data: Any
+    count: Optional[int] = None
+
+
+@dataclass
+class _Relation:
+    """Column types (pg_type names) and primary key of a table or view"""
+    types: dict[str, str]
+    primary_key: tuple[str, ...]
+
+
+class _Params:
+    """Collects bind parameters and hands out $n placeholders"""
+
+    def __init__(self):
+        self.values: list[Any] = []
+
+    def add(self, value: Any) -> str:
+        self.values.append(value)
+        return f"${len(self.values)}"
+
+
+def _ident(name: str) -> str:
+    """Quote an identifier"""
+    return '"' + name.strip().replace('"', '""') + '"'
+
+
+def _column_list(columns: str) -> str:
+    """SQL select list from a PostgREST column string ("*" or "a,b,c")"""
+    names = [c.strip() for c in columns.split(",") if c.strip()]
+    if not names or names == ["*"]:
+        return "*"
+    return ", ".join(_ident(name) for name in names)
+
+
+def _to_param(value: Any, type_name: Optional[str]) -> Any:
+    """
+    Convert a JSON-style value (as PostgREST would receive it) to the Python
+    type asyncpg's binary codec expects for `type_name`
+
+    Raises:
+        ValueError: If the value cannot be read as that type
+    """
+    if value is None or type_name is None:
+        return value
+    if type_name.startswith("_"):
+        return [_to_param(item, type_name[1:]) for item in value]
+    if type_name in ("timestamptz", "timestamp"):
+        moment = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+        if type_name == "timestamptz":
+            return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+        return to_naive_utc(moment)
+    if type_name == "date":
+        return value if isinstance(value, date) else date.fromisoformat(str(value))
+    if type_name in ("float4", "float8"):
+        return float(value)
+    if type_name in ("int2", "int4", "int8"):
+        return int(value)
+    if type_name == "numeric":
+        return Decimal(str(value))
+    if type_name == "bool":
+        if isinstance(value, str):
+            return value.lower() in ("true", "t", "1")
+        return bool(value)
+    if type_name in ("text", "varchar", "bpchar"):
+        return value if isinstance(value, str) else str(value)
+    return value
+
+
+def _json_value(value: Any) -> Any:
+    """Decoded column value in the form PostgREST would have returned it"""
+    if value is None or isinstance(value, (str, int, float, dict)):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, list):
+        return [_json_value(item) for item in value]
+    return value
+
+
+def _rows(records: Iterable[asyncpg.Record]) -> list[dict]:
+    return [{key: _json_value(value) for key, value in record.items()} for record in records]
+
+
+def _parse_term(expression: str) -> tuple:
+    """Filter tree for one PostgREST logic term: `col.op.value`, `and(...)` or `or(...)`"""
+    for combinator in ("and", "or"):
+        if expression.startswith(f"{combinator}(") and expression.endswith(")"):
+            inner = expression[len(combinator) + 1:-1]
+            return (combinator, [_parse_term(term) for term in split_logic(inner)])
+
+    column, op, value = expression.split(".", 2)
+    if op == "in":
+        return ("in", column, [unquote(item) for item in split_logic(value.strip("()"))])
+    if op == "is":
+        return ("is", column, value)
+    if op not in OPERATORS:
+        raise APIError({"message": f"Unsupported filter operator: {op}", "code": "PGRST100"})
+    return ("cmp", column, op, unquote(value))
+
+
+def _compile_filter(term: tuple, types: dict[str, str], params: _Params) -> str:
+    kind = term[0]
+    if kind in ("and", "or"):
+        joiner = f" {kind.upper()} "
+        return "(" + joiner.join(_compile_filter(t, types, params) for t in term[1]) + ")"
+
+    column = term[1]
+    type_name = types.get(column)
+    if kind == "in":
+        values = [_to_param(value, type_name) for value in term[2]]
+        return f"{_ident(column)} = ANY({params.add(values)})"
+    if kind == "is":
+        value = term[2]
+        if value in (None, "null"):
+            return f"{_ident(column)} IS NULL"
+        truth = value if isinstance(value, bool) else str(value).lower() == "true"
+        return f"{_ident(column)} IS {'TRUE' if truth else 'FALSE'}"
+
+    _, _, op, value = term
+    return f"{_ident(column)} {OPERATORS[op]} {params.add(_to_param(value, type_name))}"
+
+
+class PostgresQuery:
+    """
+    Single-use request builder compiled to SQL on execute()
+
+    Mirrors the subset of the postgrest-py builder the app uses: select,
+    insert, upsert, update and delete with eq/neq/gt/gte/lt/lte/in_/is_/or_
+    filters, order, limit and range. Results are QueryResult objects whose
+    rows hold JSON-style values, exactly as the PostgREST client returns them.
+    """
+
+    def __init__(
+        self,
+        client: "PostgresClient",
+        relation: str,
+        rpc_params: Optional[dict] = None,
+        operation: Optional[str] = None
+    ):
+        self._client = client
+        self._relation = relation
+        self._rpc_params = rpc_params
+        self._operation = operation
+        self._action = "rpc" if rpc_params is not None else "select"
+        self._columns = "*"
+        self._count: Optional[str] = None
+        self._head = False
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+        self._ignore_duplicates = False
+        self._default_to_null = True
+        self._returning = True
+        self._filters: list[tuple] = []
+        self._order: list[tuple[str, bool, Optional[bool]]] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+
+    # Statements
+
+    def select(self, *columns: str, count: Optional[str] = None, head: bool = False) -> "PostgresQuery":
+        if self._action != "rpc":
+            self._action = "select"
+        self._columns = ",".join(columns) or "*"
+        self._count = count
+        self._head = head
+        return self
+
+    def insert(
+        self,
+        json: Any,
+        count: Optional[str] = None,
+        returning: Any = "representation",
+        upsert: bool = False,
+        default_to_null: bool = True
+    ) -> "PostgresQuery":
+        return self._write("upsert" if upsert else "insert", json, count, returning, default_to_null)
+
+    def upsert(
+        self,
+        json: Any,
+        count: Optional[str] = None,
+        returning: Any = "representation",
+        ignore_duplicates: bool = False,
+        on_conflict: str = "",
+        default_to_null: bool = True
+    ) -> "PostgresQuery":
+        self._on_conflict = on_conflict or None
+        self._ignore_duplicates = ignore_duplicates
+        return self._write("upsert", json, count, returning, default_to_null)
+
+    def update(self, json: dict, count: Optional[str] = None, returning: Any = "representation") -> "PostgresQuery":
+        return self._write("update", json, count, returning, True)
+
+    def delete(self, count: Optional[str] = None, returning: Any = "representation") -> "PostgresQuery":
+        return self._write("delete", None, count, returning, True)
+
+    def _write(self, action: str, payload: Any, count: Optional[str], returning: Any, default_to_null: bool) -> "PostgresQuery":
+        self._action = action
+        self._payload = payload
+        self._count = count
+        self._returning = getattr(returning, "value", returning) != "minimal"
+        self._default_to_null = default_to_null
+        return self
+
+    # Filters
+
+    def eq(self, column: str, value: Any) -> "PostgresQuery":
+        return self._compare(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "PostgresQuery":
+        return self._compare(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "PostgresQuery":
+        return self._compare(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "PostgresQuery":
+        return self._compare(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "PostgresQuery":
+        return self._compare(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "PostgresQuery":
+        return self._compare(column, "lte", value)
+
+    def match(self, query: dict) -> "PostgresQuery":
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    def in_(self, column: str, values: Iterable[Any]) -> "PostgresQuery":
+        self._filters.append(("in", column, list(values)))
+        return self
+
+    def is_(self, column: str, value: Any) -> "PostgresQuery":
+        self._filters.append(("is", column, value))
+        return self
+
+    def or_(self, filters: str, reference_table: Optional[str] = None) -> "PostgresQuery":
+        self._filters.append(("or", [_parse_term(term) for term in split_logic(filters)]))
+        return self
+
+    def _compare(self, column: str, op: str, value: Any) -> "PostgresQuery":
+        self._filters.append(("cmp", column, op, value))
+        return self
+
+    # Modifiers
+
+    def order(self, column: str, desc: bool = False, nullsfirst: Optional[bool] = None, **_) -> "PostgresQuery":
+        self._order.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int, **_) -> "PostgresQuery":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **_) -> "PostgresQuery":
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    # Execution
+
+    async def execute(self) -> QueryResult:
+        """Compile and run the statement on a pooled connection"""
+        operation = self._operation or ("read" if self._action in ("select", "rpc") else "write")
+        start = time.perf_counter()
+        failed = False
+        DB_IN_FLIGHT.inc()
+        try:
+            async with self._client.acquire() as conn:
+                if self._action == "select":
+                    return await self._execute_select(conn)
+                if self._action == "rpc":
+                    return await self._execute_rpc(conn)
+                if self._action in ("insert", "upsert"):
+                    return await self._execute_insert(conn)
+                return await self._execute_modify(conn)
+        except asyncpg.PostgresError as e:
+            failed = True
+            raise APIError({
+                "message": str(e),
+                "code": e.sqlstate,
+                "details": getattr(e, "detail", None),
+                "hint": getattr(e, "hint", None)
+            }) from e
+        except (ValueError, TypeError) as e:
+            failed = True
+            raise APIError({"message": f"Invalid value: {e}", "code": "22P02"}) from e
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            DB_IN_FLIGHT.dec()
+            record_db_query(operation, self._relation, time.perf_counter() - start, failed)
+
+    def _where(self, types: dict[str, str], params: _Params) -> str:
+        if not self._filters:
+            return ""
+        return " WHERE " + " AND ".join(_compile_filter(term, types, params) for term in self._filters)
+
+    def _order_by(self) -> str:
+        if not self._order:
+            return ""
+        terms = []
+        for column, desc, nullsfirst in self._order:
+            term = f"{_ident(column)} {'DESC' if desc else 'ASC'}"
+            if nullsfirst is not None:
+                term += " NULLS FIRST" if nullsfirst else " NULLS LAST"
+            terms.append(term)
+        return " ORDER BY " + ", ".join(terms)
+
+    def _page(self, params: _Params) -> str:
+        sql = ""
+        if self._limit is not None:
+            sql += f" LIMIT {params.add(self._limit)}"
+        if self._offset:
+            sql += f" OFFSET {params.add(self._offset)}"
+        return sql
+
+    async def _execute_select(self, conn: asyncpg.Connection) -> QueryResult:
+        relation = await self._client.relation(conn, self._relation)
+        source = _ident(self._relation)
+
+        params = _Params()
+        where = self._where(relation.types, params)
+
+        count = None
+        if self._count:
+            count = await conn.fetchval(f"SELECT count(*) FROM {source}{where}", *params.values)
+        if self._head:
+            return QueryResult(data=[], count=count)
+
+        sql = f"SELECT {_column_list(self._columns)} FROM {source}{where}{self._order_by()}{self._page(params)}"
+        return QueryResult(data=_rows(await conn.fetch(sql, *params.values)), count=count)
+
+    async def _execute_rpc(self, conn: asyncpg.Connection) -> QueryResult:
+        params = _Params()
+        arguments = ", ".join(
+            f"{_ident(name)} => {params.add(value)}" for name, value in self._rpc_params.items()
+        )
+        source = f"{_ident(self._relation)}({arguments}) AS {_ident(self._relation)}"
+        where = self._where({}, params)
+
+        sql = f"SELECT {_column_list(self._columns)} FROM {source}{where}{self._order_by()}{self._page(params)}"
+        rows = _rows(await conn.fetch(sql, *params.values))
+
+        # Scalar functions come back as one column named after the function;
+        # PostgREST returns the bare value for those
+        if len(rows) == 1 and list(rows[0]) == [self._relation]:
+            return QueryResult(data=rows[0][self._relation])
+        return QueryResult(data=rows, count=len(rows) if self._count else None)
+
+    async def _execute_insert(self, conn: asyncpg.Connection) -> QueryResult:
+        relation = await self._client.relation(conn, self._relation)
+        rows = self._payload if isinstance(self._payload, list) else [self._payload]
+        if not rows:
+            return QueryResult(data=[], count=0 if self._count else None)
+
+        # With default_to_null=False a missing key means "use the column
+        # default", so rows with different key sets need separate statements
+        if self._default_to_null:
+            groups = {tuple(dict.fromkeys(key for row in rows for key in row)): rows}
+        else:
+            groups: dict[tuple, list[dict]] = {}
+            for row in rows:
+                groups.setdefault(tuple(row), []).append(row)
+
+        written: list[dict] = []
+        async with conn.transaction():
+            for columns, group in groups.items():
+                for statement, values in self._insert_statements(relation, columns, group):
+                    if self._returning:
+                        written.extend(_rows(await conn.fetch(statement, *values)))
+                    else:
+                        await conn.execute(statement, *values)
+
+        return QueryResult(data=written, count=len(written) if self._count else None)
+
+    def _insert_statements(self, relation: _Relation, columns: tuple, rows: list[dict]):
+        """
+        Yield (sql, parameters) for inserting `rows`
+
+        Rows are sent column-wise through unnest(), one array parameter per
+        column, so the statement text (and its prepared plan) is the same
+        for any batch size. Array-typed columns cannot go through unnest
+        (it would flatten them), so tables with one fall back to multi-row
+        VALUES, split to stay under the bind parameter limit.
+        """
+        types = relation.types
+        target = f"{_ident(self._relation)} ({', '.join(_ident(c) for c in columns)})"
+        conflict = self._conflict_clause(relation, columns)
+        returning = " RETURNING *" if self._returning else ""
+
+        if not any(types.get(c, "").startswith("_") for c in columns):
+            params = _Params()
+            arrays = ", ".join(
+                f"{params.add([_to_param(row.get(c), types.get(c)) for row in rows])}::{types.get(c, 'text')}[]"
+                for c in columns
+            )
+            yield f"INSERT INTO {target} SELECT * FROM unnest({arrays}){conflict}{returning}", params.values
+            return
+
+        per_statement = max(1, MAX_PARAMETERS // len(columns))
+        for start in range(0, len(rows), per_statement):
+            params = _Params()
+            tuples = ", ".join(
+                "(" + ", ".join(params.add(_to_param(row.get(c), types.get(c))) for c in columns) + ")"
+                for row in rows[start:start + per_statement]
+            )
+            yield f"INSERT INTO {target} VALUES {tuples}{conflict}{returning}", params.values
+
+    def _conflict_clause(self, relation: _Relation, columns: tuple) -> str:
+        if self._action != "upsert":
+            return ""
+        keys = (
+            tuple(c.strip() for c in self._on_conflict.split(","))
+            if self._on_conflict else relation.primary_key
+        )
+        target = ", ".join(_ident(key) for key in keys)
+        updates = [c for c in columns if c not in keys]
+        if self._ignore_duplicates or not updates:
+            return f" ON CONFLICT ({target}) DO NOTHING"
+        assignments = ", ".join(f"{_ident(c)} = EXCLUDED.{_ident(c)}" for c in updates)
+        return f" ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+
+    async def _execute_modify(self, conn: asyncpg.Connection) -> QueryResult:
+        if not self._filters:
+            # PostgREST refuses unfiltered updates and deletes as well
+            raise APIError({"message": f"{self._action.upper()} requires a WHERE clause", "code": "21000"})
+
+        relation = await self._client.relation(conn, self._relation)
+        params = _Params()
+        if self._action == "update":
+            assignments = ", ".join(
+                f"{_ident(column)} = {params.add(_to_param(value, relation.types.get(column)))}"
+                for column, value in self._payload.items()
+            )
+            sql = f"UPDATE {_ident(self._relation)} SET {assignments}"
+        else:
+            sql = f"DELETE FROM {_ident(self._relation)}"
+
+        sql += self._where(relation.types, params)
+        if not self._returning:
+            await conn.execute(sql, *params.values)
+            return QueryResult(data=[])
+
+        rows = _rows(await conn.fetch(sql + " RETURNING *", *params.values))
+        return QueryResult(data=rows, count=len(rows) if self._count else None)
+
+
+async def _init_connection(conn: asyncpg.Connection):
+    """Decode json/jsonb to Python objects, as the PostgREST client does"""
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name,
+            encoder=json.dumps,
+            decoder=json.loads,
+            schema="pg_catalog"
+        )
+
+
+class PostgresClient:
+    """
+    Pooled asyncpg client with the AsyncClient interface
+
+    The pool is opened lazily on the first query, inside the running event
+    loop. Column types and primary keys are read from the catalog once per
+    table so JSON-style values from model_dump(mode="json") can be bound in
+    the binary protocol.
+    """
+
+    def __init__(self, dsn: str, min_size: int = 2, max_size: int = 16, statement_cache_size: int = 256):
+        """
+        Initialize the client
+
+        Args:
+            dsn: PostgreSQL connection URL
+            min_size: Connections opened up front
+            max_size: Upper bound on pooled connections
+            statement_cache_size: Prepared statements cached per connection
+                (0 when connecting through a transaction-mode pooler)
+        """
+        self._dsn = dsn
+        self._min_size = min_size
+        self._max_size = max_size
+        self._statement_cache_size = statement_cache_size
+        self._pool: Optional[asyncpg.Pool] = None
+        self._pool_lock = asyncio.Lock()
+        self._relations: dict[str, _Relation] = {}
+
+    def table(self, table_name: str) -> PostgresQuery:
+        """Start a query against a table or view"""
+        return PostgresQuery(self, table_name)
+
+    def rpc(self, fn: str, params: Optional[dict] = None, operation: str = "read") -> PostgresQuery:
+        """Call a Postgres function (`operation` classifies it for metrics)"""
+        return PostgresQuery(self, fn, rpc_params=params or {}, operation=operation)
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run an arbitrary blocking callable off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, fn, *args)
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(
+                        self._dsn,
+                        min_size=self._min_size,
+                        max_size=self._max_size,
+                        statement_cache_size=self._statement_cache_size,
+                        init=_init_connection
+                    )
+        return self._pool
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow a pooled connection"""
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            yield conn
+
+    async def relation(self, conn: asyncpg.Connection, name: str) -> _Relation:
+        """Column types and primary key of `name`, cached after the first lookup"""
+        relation = self._relations.get(name)
+        if relation is None:
+            records = await conn.fetch(_RELATION_SQL, name)
+            if not records:
+                raise APIError({"message": f'relation "{name}" does not exist', "code": "42P01"})
+            relation = _Relation(
+                types={r["attname"]: r["typname"] for r in records},
+                primary_key=tuple(r["attname"] for r in records if r["is_primary"])
+            )
+            self._relations[name] = relation
+        return relation
+
+    async def aclose(self):
+        """Close pooled connections gracefully"""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    def close(self):
+        """Drop pooled connections immediately"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
@@ -92,19 +92,324 @@ CREATE TABLE IF NOT EXISTS risk_scores (
     trend TEXT NOT NULL,
     breakdown JSONB DEFAULT '{}',
     metadata JSONB DEFAULT '{}',
+    decay_key DOUBLE PRECISION,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Progress markers for background maintenance jobs
+CREATE TABLE IF NOT EXISTS maintenance_watermarks (
+    name TEXT PRIMARY KEY,
+    watermark TIMESTAMP WITH TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Change counter per site, used as the ETag validator for site reads
+-- Bumped by the triggers below on every write to a site or its rows; values
+-- come from one sequence, so a site's version never repeats
+CREATE SEQUENCE IF NOT EXISTS site_version_seq;
+
+CREATE TABLE IF NOT EXISTS site_versions (
+    site_id TEXT PRIMARY KEY,
+    version BIGINT NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Current risk per site: the latest risk_scores row for each site, kept up
+-- to date by the triggers below so reads never scan score history. Columns
+-- match risk_scores, so rows can be used as RiskScore records directly
+CREATE TABLE IF NOT EXISTS site_current_risk (
+    risk_score_id TEXT NOT NULL,
+    site_id TEXT PRIMARY KEY REFERENCES sites(site_id) ON DELETE CASCADE,
+    score FLOAT NOT NULL,
+    calculated_date TIMESTAMP WITH TIME ZONE NOT NULL,
+    contributing_signals TEXT[] NOT NULL,
+    explanation TEXT NOT NULL,
+    trend TEXT NOT NULL,
+    breakdown JSONB DEFAULT '{}',
+    metadata JSONB DEFAULT '{}',
+    decay_key DOUBLE PRECISION,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- decay_key (exponential recency mode) for databases created before it
+ALTER TABLE risk_scores ADD COLUMN IF NOT EXISTS decay_key DOUBLE PRECISION;
+ALTER TABLE site_current_risk ADD COLUMN IF NOT EXISTS decay_key DOUBLE PRECISION;
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_inspections_site_id ON inspections(site_id);
 CREATE INDEX IF NOT EXISTS idx_inspections_date ON inspections(inspection_date DESC);
 CREATE INDEX IF NOT EXISTS idx_work_orders_site_id ON work_orders(site_id);
 CREATE INDEX IF NOT EXISTS idx_work_orders_status ON work_orders(status);
 CREATE INDEX IF NOT EXISTS idx_work_orders_due_date ON work_orders(due_date);
+CREATE INDEX IF NOT EXISTS idx_work_orders_site_created ON work_orders(site_id, created_date DESC, work_order_id DESC);
 CREATE INDEX IF NOT EXISTS idx_execution_signals_site_id ON execution_signals(site_id);
 CREATE INDEX IF NOT EXISTS idx_execution_signals_resolved ON execution_signals(resolved);
+CREATE INDEX IF NOT EXISTS idx_execution_signals_breakdown ON execution_signals(site_id, signal_type, severity, resolved);
+CREATE INDEX IF NOT EXISTS idx_execution_signals_site_history ON execution_signals(site_id, detected_date DESC, signal_id DESC);
 CREATE INDEX IF NOT EXISTS idx_risk_scores_site_id ON risk_scores(site_id);
 CREATE INDEX IF NOT EXISTS idx_risk_scores_calculated_date ON risk_scores(calculated_date DESC);
+CREATE INDEX IF NOT EXISTS idx_risk_scores_site_history ON risk_scores(site_id, calculated_date DESC, risk_score_id DESC);
+CREATE INDEX IF NOT EXISTS idx_site_current_risk_rank ON site_current_risk(score DESC, site_id);
+CREATE INDEX IF NOT EXISTS idx_site_current_risk_decay_rank ON site_current_risk(decay_key DESC, site_id)
+    WHERE decay_key IS NOT NULL;
+
+-- Signal breakdown aggregation (GET /api/signals/breakdown)
+-- Returns one row per (dimension, bucket): dimension is 'total', 'type',
+-- 'severity' or 'site'; site rows are limited to the top p_top_sites
+CREATE OR REPLACE FUNCTION signal_breakdown(
+    p_site_id TEXT DEFAULT NULL,
+    p_signal_type TEXT DEFAULT NULL,
+    p_severity TEXT DEFAULT NULL,
+    p_resolved BOOLEAN DEFAULT NULL,
+    p_top_sites INTEGER DEFAULT 10
+)
+RETURNS TABLE (dimension TEXT, bucket TEXT, signal_count BIGINT)
+LANGUAGE sql STABLE
+AS $$
+    WITH grouped AS (
+        SELECT
+            CASE
+                WHEN GROUPING(signal_type) = 0 THEN 'type'
+                WHEN GROUPING(severity) = 0 THEN 'severity'
+                WHEN GROUPING(site_id) = 0 THEN 'site'
+                ELSE 'total'
+            END AS dimension,
+            COALESCE(signal_type, severity, site_id) AS bucket,
+            COUNT(*) AS signal_count
+        FROM execution_signals
+        WHERE (p_site_id IS NULL OR site_id = p_site_id)
+          AND (p_signal_type IS NULL OR signal_type = p_signal_type)
+          AND (p_severity IS NULL OR severity = p_severity)
+          AND (p_resolved IS NULL OR resolved = p_resolved)
+        GROUP BY GROUPING SETS ((signal_type), (severity), (site_id), ())
+    )
+    SELECT dimension, bucket, signal_count
+    FROM grouped
+    WHERE dimension <> 'site'
+    UNION ALL
+    (
+        SELECT dimension, bucket, signal_count
+        FROM grouped
+        WHERE dimension = 'site'
+        ORDER BY signal_count DESC, bucket
+        LIMIT p_top_sites
+    );
+$$;
+
+-- Site version maintenance
+-- Statement-level triggers with transition tables: a multi-row write takes
+-- one version from the sequence and stamps each affected site with it.
+-- nextval never blocks, so writers to different sites commit in parallel
+CREATE OR REPLACE FUNCTION bump_site_versions(changed TEXT[])
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    next_version BIGINT;
+BEGIN
+    IF cardinality(changed) = 0 THEN
+        RETURN;
+    END IF;
+
+    next_version := nextval('site_version_seq');
+
+    INSERT INTO site_versions (site_id, version, updated_at)
+    SELECT site_id, next_version, NOW()
+    FROM unnest(changed) AS c(site_id)
+    ON CONFLICT (site_id) DO UPDATE
+        SET version = EXCLUDED.version, updated_at = EXCLUDED.updated_at;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION bump_site_versions_new()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM bump_site_versions(ARRAY(
+        SELECT DISTINCT site_id FROM changed_rows WHERE site_id IS NOT NULL
+    ));
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION bump_site_versions_old()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM bump_site_versions(ARRAY(
+        SELECT DISTINCT site_id FROM removed_rows WHERE site_id IS NOT NULL
+    ));
+    RETURN NULL;
+END;
+$$;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['sites', 'inspections', 'work_orders', 'execution_signals', 'risk_scores'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %1$s_version_insert ON %1$I', t);
+        EXECUTE format('CREATE TRIGGER %1$s_version_insert AFTER INSERT ON %1$I '
+                       'REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT '
+                       'EXECUTE FUNCTION bump_site_versions_new()', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS %1$s_version_update ON %1$I', t);
+        EXECUTE format('CREATE TRIGGER %1$s_version_update AFTER UPDATE ON %1$I '
+                       'REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT '
+                       'EXECUTE FUNCTION bump_site_versions_new()', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS %1$s_version_delete ON %1$I', t);
+        EXECUTE format('CREATE TRIGGER %1$s_version_delete AFTER DELETE ON %1$I '
+                       'REFERENCING OLD TABLE AS removed_rows FOR EACH STATEMENT '
+                       'EXECUTE FUNCTION bump_site_versions_old()', t);
+    END LOOP;
+END;
+$$;
+
+-- Validator for portfolio-wide reads: a digest of every visible site
+-- version. Sequence values are not assigned in commit order (a writer can
+-- commit version 10 after another committed 11), so max(version) could stay
+-- put while a write becomes visible; the digest changes whenever any
+-- site's version does. Costs one scan of site_versions (a row per site)
+-- and takes no locks, so it adds no contention between writers
+CREATE OR REPLACE FUNCTION portfolio_version()
+RETURNS TEXT
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COUNT(*) || '.' || COALESCE(SUM(hashtextextended(site_id || ':' || version, 0)), 0)
+    FROM site_versions;
+$$;
+
+-- site_current_risk maintenance
+-- Inserts (the normal, append-only path) upsert the newest row per site
+-- from the statement, keeping the stored row if it is newer. Updates and
+-- deletes of score history recompute the affected sites from risk_scores.
+CREATE OR REPLACE FUNCTION refresh_site_current_risk_new()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO site_current_risk (
+        risk_score_id, site_id, score, calculated_date, contributing_signals,
+        explanation, trend, breakdown, metadata, decay_key, created_at
+    )
+    SELECT DISTINCT ON (site_id)
+        risk_score_id, site_id, score, calculated_date, contributing_signals,
+        explanation, trend, breakdown, metadata, decay_key, created_at
+    FROM new_scores
+    ORDER BY site_id, calculated_date DESC, risk_score_id DESC
+    ON CONFLICT (site_id) DO UPDATE SET
+        risk_score_id = EXCLUDED.risk_score_id,
+        score = EXCLUDED.score,
+        calculated_date = EXCLUDED.calculated_date,
+        contributing_signals = EXCLUDED.contributing_signals,
+        explanation = EXCLUDED.explanation,
+        trend = EXCLUDED.trend,
+        breakdown = EXCLUDED.breakdown,
+        metadata = EXCLUDED.metadata,
+        decay_key = EXCLUDED.decay_key,
+        created_at = EXCLUDED.created_at
+    WHERE (site_current_risk.calculated_date, site_current_risk.risk_score_id)
+        <= (EXCLUDED.calculated_date, EXCLUDED.risk_score_id);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION refresh_site_current_risk_old()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    affected TEXT[];
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        affected := ARRAY(SELECT site_id FROM old_scores UNION SELECT site_id FROM new_scores);
+    ELSE
+        affected := ARRAY(SELECT DISTINCT site_id FROM old_scores);
+    END IF;
+
+    DELETE FROM site_current_risk WHERE site_id = ANY(affected);
+
+    INSERT INTO site_current_risk (
+        risk_score_id, site_id, score, calculated_date, contributing_signals,
+        explanation, trend, breakdown, metadata, decay_key, created_at
+    )
+    SELECT
+        latest.risk_score_id, latest.site_id, latest.score, latest.calculated_date,
+        latest.contributing_signals, latest.explanation, latest.trend,
+        latest.breakdown, latest.metadata, latest.decay_key, latest.created_at
+    FROM unnest(affected) AS a(site_id)
+    CROSS JOIN LATERAL (
+        SELECT *
+        FROM risk_scores r
+        WHERE r.site_id = a.site_id
+        ORDER BY r.calculated_date DESC, r.risk_score_id DESC
+        LIMIT 1
+    ) latest
+    WHERE EXISTS (SELECT 1 FROM sites s WHERE s.site_id = a.site_id);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS risk_scores_current_insert ON risk_scores;
+CREATE TRIGGER risk_scores_current_insert AFTER INSERT ON risk_scores
+    REFERENCING NEW TABLE AS new_scores FOR EACH STATEMENT
+    EXECUTE FUNCTION refresh_site_current_risk_new();
+
+DROP TRIGGER IF EXISTS risk_scores_current_update ON risk_scores;
+CREATE TRIGGER risk_scores_current_update AFTER UPDATE ON risk_scores
+    REFERENCING OLD TABLE AS old_scores NEW TABLE AS new_scores FOR EACH STATEMENT
+    EXECUTE FUNCTION refresh_site_current_risk_old();
+
+DROP TRIGGER IF EXISTS risk_scores_current_delete ON risk_scores;
+CREATE TRIGGER risk_scores_current_delete AFTER DELETE ON risk_scores
+    REFERENCING OLD TABLE AS old_scores FOR EACH STATEMENT
+    EXECUTE FUNCTION refresh_site_current_risk_old();
+
+-- Compare-and-append for incremental score updates (RiskScoreMaintainer)
+-- Appends each site's new score only if the site's current score is still
+-- the one the update was computed from (p_expected maps site_id to that
+-- risk_score_id, null for a site without a score). Per-site advisory locks,
+-- taken in sorted order, serialize concurrent appends from any process.
+-- Returns the sites that were skipped because their score had moved on.
+CREATE OR REPLACE FUNCTION append_risk_scores(p_scores JSONB, p_expected JSONB)
+RETURNS TEXT[]
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    conflicted TEXT[] := '{}';
+    s TEXT;
+BEGIN
+    FOR s IN
+        SELECT DISTINCT r->>'site_id' FROM jsonb_array_elements(p_scores) r ORDER BY 1
+    LOOP
+        PERFORM pg_advisory_xact_lock(hashtext('site_current_risk'), hashtext(s));
+        IF (SELECT c.risk_score_id FROM site_current_risk c WHERE c.site_id = s)
+            IS DISTINCT FROM p_expected->>s THEN
+            conflicted := conflicted || s;
+        END IF;
+    END LOOP;
+
+    INSERT INTO risk_scores
+    SELECT * FROM jsonb_populate_recordset(NULL::risk_scores, p_scores) r
+    WHERE r.site_id <> ALL(conflicted);
+
+    RETURN conflicted;
+END;
+$$;
+
+-- Backfill the projection from existing score history
+INSERT INTO site_current_risk (
+    risk_score_id, site_id, score, calculated_date, contributing_signals,
+    explanation, trend, breakdown, metadata, decay_key, created_at
+)
+SELECT DISTINCT ON (site_id)
+    risk_score_id, site_id, score, calculated_date, contributing_signals,
+    explanation, trend, breakdown, metadata, decay_key, created_at
+FROM risk_scores
+ORDER BY site_id, calculated_date DESC, risk_score_id DESC
+ON CONFLICT (site_id) DO NOTHING;
 
 -- Row Level Security (RLS) - Enabled for all tables
 ALTER TABLE sites ENABLE ROW LEVEL SECURITY;
@@ -113,6 +418,9 @@ ALTER TABLE vendors ENABLE ROW LEVEL SECURITY;
 ALTER TABLE work_orders ENABLE ROW LEVEL SECURITY;
 ALTER TABLE execution_signals ENABLE ROW LEVEL SECURITY;
 ALTER TABLE risk_scores ENABLE ROW LEVEL SECURITY;
+ALTER TABLE maintenance_watermarks ENABLE ROW LEVEL SECURITY;
+ALTER TABLE site_versions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE site_current_risk ENABLE ROW LEVEL SECURITY;
 
 -- RLS Policies (authenticated users can read/write all data in Phase 0)
 CREATE POLICY "Enable all for authenticated users" ON sites
@@ -132,3 +440,12 @@ CREATE POLICY "Enable all for authenticated users" ON execution_signals
 
 CREATE POLICY "Enable all for authenticated users" ON risk_scores
     FOR ALL USING (auth.role() = 'authenticated');
+
+CREATE POLICY "Enable all for authenticated users" ON maintenance_watermarks
+    FOR ALL USING (auth.role() = 'authenticated');
+
+CREATE POLICY "Enable all for authenticated users" ON site_versions
+    FOR ALL USING (auth.role() = 'authenticated');
+
+CREATE POLICY "Enable all for authenticated users" ON site_current_risk
+    FOR ALL USING (auth.role() = 'authenticated');
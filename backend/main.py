@@ -3,22 +3,44 @@ Groundswell - Main FastAPI Application
 Facilities & Property Services Execution Intelligence
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 import os
 
 from backend.api import (
     inspections_router,
     work_orders_router,
     sites_router,
-    signals_router
+    signals_router,
+    jobs_router
 )
+from backend.api.work_orders import overdue_sweeper
+from backend.api.inspections import signal_extractor
+from backend.cache import read_cache
+from backend.db.config import Database
+from backend.observability import MetricsMiddleware, register_cache
+from backend.services.job_queue import job_queue
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background job workers and the overdue sweeper for the lifetime of the app"""
+    await job_queue.start()
+    overdue_sweeper.start()
+    yield
+    await overdue_sweeper.stop()
+    await job_queue.stop()
+    await Database.aclose()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="Groundswell API",
     description="Execution intelligence from the ground up",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -32,8 +54,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Per-route latency, status and concurrency (outermost, so CORS is included)
+app.add_middleware(MetricsMiddleware)
+
+# Cache hit counters are read at scrape time
+register_cache("read", read_cache)
+register_cache("extraction", signal_extractor.cache)
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -44,11 +74,18 @@ async def health_check():
         "version": "0.1.0"
     }
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this worker"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 # Register routers
 app.include_router(inspections_router)
 app.include_router(work_orders_router)
 app.include_router(sites_router)
 app.include_router(signals_router)
+app.include_router(jobs_router)
 
 
 @app.get("/")
@@ -1,6 +1,7 @@
 """RiskScore domain model"""
 
 from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel, Field
 
 
@@ -33,6 +34,10 @@ class RiskScore(BaseModel):
         description="Score breakdown by signal type"
     )
     metadata: dict = Field(default_factory=dict, description="Additional metadata")
+    decay_key: Optional[float] = Field(
+        default=None,
+        description="Time-invariant rank of an exponentially decaying score (exponential recency mode only)"
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Config:
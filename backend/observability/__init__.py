@@ -0,0 +1,24 @@
+"""
+Groundswell - Observability
+Prometheus metrics shared by API routes, agents and the database client
+"""
+
+from .metrics import (
+    MetricsMiddleware,
+    timed,
+    record_db_query,
+    record_llm_call,
+    register_cache,
+    DB_IN_FLIGHT,
+    LLM_IN_FLIGHT,
+)
+
+__all__ = [
+    "MetricsMiddleware",
+    "timed",
+    "record_db_query",
+    "record_llm_call",
+    "register_cache",
+    "DB_IN_FLIGHT",
+    "LLM_IN_FLIGHT",
+]
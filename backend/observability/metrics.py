@@ -0,0 +1,231 @@
+"""Prometheus metrics for request latency, pipeline stages and the model"""
+
+import functools
+import inspect
+import time
+from typing import Any, Callable, Optional
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+
+# Pipeline stages timed by STAGE_LATENCY (extraction includes llm time;
+# work_order_rules is the rule-based late work order detection)
+STAGES = ("extraction", "llm", "work_order_rules", "db_read", "db_write", "scoring")
+
+REQUEST_LATENCY = Histogram(
+    "groundswell_http_request_duration_seconds",
+    "HTTP request latency by route template, until the last body byte is sent",
+    ["method", "route"]
+)
+REQUESTS = Counter(
+    "groundswell_http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"]
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "groundswell_http_requests_in_flight",
+    "HTTP requests currently being handled"
+)
+
+STAGE_LATENCY = Histogram(
+    "groundswell_stage_duration_seconds",
+    "Time spent per pipeline stage",
+    ["stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+
+DB_QUERIES = Counter(
+    "groundswell_db_queries_total",
+    "Database round trips by operation and table (or function)",
+    ["operation", "table"]
+)
+DB_ERRORS = Counter(
+    "groundswell_db_query_errors_total",
+    "Database round trips that raised",
+    ["operation"]
+)
+DB_IN_FLIGHT = Gauge(
+    "groundswell_db_queries_in_flight",
+    "Database round trips waiting for or running on the database thread pool"
+)
+
+LLM_CALLS = Counter(
+    "groundswell_llm_calls_total",
+    "Model calls by request shape and outcome",
+    ["mode", "outcome"]
+)
+LLM_TOKENS = Counter(
+    "groundswell_llm_tokens_total",
+    "Model tokens consumed",
+    ["kind"]
+)
+LLM_TOKENS_PER_CALL = Histogram(
+    "groundswell_llm_tokens_per_call",
+    "Total tokens per model call",
+    ["mode"],
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+)
+LLM_IN_FLIGHT = Gauge(
+    "groundswell_llm_calls_in_flight",
+    "Model calls awaiting a response"
+)
+
+# Label children are resolved once; .labels() takes a lock on every call
+_stage_timers = {stage: STAGE_LATENCY.labels(stage) for stage in STAGES}
+
+
+def timed(stage: str) -> Callable:
+    """
+    Decorator recording each call's duration under `stage`
+
+    Works for plain and coroutine functions; failed calls are timed too.
+    """
+    def decorate(func: Callable) -> Callable:
+        timer = _stage_timers[stage]
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    timer.observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer.observe(time.perf_counter() - start)
+        return wrapper
+
+    return decorate
+
+
+def record_db_query(operation: str, table: Optional[str], seconds: float, failed: bool = False):
+    """
+    Record one database round trip
+
+    Args:
+        operation: "read" or "write"
+        table: Table or function name
+        seconds: Wall time including the wait for a pool thread
+        failed: Whether the round trip raised
+    """
+    _stage_timers["db_read" if operation == "read" else "db_write"].observe(seconds)
+    DB_QUERIES.labels(operation, table or "unknown").inc()
+    if failed:
+        DB_ERRORS.labels(operation).inc()
+
+
+def record_llm_call(
+    mode: str,
+    seconds: float,
+    cost: Any = None,
+    failed: bool = False,
+    replayed: bool = False
+):
+    """
+    Record one model call
+
+    Args:
+        mode: "single" or "batch"
+        seconds: Time until the parsed result was returned
+        cost: pydantic_ai Cost of the run (token counts may be None)
+        failed: Whether the call raised
+        replayed: Whether the result came from a recording instead of the model
+    """
+    _stage_timers["llm"].observe(seconds)
+    outcome = "error" if failed else "replayed" if replayed else "ok"
+    LLM_CALLS.labels(mode, outcome).inc()
+    if cost is None:
+        return
+
+    request_tokens = cost.request_tokens or 0
+    response_tokens = cost.response_tokens or 0
+    LLM_TOKENS.labels("request").inc(request_tokens)
+    LLM_TOKENS.labels("response").inc(response_tokens)
+    LLM_TOKENS_PER_CALL.labels(mode).observe(cost.total_tokens or request_tokens + response_tokens)
+
+
+class _CacheCollector:
+    """Reads hit counters from registered caches at scrape time"""
+
+    def __init__(self):
+        self.caches: dict[str, Any] = {}
+
+    def collect(self):
+        lookups = CounterMetricFamily(
+            "groundswell_cache_lookups",
+            "Cache lookups by result (coalesced lookups shared an in-flight load)",
+            labels=["cache", "result"]
+        )
+        ratio = GaugeMetricFamily(
+            "groundswell_cache_hit_ratio",
+            "Fraction of lookups served without a backend call",
+            labels=["cache"]
+        )
+        for name, cache in self.caches.items():
+            lookups.add_metric([name, "hit"], cache.hits)
+            lookups.add_metric([name, "miss"], cache.misses)
+            if hasattr(cache, "coalesced"):
+                lookups.add_metric([name, "coalesced"], cache.coalesced)
+            ratio.add_metric([name], cache.hit_ratio)
+        yield lookups
+        yield ratio
+
+
+_cache_collector = _CacheCollector()
+REGISTRY.register(_cache_collector)
+
+
+def register_cache(name: str, cache: Any):
+    """
+    Export a cache's hit counters (it needs `hits`, `misses` and `hit_ratio`)
+
+    Nothing is recorded on the lookup path; counters are read when scraped.
+    """
+    if cache is not None:
+        _cache_collector.caches[name] = cache
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and concurrency per route
+
+    Routes are labelled with their path template (e.g. /api/sites/{site_id})
+    so label cardinality stays bounded; unmatched paths share one label.
+    Streaming responses are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, route_label).observe(time.perf_counter() - start)
+            REQUESTS.labels(method, route_label, str(status)).inc()
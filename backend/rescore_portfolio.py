@@ -0,0 +1,66 @@
+"""
+Nightly portfolio rescore
+Recomputes the risk score of every site in one batch scoring pass
+"""
+
+from datetime import datetime
+
+from backend.agents import RiskScorerAgent, SignalBatch
+from backend.models import RiskScore
+from backend.db.config import Database
+
+
+PAGE_SIZE = 1000
+INSERT_CHUNK_SIZE = 500
+
+SIGNAL_COLUMNS = "signal_id,site_id,signal_type,severity,confidence_score,detected_date,resolved"
+
+
+def _fetch_all(query_factory, order_column: str) -> list[dict]:
+    """Page through a query with range() until it is exhausted"""
+    rows = []
+    start = 0
+    while True:
+        page = query_factory().order(order_column).range(start, start + PAGE_SIZE - 1).execute().data
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def rescore_portfolio() -> dict[str, RiskScore]:
+    """Score every site from its unresolved signals and store the results"""
+    db = Database.get_client()
+    risk_scorer = RiskScorerAgent()
+
+    print("📊 Loading unresolved signals...")
+    signal_rows = _fetch_all(
+        lambda: db.table("execution_signals").select(SIGNAL_COLUMNS).eq("resolved", False),
+        "signal_id"
+    )
+
+    print("📈 Loading previous scores...")
+    previous_rows = _fetch_all(
+        lambda: db.table("site_current_risk").select("*"),
+        "site_id"
+    )
+    previous_scores = {row["site_id"]: RiskScore(**row) for row in previous_rows}
+
+    started = datetime.utcnow()
+    scores = risk_scorer.calculate_portfolio_risk(
+        SignalBatch.from_rows(signal_rows),
+        previous_scores=previous_scores,
+        site_ids=previous_scores.keys()
+    )
+    elapsed = (datetime.utcnow() - started).total_seconds()
+
+    rows = [score.model_dump(mode="json") for score in scores.values()]
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.table("risk_scores").insert(rows[start:start + INSERT_CHUNK_SIZE]).execute()
+
+    print(f"\n✅ Rescored {len(scores)} sites from {len(signal_rows)} signals in {elapsed:.2f}s")
+    return scores
+
+
+if __name__ == "__main__":
+    rescore_portfolio()
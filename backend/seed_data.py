@@ -9,12 +9,21 @@ from datetime import datetime, timedelta
 from backend.models import Site, Inspection, WorkOrder, Vendor, ExecutionSignal
 from backend.agents import SignalExtractorAgent, RiskScorerAgent
 from backend.db.config import Database
+from backend.db.bulk import BulkWriter
+
+
+# Scenario texts, also sampled by the synthetic generators in backend/benchmarks
+NEGLECTED_SITE_NOTES = "HVAC filter severely clogged. Water damage visible on ceiling tiles in break room. Emergency exit sign not functional. Floor tiles cracked near entrance."
+MANAGED_SITE_NOTES = "All systems operational. HVAC filters changed on schedule. No safety concerns observed. Documentation complete."
+LATE_HVAC_DESCRIPTION = "Air conditioning not cooling properly. Temperature reading 78°F when set to 68°F."
 
 
 async def create_seed_data():
     """Create demo seed data for all three scenarios"""
     
-    db = Database.get_client()
+    # Rows are queued and written in a few multi-row upserts at the end, so
+    # the script can be re-run against a partially seeded database
+    writer = BulkWriter(Database.get_async_client())
     signal_extractor = SignalExtractorAgent()
     risk_scorer = RiskScorerAgent()
     
@@ -34,35 +43,33 @@ async def create_seed_data():
             status="active"
         )
         neglected_sites.append(site)
-        db.table("sites").insert(site.model_dump(mode="json")).execute()
+        writer.add("sites", [site.model_dump(mode="json")], on_conflict="site_id")
     
     # Add missed inspections
+    neglected_inspections = []
     for site in neglected_sites[:3]:
         inspection = Inspection(
             inspection_id=str(uuid.uuid4()),
             site_id=site.site_id,
             inspector_name="John Smith",
             inspection_date=datetime.utcnow() - timedelta(days=15),
-            notes="HVAC filter severely clogged. Water damage visible on ceiling tiles in break room. Emergency exit sign not functional. Floor tiles cracked near entrance.",
+            notes=NEGLECTED_SITE_NOTES,
             status="incomplete",
             inspection_type="routine",
             confidence_score=0.92
         )
-        db.table("inspections").insert(inspection.model_dump(mode="json")).execute()
-        
-        # Extract signals
-        signals = await signal_extractor.extract_from_inspection(
-            inspection.inspection_id,
-            inspection.site_id,
-            inspection.notes
-        )
-        if signals:
-            for signal in signals:
-                db.table("execution_signals").insert(signal.model_dump(mode="json")).execute()
+        neglected_inspections.append(inspection)
+        writer.add("inspections", [inspection.model_dump(mode="json")], on_conflict="inspection_id")
+    
+    # Extract signals for all inspections in batched requests
+    neglected_signals = await signal_extractor.extract_from_inspections(neglected_inspections)
+    
+    for site, signals in zip(neglected_sites[:3], neglected_signals):
+        writer.add("execution_signals", [s.model_dump(mode="json") for s in signals], on_conflict="signal_id")
         
         # Calculate risk score
         risk_score = risk_scorer.calculate_site_risk(site.site_id, signals)
-        db.table("risk_scores").insert(risk_score.model_dump(mode="json")).execute()
+        writer.add("risk_scores", [risk_score.model_dump(mode="json")], on_conflict="risk_score_id")
     
     # Scenario 2: Vendor Performance Issues
     print("\n🔧 Creating Scenario 2: Vendor Performance Issues")
@@ -78,7 +85,7 @@ async def create_seed_data():
         sla_response_time_hours=24,
         performance_rating=2.5
     )
-    db.table("vendors").insert(vendor.model_dump(mode="json")).execute()
+    writer.add("vendors", [vendor.model_dump(mode="json")], on_conflict="vendor_id")
     
     vendor_sites = []
     for i in range(1, 4):
@@ -91,7 +98,7 @@ async def create_seed_data():
             status="active"
         )
         vendor_sites.append(site)
-        db.table("sites").insert(site.model_dump(mode="json")).execute()
+        writer.add("sites", [site.model_dump(mode="json")], on_conflict="site_id")
         
         # Create late work order
         work_order = WorkOrder(
@@ -99,14 +106,14 @@ async def create_seed_data():
             site_id=site.site_id,
             vendor_id=vendor.vendor_id,
             title="HVAC System Repair",
-            description="Air conditioning not cooling properly. Temperature reading 78°F when set to 68°F.",
+            description=LATE_HVAC_DESCRIPTION,
             priority="high",
             status="in_progress",
             created_date=datetime.utcnow() - timedelta(days=10),
             due_date=datetime.utcnow() - timedelta(days=3),
             estimated_cost=850.00
         )
-        db.table("work_orders").insert(work_order.model_dump(mode="json")).execute()
+        writer.add("work_orders", [work_order.model_dump(mode="json")], on_conflict="work_order_id")
         
         # Extract signals from late work order
         signals = await signal_extractor.extract_from_work_order(
@@ -117,18 +124,17 @@ async def create_seed_data():
             work_order.due_date,
             work_order.status
         )
-        if signals:
-            for signal in signals:
-                db.table("execution_signals").insert(signal.model_dump(mode="json")).execute()
+        writer.add("execution_signals", [s.model_dump(mode="json") for s in signals], on_conflict="signal_id")
         
         # Calculate risk score
         risk_score = risk_scorer.calculate_site_risk(site.site_id, signals)
-        db.table("risk_scores").insert(risk_score.model_dump(mode="json")).execute()
+        writer.add("risk_scores", [risk_score.model_dump(mode="json")], on_conflict="risk_score_id")
     
     # Scenario 3: Well-Managed Portfolio
     print("\n✅ Creating Scenario 3: Well-Managed Portfolio")
     
     managed_sites = []
+    managed_inspections = []
     for i in range(1, 4):
         site = Site(
             site_id=f"site_managed_{i}",
@@ -139,7 +145,7 @@ async def create_seed_data():
             status="active"
         )
         managed_sites.append(site)
-        db.table("sites").insert(site.model_dump(mode="json")).execute()
+        writer.add("sites", [site.model_dump(mode="json")], on_conflict="site_id")
         
         # Create completed inspection with no issues
         inspection = Inspection(
@@ -147,28 +153,30 @@ async def create_seed_data():
             site_id=site.site_id,
             inspector_name="Sarah Williams",
             inspection_date=datetime.utcnow() - timedelta(days=2),
-            notes="All systems operational. HVAC filters changed on schedule. No safety concerns observed. Documentation complete.",
+            notes=MANAGED_SITE_NOTES,
             status="completed",
             inspection_type="routine",
             confidence_score=0.98
         )
-        db.table("inspections").insert(inspection.model_dump(mode="json")).execute()
-        
-        # These sites will have very few or no signals
-        signals = await signal_extractor.extract_from_inspection(
-            inspection.inspection_id,
-            inspection.site_id,
-            inspection.notes
-        )
-        if signals:
-            for signal in signals:
-                db.table("execution_signals").insert(signal.model_dump(mode="json")).execute()
+        managed_inspections.append(inspection)
+        writer.add("inspections", [inspection.model_dump(mode="json")], on_conflict="inspection_id")
+    
+    # These sites will have very few or no signals
+    managed_signals = await signal_extractor.extract_from_inspections(managed_inspections)
+    
+    for site, signals in zip(managed_sites, managed_signals):
+        writer.add("execution_signals", [s.model_dump(mode="json") for s in signals], on_conflict="signal_id")
         
         # Calculate risk score (should be low)
         risk_score = risk_scorer.calculate_site_risk(site.site_id, signals)
-        db.table("risk_scores").insert(risk_score.model_dump(mode="json")).execute()
+        writer.add("risk_scores", [risk_score.model_dump(mode="json")], on_conflict="risk_score_id")
+    
+    outcome = await writer.flush()
+    await Database.aclose()
+    for error in outcome.errors:
+        print(f"   ⚠️  {error.table} {error.key}: {error.error}")
     
-    print("\n✅ Seed data created successfully!")
+    print(f"\n✅ Seed data created successfully in {outcome.statements} write statements!")
     print(f"   - {len(neglected_sites)} sites in Neglected Region scenario")
     print(f"   - {len(vendor_sites)} sites in Vendor Performance scenario")
     print(f"   - {len(managed_sites)} sites in Well-Managed scenario")
@@ -0,0 +1,20 @@
+"""
+Groundswell - Services
+Ingestion pipelines and background processing
+"""
+
+from .inspection_pipeline import InspectionIngestPipeline
+from .risk_maintenance import RiskScoreMaintainer
+from .job_queue import JobQueue, JobStore, job_queue
+from .work_order_pipeline import WorkOrderBulkIngestor
+from .overdue_sweeper import OverdueWorkOrderSweeper
+
+__all__ = [
+    "InspectionIngestPipeline",
+    "RiskScoreMaintainer",
+    "JobQueue",
+    "JobStore",
+    "job_queue",
+    "WorkOrderBulkIngestor",
+    "OverdueWorkOrderSweeper",
+]
@@ -0,0 +1,313 @@
+"""Pipelined inspection ingestion"""
+
+import asyncio
+import os
+import uuid
+from typing import AsyncIterable, Callable, Iterable, Optional, Union
+
+from backend.models import Inspection, ExecutionSignal
+from backend.agents import SignalExtractorAgent
+from backend.db.bulk import BulkWriter
+from backend.services.risk_maintenance import RiskScoreMaintainer
+from backend.services.iterables import aiter_any
+
+
+# Concurrency and batching defaults (overridable per request)
+DEFAULT_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "8"))
+MAX_CONCURRENCY = 64
+WRITE_BATCH_SIZE = int(os.getenv("INGEST_WRITE_BATCH_SIZE", "50"))
+WRITE_LINGER_SECONDS = 0.05
+MAX_REPORTED_ERRORS = 1000
+
+
+class InspectionIngestPipeline:
+    """
+    Bounded-parallel ingestion of inspection rows
+
+    Rows are grouped into packs that are extracted with one batched model
+    request each. At most `concurrency` model requests are in flight, counted
+    per request rather than per pack, since a pack that fails is split and
+    retried as several requests. Finished rows are handed through a bounded
+    queue to a single writer task that stores inspections and their signals
+    with chunked multi-row upserts (see BulkWriter), so database round trips
+    stay off the per-row extraction path and one bad row fails alone
+    instead of taking its batch with it. A writer that falls behind slows
+    extraction (and reading) down instead of letting rows pile up.
+    """
+
+    def __init__(
+        self,
+        db,
+        signal_extractor: SignalExtractorAgent,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        write_batch_size: int = WRITE_BATCH_SIZE,
+        risk_maintainer: Optional[RiskScoreMaintainer] = None
+    ):
+        """
+        Initialize the pipeline
+
+        Args:
+            db: Async database client used for inserts
+            signal_extractor: Agent used for signal extraction
+            concurrency: Maximum number of in-flight extraction requests
+            write_batch_size: Inspections collected before each bulk write
+            risk_maintainer: Updates site risk scores after each written batch
+        """
+        self.db = db
+        self.signal_extractor = signal_extractor
+        self.notes_per_request = signal_extractor.max_batch_notes
+        self.risk_maintainer = risk_maintainer
+        self.concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+        self.write_batch_size = max(1, write_batch_size)
+
+    async def run(self, rows: Union[Iterable[dict], AsyncIterable[dict]]) -> list[dict]:
+        """
+        Ingest CSV rows and report the outcome of each one
+
+        Args:
+            rows: Parsed CSV rows (dicts keyed by column name), sync or async
+
+        Returns:
+            One result dict per row, in input order
+        """
+        results: list[dict] = []
+        await self._ingest(rows, results.append)
+        results.sort(key=lambda result: result["row"])
+        return results
+
+    async def summarize(self, rows: Union[Iterable[dict], AsyncIterable[dict]]) -> dict:
+        """
+        Ingest CSV rows and summarize the outcome
+
+        Successful rows are only counted, so memory use does not grow with
+        the size of the upload.
+
+        Args:
+            rows: Parsed CSV rows (dicts keyed by column name), sync or async
+
+        Returns:
+            Counts and the first MAX_REPORTED_ERRORS failed rows, in input order
+        """
+        summary = {
+            "rows_received": 0,
+            "inspections_processed": 0,
+            "inspections_failed": 0,
+            "total_signals_extracted": 0,
+            "errors": [],
+            "errors_truncated": False
+        }
+
+        def record(result: dict):
+            summary["rows_received"] += 1
+            if result["status"] == "success":
+                summary["inspections_processed"] += 1
+                summary["total_signals_extracted"] += result["signals_extracted"]
+                if result["error"]:
+                    risk_errors = summary.setdefault("risk_update_errors", [])
+                    if result["error"] not in risk_errors:
+                        risk_errors.append(result["error"])
+                return
+
+            summary["inspections_failed"] += 1
+            if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                summary["errors"].append({
+                    "row": result["row"],
+                    "inspection_id": result["inspection_id"],
+                    "error": result["error"]
+                })
+            else:
+                summary["errors_truncated"] = True
+
+        await self._ingest(rows, record)
+        summary["errors"].sort(key=lambda error: error["row"])
+        return summary
+
+    async def _ingest(self, rows: Union[Iterable[dict], AsyncIterable[dict]], finish: Callable[[dict], None]):
+        """
+        Run rows through extraction and writing, passing each result to `finish`
+
+        Rows are pulled from `rows` only while fewer than `concurrency` packs
+        are being extracted, so a streamed source is read at the pace
+        extraction can absorb it. Each row's result is handed to `finish`
+        once it is final, in completion order.
+        """
+        # Bounded to the rows of the packs in flight: when writes fall behind,
+        # packs wait to queue their rows, keep their slots and stop reading
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * self.notes_per_request)
+        # Packs in flight pace reading; request slots bound the model calls
+        pack_slots = asyncio.Semaphore(self.concurrency)
+        request_slots = asyncio.Semaphore(self.concurrency)
+        writer = asyncio.create_task(self._write_loop(write_queue, finish))
+        tasks = set()
+        pack = []
+
+        async def launch(pack):
+            # Wait for a free pack slot before reading further rows
+            await pack_slots.acquire()
+            task = asyncio.create_task(self._extract_pack(pack, pack_slots, request_slots, write_queue, finish))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        row_number = 0
+        try:
+            async for row in aiter_any(rows):
+                row_number += 1
+                result = {
+                    "row": row_number,
+                    "inspection_id": None,
+                    "status": "pending",
+                    "signals_extracted": 0,
+                    "error": None
+                }
+
+                try:
+                    inspection = self._parse_row(row)
+                except Exception as e:
+                    result["status"] = "error"
+                    result["error"] = f"Invalid row: {e}"
+                    finish(result)
+                    continue
+
+                result["inspection_id"] = inspection.inspection_id
+                pack.append((inspection, result))
+
+                if len(pack) >= self.notes_per_request:
+                    await launch(pack)
+                    pack = []
+        except Exception as e:
+            # A broken source (e.g. a malformed upload) ends the run; rows
+            # already read are still extracted and written below
+            finish({
+                "row": row_number + 1,
+                "inspection_id": None,
+                "status": "error",
+                "signals_extracted": 0,
+                "error": f"Could not read input: {e}"
+            })
+
+        if pack:
+            await launch(pack)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+        # Drain pending writes
+        await write_queue.put(None)
+        await writer
+
+    def _parse_row(self, row: dict) -> Inspection:
+        """Build an Inspection from a CSV row or a serialized Inspection"""
+        return Inspection(
+            inspection_id=row.get("inspection_id") or str(uuid.uuid4()),
+            site_id=row["site_id"],
+            inspector_name=row["inspector_name"],
+            inspection_date=row["inspection_date"],
+            notes=row["notes"],
+            status=row["status"],
+            inspection_type=row.get("inspection_type"),
+            confidence_score=row.get("confidence_score") or None,
+            metadata=row.get("metadata") or {}
+        )
+
+    async def _extract_pack(
+        self,
+        pack: list[tuple[Inspection, dict]],
+        pack_slots: asyncio.Semaphore,
+        request_slots: asyncio.Semaphore,
+        write_queue: asyncio.Queue,
+        finish: Callable[[dict], None]
+    ):
+        """
+        Extract signals for a pack of rows in one batched call and queue them for writing
+
+        The pack slot is held until every row is queued, so a full write
+        queue also holds back reading.
+        """
+        try:
+            try:
+                extracted = await self.signal_extractor.extract_from_inspections(
+                    [inspection for inspection, _ in pack],
+                    return_exceptions=True,
+                    request_slots=request_slots
+                )
+            except Exception as e:
+                extracted = [e] * len(pack)
+
+            for (inspection, result), signals in zip(pack, extracted):
+                if isinstance(signals, Exception):
+                    result["status"] = "error"
+                    result["error"] = f"Signal extraction failed: {signals}"
+                    finish(result)
+                else:
+                    await write_queue.put((inspection, signals, result))
+        finally:
+            pack_slots.release()
+
+    async def _write_loop(self, write_queue: asyncio.Queue, finish: Callable[[dict], None]):
+        """Collect extracted rows and store them in batches"""
+        batch = []
+        done = False
+
+        while not done:
+            try:
+                item = await asyncio.wait_for(
+                    write_queue.get(),
+                    timeout=WRITE_LINGER_SECONDS if batch else None
+                )
+            except asyncio.TimeoutError:
+                item = False
+
+            if item is None:
+                done = True
+            elif item:
+                batch.append(item)
+                if len(batch) < self.write_batch_size:
+                    continue
+
+            if batch:
+                await self._write_batch(batch, finish)
+                batch = []
+
+    async def _write_batch(
+        self,
+        batch: list[tuple[Inspection, list[ExecutionSignal], dict]],
+        finish: Callable[[dict], None]
+    ):
+        """Store a batch of inspections and their signals"""
+        # Upserts keep replays idempotent when a background job resumes a
+        # batch; signals already stored are kept so a replay cannot count
+        # them into the site's risk score twice
+        writer = BulkWriter(self.db)
+        for ref, (inspection, signals, _) in enumerate(batch):
+            writer.add("inspections", [inspection.model_dump(mode="json")], ref=ref, on_conflict="inspection_id")
+            writer.add(
+                "execution_signals",
+                [signal.model_dump(mode="json") for signal in signals],
+                ref=ref,
+                on_conflict="signal_id",
+                ignore_duplicates=True
+            )
+        outcome = await writer.flush()
+
+        inserted = {row["signal_id"] for row in outcome.rows("execution_signals")}
+        stored = []
+        for ref, (_, signals, result) in enumerate(batch):
+            if ref in outcome.failed:
+                result["status"] = "error"
+                result["error"] = f"Database write failed: {outcome.failed[ref]}"
+                continue
+            result["status"] = "success"
+            result["signals_extracted"] = len(signals)
+            stored.extend(signal for signal in signals if signal.signal_id in inserted)
+
+        if self.risk_maintainer is not None and stored:
+            try:
+                await self.risk_maintainer.apply(added=stored)
+            except Exception as e:
+                # Rows are stored; the next rescore will pick up their signals
+                for _, _, result in batch:
+                    if result["status"] == "success":
+                        result["error"] = f"Risk score update failed: {e}"
+
+        for _, _, result in batch:
+            finish(result)
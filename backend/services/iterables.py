@@ -0,0 +1,15 @@
+"""Helpers for sources that may be sync or async iterables"""
+
+from typing import AsyncIterable, AsyncIterator, Iterable, TypeVar, Union
+
+T = TypeVar("T")
+
+
+async def aiter_any(source: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    """Iterate a sync or async iterable with `async for`"""
+    if hasattr(source, "__aiter__"):
+        async for item in source:
+            yield item
+    else:
+        for item in source:
+            yield item
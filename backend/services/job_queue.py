@@ -0,0 +1,441 @@
+"""Persistent in-process job queue for background ingestion"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterable, Awaitable, Callable, Iterable, Optional, Union
+
+from backend.services.iterables import aiter_any
+
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "groundswell_jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "100"))
+# Seconds a worker's claim on a job lasts without renewal; jobs of a worker
+# that stops renewing (e.g. a crashed process) are taken over after this
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_POLL_SECONDS = 1.0
+
+
+def _timestamp(value: Optional[datetime] = None) -> str:
+    """Fixed-width ISO timestamp, so stored values compare as strings"""
+    return (value or datetime.utcnow()).isoformat(timespec="microseconds")
+
+
+# Handler signature: payloads in, one result dict per payload out. A result
+# with "status" == "error" marks the item failed; its "error" is recorded.
+JobHandler = Callable[[list[dict]], Awaitable[list[dict]]]
+
+
+class JobStore:
+    """
+    SQLite storage for jobs and their items
+
+    Every item is persisted when the job is accepted and marked done as it
+    is processed, so a restarted worker resumes with the remaining items.
+    Jobs being received or run are leased to one worker (`owner`) until
+    `lease_expires_at`; only jobs whose lease has lapsed are taken over.
+    """
+
+    def __init__(self, path: str = JOB_DB_PATH):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    total_items INTEGER NOT NULL DEFAULT 0,
+                    processed_items INTEGER NOT NULL DEFAULT 0,
+                    failed_items INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    owner TEXT,
+                    lease_expires_at TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS job_items (
+                    job_id TEXT NOT NULL,
+                    item_index INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    PRIMARY KEY (job_id, item_index)
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+                CREATE INDEX IF NOT EXISTS idx_job_items_pending ON job_items(job_id, status, item_index);
+            """)
+            # Job stores created before leases existed
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column in ("owner", "lease_expires_at"):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+
+    def create_job(
+        self,
+        kind: str,
+        status: str = "queued",
+        owner: Optional[str] = None,
+        lease_seconds: float = JOB_LEASE_SECONDS
+    ) -> str:
+        """Create an empty job (leased to `owner` if given) and return its ID"""
+        job_id = str(uuid.uuid4())
+        now = datetime.utcnow()
+        lease = _timestamp(now + timedelta(seconds=lease_seconds)) if owner else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, kind, status, owner, lease_expires_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, status, owner, lease, _timestamp(now), _timestamp(now))
+            )
+        return job_id
+
+    def add_items(
+        self,
+        job_id: str,
+        start_index: int,
+        payloads: list[dict],
+        errors: Optional[dict[int, str]] = None
+    ):
+        """
+        Append items to a job
+
+        Args:
+            job_id: Job to extend
+            start_index: Index of the first payload within the job
+            payloads: Item payloads
+            errors: Offsets (into `payloads`) of items rejected up front, with reasons
+        """
+        errors = errors or {}
+        rows = [
+            (
+                job_id,
+                start_index + offset,
+                json.dumps(payload),
+                "error" if offset in errors else "pending",
+                errors.get(offset)
+            )
+            for offset, payload in enumerate(payloads)
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, item_index, payload, status, error) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute(
+                "UPDATE jobs SET total_items = total_items + ?, processed_items = processed_items + ?, "
+                "failed_items = failed_items + ?, updated_at = ? WHERE job_id = ?",
+                (len(rows), len(errors), len(errors), _timestamp(), job_id)
+            )
+            self._conn.execute("COMMIT")
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None):
+        """Update a job's status"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = COALESCE(?, error), updated_at = ? WHERE job_id = ?",
+                (status, error, _timestamp(), job_id)
+            )
+
+    def claim_next_job(self, owner: str, lease_seconds: float = JOB_LEASE_SECONDS) -> Optional[dict]:
+        """Lease the oldest queued job to `owner`, mark it running and return it"""
+        now = datetime.utcnow()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                "SELECT job_id, kind FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, lease_expires_at = ?, updated_at = ? "
+                    "WHERE job_id = ?",
+                    (owner, _timestamp(now + timedelta(seconds=lease_seconds)), _timestamp(now), row[0])
+                )
+            self._conn.execute("COMMIT")
+
+        return {"job_id": row[0], "kind": row[1]} if row else None
+
+    def renew_leases(self, owner: str, lease_seconds: float = JOB_LEASE_SECONDS) -> int:
+        """Extend the lease on every job `owner` is receiving or running"""
+        now = datetime.utcnow()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE owner = ? AND status IN ('receiving', 'running')",
+                (_timestamp(now + timedelta(seconds=lease_seconds)), owner)
+            )
+        return cursor.rowcount
+
+    def pending_items(self, job_id: str, limit: int) -> list[tuple[int, dict]]:
+        """Next unprocessed items of a job, in order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_index, payload FROM job_items WHERE job_id = ? AND status = 'pending' "
+                "ORDER BY item_index LIMIT ?",
+                (job_id, limit)
+            ).fetchall()
+        return [(index, json.loads(payload)) for index, payload in rows]
+
+    def complete_items(self, job_id: str, outcomes: list[tuple[int, str, Optional[dict], Optional[str]]]):
+        """Record (item_index, status, result, error) for processed items"""
+        failed = sum(1 for _, status, _, _ in outcomes if status == "error")
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE job_items SET status = ?, result = ?, error = ? WHERE job_id = ? AND item_index = ?",
+                [
+                    (status, json.dumps(result) if result is not None else None, error, job_id, index)
+                    for index, status, result, error in outcomes
+                ]
+            )
+            self._conn.execute(
+                "UPDATE jobs SET processed_items = processed_items + ?, failed_items = failed_items + ?, "
+                "updated_at = ? WHERE job_id = ?",
+                (len(outcomes), failed, _timestamp(), job_id)
+            )
+            self._conn.execute("COMMIT")
+
+    def requeue_interrupted(self) -> int:
+        """
+        Recover jobs whose worker stopped renewing its lease
+
+        Running jobs go back to the queue and resume with their pending
+        items. Jobs still receiving their upload cannot be resumed and are
+        marked failed. Jobs without a lease come from stores created before
+        leases existed and count as expired.
+        """
+        now = _timestamp()
+        expired = "(lease_expires_at IS NULL OR lease_expires_at < ?)"
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET status = 'queued', owner = NULL, lease_expires_at = NULL, updated_at = ? "
+                f"WHERE status = 'running' AND {expired}",
+                (now, now)
+            )
+            self._conn.execute(
+                f"UPDATE jobs SET status = 'failed', error = 'Upload was interrupted', owner = NULL, "
+                f"lease_expires_at = NULL, updated_at = ? WHERE status = 'receiving' AND {expired}",
+                (now, now)
+            )
+            self._conn.execute("COMMIT")
+        return cursor.rowcount
+
+    def get_job(self, job_id: str, offset: int = 0, limit: int = 100) -> Optional[dict]:
+        """Job summary with a page of its item results"""
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT job_id, kind, status, total_items, processed_items, failed_items, error, "
+                "created_at, updated_at FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+
+            items = self._conn.execute(
+                "SELECT item_index, status, result, error FROM job_items WHERE job_id = ? "
+                "ORDER BY item_index LIMIT ? OFFSET ?",
+                (job_id, limit, offset)
+            ).fetchall()
+
+        keys = ["job_id", "kind", "status", "total_items", "processed_items", "failed_items",
+                "error", "created_at", "updated_at"]
+        summary = dict(zip(keys, job))
+        summary["items"] = [
+            {
+                "index": index,
+                "status": status,
+                "result": json.loads(result) if result else None,
+                "error": error
+            }
+            for index, status, result, error in items
+        ]
+        return summary
+
+
+class JobQueue:
+    """
+    Runs persisted jobs on in-process async workers
+
+    Handlers are registered per job kind. Workers claim queued jobs, feed
+    pending items to the handler in chunks and record each item's outcome,
+    so progress survives restarts without an external broker.
+
+    Several processes can share one store. Each queue leases the jobs it
+    receives and runs under its own `owner` ID and renews those leases in
+    the background; a job is only recovered by another queue once its
+    lease has lapsed, so live workers never have their jobs taken over.
+    """
+
+    def __init__(
+        self,
+        store: Optional[JobStore] = None,
+        workers: int = JOB_WORKERS,
+        chunk_size: int = JOB_CHUNK_SIZE,
+        lease_seconds: float = JOB_LEASE_SECONDS
+    ):
+        self._store = store
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self.lease_seconds = lease_seconds
+        self.owner = str(uuid.uuid4())
+        self._handlers: dict[str, JobHandler] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def store(self) -> JobStore:
+        """Job store, opened on first use"""
+        if self._store is None:
+            self._store = JobStore()
+        return self._store
+
+    def register(self, kind: str, handler: JobHandler):
+        """Register the handler that processes items of a job kind"""
+        self._handlers[kind] = handler
+
+    async def start(self):
+        """Resume interrupted jobs and start the workers"""
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self.store.requeue_interrupted)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._maintain_leases()))
+
+    async def stop(self):
+        """Stop the workers; running jobs are resumed on the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def create_job(self, kind: str) -> str:
+        """Create a job that is filled with add_items() and queued with enqueue()"""
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        return await asyncio.to_thread(
+            self.store.create_job, kind, "receiving", self.owner, self.lease_seconds
+        )
+
+    async def add_items(
+        self,
+        job_id: str,
+        start_index: int,
+        payloads: list[dict],
+        errors: Optional[dict[int, str]] = None
+    ):
+        """Persist a chunk of item payloads for a job"""
+        await asyncio.to_thread(self.store.add_items, job_id, start_index, payloads, errors)
+
+    async def enqueue(self, job_id: str):
+        """Make a fully received job available to the workers"""
+        await asyncio.to_thread(self.store.set_status, job_id, "queued")
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def submit(self, kind: str, payloads: Union[Iterable[dict], AsyncIterable[dict]]) -> str:
+        """
+        Persist a job with all of its items and queue it
+
+        Payloads are stored in chunks as they are read, so a streamed source
+        is never held in memory. If reading stops early (the source fails or
+        the request is cancelled), the job is marked failed and the error is
+        re-raised.
+        """
+        job_id = await self.create_job(kind)
+        chunk: list[dict] = []
+        count = 0
+
+        try:
+            async for payload in aiter_any(payloads):
+                chunk.append(payload)
+                if len(chunk) >= self.chunk_size:
+                    await self.add_items(job_id, count, chunk)
+                    count += len(chunk)
+                    chunk = []
+            if chunk:
+                await self.add_items(job_id, count, chunk)
+        except BaseException as e:
+            # The write runs to completion in its thread even if this task is
+            # cancelled again while waiting for it
+            reason = f"Could not read input: {e}" if isinstance(e, Exception) else "Upload was interrupted"
+            await asyncio.to_thread(self.store.set_status, job_id, "failed", reason)
+            raise
+
+        await self.enqueue(job_id)
+        return job_id
+
+    async def get_job(self, job_id: str, offset: int = 0, limit: int = 100) -> Optional[dict]:
+        """Job status, progress and a page of item results"""
+        return await asyncio.to_thread(self.store.get_job, job_id, offset, limit)
+
+    async def _worker(self):
+        """Claim and process queued jobs until cancelled"""
+        while True:
+            job = await asyncio.to_thread(self.store.claim_next_job, self.owner, self.lease_seconds)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._run_job(job["job_id"], self._handlers[job["kind"]])
+                await asyncio.to_thread(self.store.set_status, job["job_id"], "completed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await asyncio.to_thread(self.store.set_status, job["job_id"], "failed", str(e))
+
+    async def _maintain_leases(self):
+        """Renew this queue's leases and recover jobs of workers that stopped"""
+        interval = max(self.lease_seconds / 3, 0.01)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.store.renew_leases, self.owner, self.lease_seconds)
+                if await asyncio.to_thread(self.store.requeue_interrupted) and self._wakeup is not None:
+                    self._wakeup.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # A transient store error; the next round retries well
+                # before the lease runs out
+                pass
+
+    async def _run_job(self, job_id: str, handler: JobHandler):
+        """Feed a job's pending items to its handler chunk by chunk"""
+        while True:
+            items = await asyncio.to_thread(self.store.pending_items, job_id, self.chunk_size)
+            if not items:
+                return
+
+            try:
+                results = await handler([payload for _, payload in items])
+            except Exception as e:
+                results = [{"status": "error", "error": str(e)} for _ in items]
+
+            # Items without a result would stay pending and be handed back forever
+            if len(results) != len(items):
+                error = f"Handler returned {len(results)} results for {len(items)} items"
+                results = list(results[:len(items)])
+                results += [{"status": "error", "error": error} for _ in range(len(items) - len(results))]
+
+            outcomes = []
+            for (index, _), result in zip(items, results):
+                status = "error" if result.get("status") == "error" else "success"
+                outcomes.append((index, status, result, result.get("error")))
+
+            await asyncio.to_thread(self.store.complete_items, job_id, outcomes)
+
+
+# Shared queue for this process; workers are started by the app lifespan
+job_queue = JobQueue()
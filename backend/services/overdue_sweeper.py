@@ -0,0 +1,240 @@
+"""Periodic detection and escalation of overdue work orders"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from backend.models import ExecutionSignal, WorkOrder
+from backend.agents import SignalExtractorAgent, RiskScorerAgent
+from backend.agents.signal_extractor import LATE_MEDIUM_DAYS, LATE_HIGH_DAYS
+from backend.services.risk_maintenance import RiskScoreMaintainer
+from backend.timeutils import to_naive_utc
+
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL_SECONDS = float(os.getenv("OVERDUE_SWEEP_INTERVAL_SECONDS", "900"))
+WATERMARK_NAME = "overdue_work_orders"
+PAGE_SIZE = 1000
+LOOKUP_CHUNK_SIZE = 200
+
+# Days late at which an order enters a new severity bucket
+BUCKET_THRESHOLDS = (0, LATE_MEDIUM_DAYS, LATE_HIGH_DAYS)
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+# Columns an escalation rewrites; detection time and resolution state stay as stored
+ESCALATION_COLUMNS = {"severity", "evidence", "explanation"}
+
+
+class OverdueWorkOrderSweeper:
+    """
+    Flags work orders that became overdue after ingestion
+
+    Each sweep covers the window since the previous sweep (kept in
+    `maintenance_watermarks`). Only orders whose days-late crossed a severity
+    threshold inside that window can need a change, so the sweep issues one
+    `due_date` range query per threshold instead of scanning the backlog.
+    New late signals are inserted, existing open ones are escalated, and
+    resolved signals are left alone. Inserts and escalations are
+    conditional and only the rows a sweep actually wrote are scored, so
+    overlapping sweeps from several app workers count each change once.
+    """
+
+    def __init__(
+        self,
+        db_provider: Callable,
+        signal_extractor: SignalExtractorAgent,
+        risk_scorer: RiskScorerAgent,
+        interval_seconds: float = SWEEP_INTERVAL_SECONDS
+    ):
+        """
+        Initialize the sweeper
+
+        Args:
+            db_provider: Returns the async database client to use for a sweep
+            signal_extractor: Agent providing the late work order rule
+            risk_scorer: Scoring engine for incremental risk updates
+            interval_seconds: Delay between sweeps (0 disables the loop)
+        """
+        self.db_provider = db_provider
+        self.signal_extractor = signal_extractor
+        self.risk_scorer = risk_scorer
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start sweeping in the background"""
+        if self.interval_seconds > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        """Stop the background loop"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def sweep(self, now: Optional[datetime] = None) -> dict:
+        """
+        Run one sweep up to `now`
+
+        Args:
+            now: End of the sweep window (defaults to the current UTC time)
+
+        Returns:
+            Counts of orders checked and signals created or escalated
+        """
+        now = now or datetime.utcnow()
+        db = self.db_provider()
+
+        since = await self._load_watermark(db)
+        rows = await self._fetch_crossings(db, since, now)
+        work_orders = [WorkOrder(**row) for row in rows.values()]
+        signals = self.signal_extractor.detect_late_work_orders(work_orders, now=now)
+
+        existing = await self._fetch_existing(db, [s.signal_id for s in signals])
+
+        created, escalated, replaced = [], [], []
+        for signal in signals:
+            current = existing.get(signal.signal_id)
+            if current is None:
+                created.append(signal)
+            elif not current.resolved and SEVERITY_RANK[signal.severity] > SEVERITY_RANK.get(current.severity, 0):
+                escalated.append(signal.model_copy(update={"detected_date": current.detected_date}))
+                replaced.append(current)
+
+        if created:
+            result = await db.table("execution_signals").upsert(
+                [s.model_dump(mode="json") for s in created],
+                on_conflict="signal_id",
+                ignore_duplicates=True
+            ).execute()
+            # Another sweep may have stored some of them first; only the
+            # rows this insert wrote count towards the score
+            inserted = {row["signal_id"] for row in result.data}
+            created = [s for s in created if s.signal_id in inserted]
+
+        if escalated:
+            escalated, replaced = await self._escalate(db, escalated, replaced)
+
+        if created or escalated:
+            await RiskScoreMaintainer(db, self.risk_scorer).apply(
+                added=created + escalated,
+                resolved=replaced
+            )
+
+        await self._save_watermark(db, now)
+
+        return {
+            "window_start": since.isoformat() if since else None,
+            "window_end": now.isoformat(),
+            "work_orders_checked": len(work_orders),
+            "signals_created": len(created),
+            "signals_escalated": len(escalated)
+        }
+
+    async def _run_forever(self):
+        """Sweep every `interval_seconds` until cancelled"""
+        while True:
+            try:
+                stats = await self.sweep()
+                logger.info("Overdue work order sweep: %s", stats)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Overdue work order sweep failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def _fetch_crossings(self, db, since: Optional[datetime], now: datetime) -> dict[str, dict]:
+        """
+        Open work orders that crossed a severity threshold since the last sweep
+
+        An order is late once due_date < now and d > 0 days late once
+        due_date <= now - d days, so crossing threshold d during the window
+        means due_date falls in [since, now) for d = 0 and in
+        (since - d days, now - d days] otherwise. Consecutive windows tile
+        without gaps. The first sweep has no lower bound and picks up the
+        whole existing overdue backlog once.
+        """
+        thresholds = (0,) if since is None else BUCKET_THRESHOLDS
+
+        rows: dict[str, dict] = {}
+        for days in thresholds:
+            offset = timedelta(days=days)
+            upper = (now - offset).isoformat()
+
+            page = 0
+            while True:
+                query = db.table("work_orders").select("*").neq("status", "completed")
+                if days == 0:
+                    query = query.lt("due_date", upper)
+                    if since is not None:
+                        query = query.gte("due_date", since.isoformat())
+                else:
+                    query = query.gt("due_date", (since - offset).isoformat()).lte("due_date", upper)
+
+                result = await query.order("due_date").order("work_order_id").range(
+                    page, page + PAGE_SIZE - 1
+                ).execute()
+                for row in result.data:
+                    rows[row["work_order_id"]] = row
+
+                if len(result.data) < PAGE_SIZE:
+                    break
+                page += PAGE_SIZE
+
+        return rows
+
+    async def _escalate(
+        self,
+        db,
+        escalated: list[ExecutionSignal],
+        replaced: list[ExecutionSignal]
+    ) -> tuple[list[ExecutionSignal], list[ExecutionSignal]]:
+        """
+        Rewrite the severity of stored open signals in place
+
+        An UPDATE rather than an upsert: Postgres checks NOT NULL columns of
+        an upsert's proposed insert row (e.g. detected_date) before resolving
+        the conflict. The update only matches while the signal is still open
+        with the severity that was read, so of two sweeps escalating the same
+        signal only one applies (and scores) it.
+
+        Returns:
+            The escalations that were applied and the signals they replaced
+        """
+        applied, applied_replaced = [], []
+        for signal, current in zip(escalated, replaced):
+            result = await db.table("execution_signals").update(
+                signal.model_dump(mode="json", include=ESCALATION_COLUMNS)
+            ).eq("signal_id", signal.signal_id).eq("resolved", False).eq("severity", current.severity).execute()
+            if result.data:
+                applied.append(signal)
+                applied_replaced.append(current)
+        return applied, applied_replaced
+
+    async def _fetch_existing(self, db, signal_ids: list[str]) -> dict[str, ExecutionSignal]:
+        """Stored late signals for the given IDs"""
+        existing = {}
+        for start in range(0, len(signal_ids), LOOKUP_CHUNK_SIZE):
+            chunk = signal_ids[start:start + LOOKUP_CHUNK_SIZE]
+            result = await db.table("execution_signals").select("*").in_("signal_id", chunk).execute()
+            for row in result.data:
+                existing[row["signal_id"]] = ExecutionSignal(**row)
+        return existing
+
+    async def _load_watermark(self, db) -> Optional[datetime]:
+        """End of the previous sweep window, if any"""
+        result = await db.table("maintenance_watermarks").select("watermark").eq("name", WATERMARK_NAME).execute()
+        if not result.data:
+            return None
+        return to_naive_utc(datetime.fromisoformat(result.data[0]["watermark"]))
+
+    async def _save_watermark(self, db, watermark: datetime):
+        """Record the end of a completed sweep window"""
+        await db.table("maintenance_watermarks").upsert(
+            {"name": WATERMARK_NAME, "watermark": watermark.isoformat(), "updated_at": datetime.utcnow().isoformat()},
+            on_conflict="name"
+        ).execute()
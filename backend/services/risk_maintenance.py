@@ -0,0 +1,137 @@
+"""Incremental risk score maintenance"""
+
+import asyncio
+import weakref
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from typing import Iterable
+
+from backend.models import RiskScore, ExecutionSignal
+from backend.agents import RiskScorerAgent
+from backend.cache import invalidate_site_reads
+
+
+# Attempts per update before giving up on sites whose score keeps moving
+MAX_APPEND_ATTEMPTS = 5
+
+# Serializes score updates per site within this process, so local updates
+# never conflict in the database; an entry lives only while a lock is held
+# or awaited
+_site_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _site_lock(site_id: str) -> asyncio.Lock:
+    """The in-process lock for a site, created on first use"""
+    lock = _site_locks.get(site_id)
+    if lock is None:
+        lock = _site_locks[site_id] = asyncio.Lock()
+    return lock
+
+
+class RiskScoreMaintainer:
+    """
+    Keeps site risk scores current as signals are added and resolved
+
+    Each update reads the site's current score from `site_current_risk`,
+    applies the delta from the changed signals and appends the new score to
+    `risk_scores`, whose trigger moves it into `site_current_risk`. The
+    append only succeeds if the current score is still the one that was
+    read, so updates from several app workers cannot overwrite each other;
+    a site that lost the race is re-read and recomputed. Full
+    recomputation is left to the nightly portfolio rescore.
+    """
+
+    def __init__(self, db, risk_scorer: RiskScorerAgent):
+        """
+        Initialize the maintainer
+
+        Args:
+            db: Async database client
+            risk_scorer: Scoring engine used to apply deltas
+        """
+        self.db = db
+        self.risk_scorer = risk_scorer
+
+    async def apply(
+        self,
+        added: Iterable[ExecutionSignal] = (),
+        resolved: Iterable[ExecutionSignal] = ()
+    ) -> dict[str, RiskScore]:
+        """
+        Update the scores of every site touched by the given signals
+
+        Args:
+            added: Newly stored signals
+            resolved: Signals that have just been resolved
+
+        Returns:
+            New RiskScore per affected site
+        """
+        changes = defaultdict(lambda: ([], []))
+        for signal in added:
+            changes[signal.site_id][0].append(signal)
+        for signal in resolved:
+            changes[signal.site_id][1].append(signal)
+
+        if not changes:
+            return {}
+
+        site_ids = sorted(changes)
+        new_scores: dict[str, RiskScore] = {}
+
+        try:
+            async with AsyncExitStack() as stack:
+                # Lock in sorted order so concurrent updates cannot deadlock
+                for site_id in site_ids:
+                    await stack.enter_async_context(_site_lock(site_id))
+
+                pending = site_ids
+                for _ in range(MAX_APPEND_ATTEMPTS):
+                    pending = await self._append(pending, changes, new_scores)
+                    if not pending:
+                        break
+                else:
+                    raise RuntimeError(
+                        f"Risk scores kept changing during the update for sites: {', '.join(pending)}"
+                    )
+        finally:
+            # Callers have already written the signals, so cached reads for
+            # these sites are stale even if the score update failed
+            invalidate_site_reads(site_ids)
+
+        return new_scores
+
+    async def _append(self, site_ids: list[str], changes: dict, new_scores: dict[str, RiskScore]) -> list[str]:
+        """
+        Apply the deltas on top of the current scores and append the results
+
+        The append is conditional (see `append_risk_scores` in schema.sql):
+        a site whose current score was replaced in the meantime, e.g. by
+        another app worker, is skipped and returned to be recomputed.
+        """
+        previous_result = await self.db.table("site_current_risk").select("*").in_("site_id", site_ids).execute()
+        previous_scores = {row["site_id"]: RiskScore(**row) for row in previous_result.data}
+
+        scores = {
+            site_id: self.risk_scorer.apply_signal_delta(
+                site_id,
+                previous_scores.get(site_id),
+                added=changes[site_id][0],
+                resolved=changes[site_id][1]
+            )
+            for site_id in site_ids
+        }
+
+        result = await self.db.rpc("append_risk_scores", {
+            "p_scores": [score.model_dump(mode="json") for score in scores.values()],
+            "p_expected": {
+                site_id: previous_scores[site_id].risk_score_id if site_id in previous_scores else None
+                for site_id in site_ids
+            }
+        }, operation="write").execute()
+
+        conflicted = list(result.data or [])
+        for site_id, score in scores.items():
+            if site_id not in conflicted:
+                new_scores[site_id] = score
+        return conflicted
@@ -0,0 +1,251 @@
+"""Incremental CSV / NDJSON parsing for streamed uploads"""
+
+import codecs
+import csv
+import json
+import re
+from typing import AsyncIterable, AsyncIterator, Optional
+
+from multipart.multipart import MultipartParser, parse_options_header
+
+
+# Content types that select NDJSON parsing; anything else is read as CSV
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-seq")
+
+# One physical line with its terminator; a trailing lone "\r" is held back
+# in case the matching "\n" arrives in the next chunk
+_LINE = re.compile(r"[^\r\n]*(?:\r\n|\n|\r(?!$))")
+
+
+class UploadFormatError(ValueError):
+    """Raised when a streamed upload cannot be parsed"""
+
+
+async def iter_csv_rows(
+    chunks: AsyncIterable[bytes],
+    encoding: str = "utf-8-sig"
+) -> AsyncIterator[dict]:
+    """
+    Parse CSV rows from a stream of byte chunks
+
+    Rows are yielded as soon as their last line arrives, with the same shape
+    as csv.DictReader: the first record is the header, short rows are padded
+    with None and extra fields are collected under the None key. Only the
+    current partial record is buffered, so memory use does not grow with the
+    size of the upload.
+
+    Args:
+        chunks: Raw upload bytes in arbitrary pieces
+        encoding: Text encoding (the default also strips a UTF-8 BOM)
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    tail = ""
+    record: list[str] = []
+    in_quotes = False
+    header: Optional[list[str]] = None
+
+    def complete_records(text: str) -> list[str]:
+        """Split text into lines and return those that close a record"""
+        nonlocal tail, in_quotes
+        text = tail + text
+        lines = []
+        end = 0
+        for match in _LINE.finditer(text):
+            lines.append(match.group())
+            end = match.end()
+        tail = text[end:]
+
+        ready = []
+        for line in lines:
+            record.append(line)
+            # A newline inside a quoted field continues the record
+            if line.count('"') % 2:
+                in_quotes = not in_quotes
+            if not in_quotes:
+                ready.extend(record)
+                record.clear()
+        return ready
+
+    def to_dicts(lines: list[str]) -> list[dict]:
+        """Parse complete records, consuming the header first"""
+        nonlocal header
+        rows = []
+        for values in csv.reader(lines):
+            if not values:
+                continue
+            if header is None:
+                header = values
+                continue
+            row = dict(zip(header, values))
+            if len(values) > len(header):
+                row[None] = values[len(header):]
+            elif len(values) < len(header):
+                for key in header[len(values):]:
+                    row[key] = None
+            rows.append(row)
+        return rows
+
+    async for chunk in chunks:
+        try:
+            text = decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            raise UploadFormatError(f"Upload is not valid {encoding}: {e}") from e
+
+        for row in to_dicts(complete_records(text)):
+            yield row
+
+    text = decoder.decode(b"", final=True)
+    lines = complete_records(text)
+    if tail:
+        record.append(tail)
+        tail = ""
+    lines.extend(record)
+    record.clear()
+
+    for row in to_dicts(lines):
+        yield row
+
+
+async def iter_ndjson_rows(
+    chunks: AsyncIterable[bytes],
+    encoding: str = "utf-8-sig"
+) -> AsyncIterator[dict]:
+    """
+    Parse newline-delimited JSON objects from a stream of byte chunks
+
+    Blank lines are skipped. A line that is not a JSON object raises
+    UploadFormatError naming its line number.
+
+    Args:
+        chunks: Raw upload bytes in arbitrary pieces
+        encoding: Text encoding (the default also strips a UTF-8 BOM)
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    tail = ""
+    line_number = 0
+
+    def parse(line: str) -> Optional[dict]:
+        nonlocal line_number
+        line_number += 1
+        if not line.strip():
+            return None
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise UploadFormatError(f"Line {line_number}: invalid JSON ({e})") from e
+        if not isinstance(value, dict):
+            raise UploadFormatError(f"Line {line_number}: expected a JSON object")
+        return value
+
+    async for chunk in chunks:
+        try:
+            text = tail + decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            raise UploadFormatError(f"Upload is not valid {encoding}: {e}") from e
+
+        lines = text.split("\n")
+        tail = lines.pop()
+        for line in lines:
+            row = parse(line)
+            if row is not None:
+                yield row
+
+    row = parse(tail + decoder.decode(b"", final=True))
+    if row is not None:
+        yield row
+
+
+def iter_upload_rows(
+    body: AsyncIterable[bytes],
+    content_type: str,
+    upload_format: Optional[str] = None,
+    field_name: str = "file"
+) -> AsyncIterator[dict]:
+    """
+    Parse rows from a streamed request body
+
+    Multipart bodies are unwrapped to the `field_name` file. The format is
+    `upload_format` when given ("csv" or "ndjson"), otherwise NDJSON for the
+    NDJSON content types and CSV for everything else.
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type == "multipart/form-data":
+        body = iter_multipart_file(body, content_type, field_name=field_name)
+
+    if upload_format is None:
+        upload_format = "ndjson" if media_type in NDJSON_CONTENT_TYPES else "csv"
+
+    if upload_format == "ndjson":
+        return iter_ndjson_rows(body)
+    return iter_csv_rows(body)
+
+
+async def iter_multipart_file(
+    body: AsyncIterable[bytes],
+    content_type: str,
+    field_name: str = "file"
+) -> AsyncIterator[bytes]:
+    """
+    Yield the bytes of one file field from a streamed multipart/form-data body
+
+    Args:
+        body: Raw request body chunks
+        content_type: Request Content-Type header (carries the boundary)
+        field_name: Form field holding the file
+
+    Raises:
+        UploadFormatError: If the body is not multipart or the field is missing
+    """
+    _, params = parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise UploadFormatError("Missing multipart boundary")
+
+    state = {"header_field": b"", "header_value": b"", "in_field": False, "found": False}
+    pieces: list[bytes] = []
+
+    def on_header_field(data, start, end):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        if state["header_field"].lower() == b"content-disposition":
+            _, options = parse_options_header(state["header_value"])
+            state["in_field"] = options.get(b"name") == field_name.encode()
+            state["found"] = state["found"] or state["in_field"]
+        state["header_field"] = b""
+        state["header_value"] = b""
+
+    def on_part_data(data, start, end):
+        if state["in_field"]:
+            pieces.append(data[start:end])
+
+    def on_part_end():
+        state["in_field"] = False
+
+    parser = MultipartParser(boundary, {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    async for chunk in body:
+        try:
+            parser.write(chunk)
+        except Exception as e:
+            raise UploadFormatError(f"Malformed multipart body: {e}") from e
+        if pieces:
+            data = b"".join(pieces)
+            pieces.clear()
+            yield data
+
+    parser.finalize()
+    if pieces:
+        yield b"".join(pieces)
+
+    if not state["found"]:
+        raise UploadFormatError(f"Missing form field '{field_name}'")
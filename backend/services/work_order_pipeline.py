@@ -0,0 +1,186 @@
+"""Bulk work order ingestion"""
+
+import json
+import os
+from datetime import datetime
+from typing import AsyncIterable, Iterable, Optional, Union
+
+from pydantic import TypeAdapter, ValidationError
+
+from backend.models import WorkOrder
+from backend.agents import SignalExtractorAgent
+from backend.db.bulk import BulkWriter
+from backend.services.iterables import aiter_any
+from backend.services.risk_maintenance import RiskScoreMaintainer
+
+
+BULK_BATCH_SIZE = int(os.getenv("WORK_ORDER_BULK_BATCH_SIZE", "1000"))
+MAX_REPORTED_ERRORS = 1000
+
+_work_order_list = TypeAdapter(list[WorkOrder])
+
+
+class WorkOrderBulkIngestor:
+    """
+    Batched ingestion of work order rows from CSV or NDJSON syncs
+
+    Rows are validated a batch at a time, the late work order rule runs over
+    each batch against a single reference time for the whole sync, and work
+    orders and their late signals are written with chunked multi-row
+    upserts; a row the database rejects is reported on its own while the
+    rest of its batch is stored. Re-sending the same orders is safe: work
+    orders are updated in place and existing late signals are left
+    untouched.
+    """
+
+    def __init__(
+        self,
+        db,
+        signal_extractor: SignalExtractorAgent,
+        batch_size: int = BULK_BATCH_SIZE,
+        risk_maintainer: Optional[RiskScoreMaintainer] = None
+    ):
+        """
+        Initialize the ingestor
+
+        Args:
+            db: Async database client used for writes
+            signal_extractor: Agent providing the late work order rule
+            batch_size: Rows validated and written per batch
+            risk_maintainer: Updates site risk scores after each written batch
+        """
+        self.db = db
+        self.signal_extractor = signal_extractor
+        self.batch_size = max(1, batch_size)
+        self.risk_maintainer = risk_maintainer
+
+    async def run(
+        self,
+        rows: Union[Iterable[dict], AsyncIterable[dict]],
+        now: Optional[datetime] = None
+    ) -> dict:
+        """
+        Ingest work order rows and summarize the outcome
+
+        Args:
+            rows: Work order dicts (CSV rows or parsed NDJSON), sync or async
+            now: Reference time for lateness (defaults to the current UTC time)
+
+        Returns:
+            Counts, the reference time and the first MAX_REPORTED_ERRORS row errors
+        """
+        now = now or datetime.utcnow()
+        summary = {
+            "rows_received": 0,
+            "work_orders_ingested": 0,
+            "rows_failed": 0,
+            "late_signals_detected": 0,
+            "late_signals_created": 0,
+            "reference_time": now.isoformat(),
+            "errors": [],
+            "errors_truncated": False
+        }
+
+        batch: list[tuple[int, dict]] = []
+        try:
+            async for row in aiter_any(rows):
+                summary["rows_received"] += 1
+                batch.append((summary["rows_received"], row))
+                if len(batch) >= self.batch_size:
+                    await self._process_batch(batch, now, summary)
+                    batch = []
+        except Exception as e:
+            # Rows read before the source broke are still written below
+            self._record_error(summary, summary["rows_received"] + 1, None, f"Could not read input: {e}")
+
+        if batch:
+            await self._process_batch(batch, now, summary)
+
+        return summary
+
+    async def _process_batch(self, batch: list[tuple[int, dict]], now: datetime, summary: dict):
+        """Validate, detect lateness for and store one batch of rows"""
+        work_orders = self._validate(batch, summary)
+        if not work_orders:
+            return
+
+        signals = self.signal_extractor.detect_late_work_orders(work_orders, now=now)
+
+        writer = BulkWriter(self.db)
+        for wo in work_orders:
+            writer.add("work_orders", [wo.model_dump(mode="json")], ref=wo.work_order_id, on_conflict="work_order_id")
+        for signal in signals:
+            # Keep existing late signals (and their resolution state) as
+            # they are; only rows actually inserted come back
+            writer.add(
+                "execution_signals",
+                [signal.model_dump(mode="json")],
+                ref=signal.source_id,
+                on_conflict="signal_id",
+                ignore_duplicates=True
+            )
+        outcome = await writer.flush()
+
+        for wo in work_orders:
+            if wo.work_order_id in outcome.failed:
+                self._record_error(summary, None, wo.work_order_id, f"Database write failed: {outcome.failed[wo.work_order_id]}")
+
+        inserted = {row["signal_id"] for row in outcome.rows("execution_signals")}
+        new_signals = [s for s in signals if s.signal_id in inserted]
+
+        summary["work_orders_ingested"] += sum(1 for wo in work_orders if wo.work_order_id not in outcome.failed)
+        summary["late_signals_detected"] += sum(1 for s in signals if s.source_id not in outcome.failed)
+        summary["late_signals_created"] += len(new_signals)
+
+        if self.risk_maintainer is not None and new_signals:
+            try:
+                await self.risk_maintainer.apply(added=new_signals)
+            except Exception as e:
+                # Orders are stored; the next rescore will pick up their signals
+                summary.setdefault("risk_update_errors", []).append(str(e))
+
+    def _validate(self, batch: list[tuple[int, dict]], summary: dict) -> list[WorkOrder]:
+        """Validate a batch in one pass, recording and dropping invalid rows"""
+        cleaned = [_clean_row(row) for _, row in batch]
+
+        try:
+            work_orders = _work_order_list.validate_python(cleaned)
+        except ValidationError as e:
+            problems: dict[int, list[str]] = {}
+            for err in e.errors():
+                index, *field = err["loc"]
+                problems.setdefault(index, []).append(f"{'.'.join(map(str, field)) or 'row'}: {err['msg']}")
+
+            for index, messages in problems.items():
+                row_number, row = batch[index]
+                self._record_error(summary, row_number, row.get("work_order_id"), "; ".join(messages))
+
+            work_orders = _work_order_list.validate_python(
+                [row for index, row in enumerate(cleaned) if index not in problems]
+            )
+
+        # A work order repeated within a batch keeps its last version
+        return list({wo.work_order_id: wo for wo in work_orders}.values())
+
+    def _record_error(self, summary: dict, row: Optional[int], work_order_id: Optional[str], error: str):
+        """Count a failed row and keep its details up to the reporting cap"""
+        summary["rows_failed"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            summary["errors"].append({"row": row, "work_order_id": work_order_id, "error": error})
+        else:
+            summary["errors_truncated"] = True
+
+
+def _clean_row(row: dict) -> dict:
+    """Normalize a CSV row: empty cells become defaults, metadata is parsed JSON"""
+    cleaned = {
+        key: value
+        for key, value in row.items()
+        if key is not None and value is not None and value != ""
+    }
+    if isinstance(cleaned.get("metadata"), str):
+        try:
+            cleaned["metadata"] = json.loads(cleaned["metadata"])
+        except json.JSONDecodeError:
+            pass
+    return cleaned
@@ -0,0 +1,34 @@
+"""
+Shared test fixtures
+
+Tests run offline from the repository root with `python -m pytest backend/tests`.
+Tests marked with the `postgres` fixture also need TEST_DATABASE_URL pointing at
+a disposable database with backend/db/schema.sql applied; they are skipped
+otherwise.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+# Agents build their model client at construction; no request is ever sent
+os.environ.setdefault("OPENAI_API_KEY", "test")
+# Keep background loops out of tests that import the app
+os.environ.setdefault("OVERDUE_SWEEP_INTERVAL_SECONDS", "0")
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion on a fresh event loop"""
+    return asyncio.run
+
+
+@pytest.fixture
+def postgres_dsn() -> str:
+    """Connection URL of the test database (skips the test when unset)"""
+    dsn = os.getenv("TEST_DATABASE_URL")
+    if not dsn:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    pytest.importorskip("asyncpg")
+    return dsn
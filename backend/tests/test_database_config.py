@@ -0,0 +1,33 @@
+"""Async client selection in Database"""
+
+import pytest
+
+from backend.benchmarks.memory_db import MemoryClient
+from backend.db.async_client import AsyncClient
+from backend.db.config import Database
+
+
+@pytest.fixture(autouse=True)
+def fresh_database():
+    Database.reset()
+    yield
+    Database.reset()
+
+
+def test_postgres_backend_ignores_an_existing_sync_client(monkeypatch):
+    pytest.importorskip("asyncpg")
+    from backend.db.postgres import PostgresClient
+
+    monkeypatch.setenv("DATABASE_BACKEND", "postgres")
+    monkeypatch.setenv("DATABASE_URL", "postgresql://localhost/unused")
+    Database.set_client(MemoryClient())
+
+    assert isinstance(Database.get_async_client(), PostgresClient)
+
+
+def test_injected_async_client_wins_over_the_env(monkeypatch):
+    monkeypatch.setenv("DATABASE_BACKEND", "postgres")
+    injected = AsyncClient(MemoryClient(), max_workers=1)
+    Database.set_async_client(injected)
+
+    assert Database.get_async_client() is injected
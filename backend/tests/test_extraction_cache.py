@@ -0,0 +1,53 @@
+"""ExtractionCache SQLite tier"""
+
+import threading
+
+from backend.agents.extraction_cache import ExtractionCache
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path, run):
+    path = str(tmp_path / "cache.sqlite3")
+    run(ExtractionCache(disk_path=path).set_many({"a": "1", "b": "2"}))
+
+    cache = ExtractionCache(disk_path=path)
+    assert run(cache.get_many(["a", "b", "c"])) == {"a": "1", "b": "2"}
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.memory.get("a") == "1"
+
+
+def test_expired_disk_entries_are_dropped(tmp_path, run):
+    path = str(tmp_path / "cache.sqlite3")
+    run(ExtractionCache(ttl_seconds=0.000001, disk_path=path).set("a", "1"))
+
+    cache = ExtractionCache(ttl_seconds=0.000001, disk_path=path)
+    assert run(cache.get("a")) is None
+    assert cache._disk.execute("SELECT COUNT(*) FROM extraction_cache").fetchone() == (0,)
+
+
+def test_disk_calls_run_off_the_event_loop_thread(tmp_path, run, monkeypatch):
+    cache = ExtractionCache(max_entries=1, disk_path=str(tmp_path / "cache.sqlite3"))
+    threads = []
+    for name in ("_disk_put_many", "_disk_get_many"):
+        original = getattr(cache, name)
+
+        def spy(*args, _original=original):
+            threads.append(threading.current_thread())
+            return _original(*args)
+
+        monkeypatch.setattr(cache, name, spy)
+
+    async def roundtrip():
+        await cache.set_many({"a": "1", "b": "2"})
+        return await cache.get_many(["a", "b"])
+
+    assert run(roundtrip()) == {"a": "1", "b": "2"}
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+def test_duplicate_keys_count_once_per_lookup(run):
+    cache = ExtractionCache()
+    run(cache.set("a", "1"))
+
+    assert run(cache.get_many(["a", "a", "b"])) == {"a": "1"}
+    assert (cache.hits, cache.misses) == (2, 1)
@@ -0,0 +1,109 @@
+"""Inspection ingest pipeline concurrency"""
+
+import asyncio
+import csv
+import io
+
+from backend.agents import ExtractionCache
+from backend.benchmarks.fake_extractor import FakeSignalExtractor
+from backend.benchmarks.generators import generate_inspection_csv
+from backend.benchmarks.memory_db import MemoryClient
+from backend.db.async_client import AsyncClient
+from backend.services.inspection_pipeline import InspectionIngestPipeline
+
+
+class _SplittingExtractor(FakeSignalExtractor):
+    """Fails every multi-note request, so each pack is split down to single notes"""
+
+    def __init__(self):
+        super().__init__(latency_ms=5, cache=ExtractionCache(max_entries=0))
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _call_model(self, agent, user_prompt, mode, request_slots=None, parts=None):
+        async def request():
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                return await super(_SplittingExtractor, self)._call_model(agent, user_prompt, mode)
+            finally:
+                self.in_flight -= 1
+
+        if request_slots is None:
+            result = await request()
+        else:
+            async with request_slots:
+                result = await request()
+        if mode == "batch":
+            raise ValueError("Simulated attribution failure")
+        return result
+
+
+class _SlowWriterPipeline(InspectionIngestPipeline):
+    """Writes slowly and tracks how far reading runs ahead of finished rows"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read = 0
+        self.written = 0
+        self.max_ahead = 0
+
+    async def rows(self, rows):
+        for row in rows:
+            self.read += 1
+            self.max_ahead = max(self.max_ahead, self.read - self.written)
+            yield row
+
+    async def _write_batch(self, batch, finish):
+        await asyncio.sleep(0.01)
+        await super()._write_batch(batch, finish)
+        self.written += len(batch)
+
+
+def test_concurrency_bounds_model_requests_not_packs(run):
+    rows = list(csv.DictReader(io.StringIO(
+        generate_inspection_csv(["site_a", "site_b"], 40, unique_notes=True).decode("utf-8")
+    )))
+    extractor = _SplittingExtractor()
+    extractor.prefilter = None
+    pipeline = InspectionIngestPipeline(AsyncClient(MemoryClient(), max_workers=2), extractor, concurrency=2)
+
+    results = run(pipeline.run(rows))
+
+    assert [r["status"] for r in results] == ["success"] * len(rows)
+    assert extractor.max_in_flight == 2
+
+
+def test_summary_lists_only_failed_rows(run):
+    rows = list(csv.DictReader(io.StringIO(
+        generate_inspection_csv(["site_a"], 30, unique_notes=True).decode("utf-8")
+    )))
+    rows[4]["inspection_date"] = "not a date"
+    rows[21]["site_id"] = None
+    pipeline = InspectionIngestPipeline(AsyncClient(MemoryClient(), max_workers=2), FakeSignalExtractor(), concurrency=2)
+
+    summary = run(pipeline.summarize(rows))
+
+    assert summary["rows_received"] == 30
+    assert (summary["inspections_processed"], summary["inspections_failed"]) == (28, 2)
+    assert [error["row"] for error in summary["errors"]] == [5, 22]
+    assert all(error["error"].startswith("Invalid row") for error in summary["errors"])
+    assert not summary["errors_truncated"]
+
+
+def test_slow_writes_hold_back_reading(run):
+    rows = list(csv.DictReader(io.StringIO(
+        generate_inspection_csv(["site_a", "site_b"], 400, unique_notes=True).decode("utf-8")
+    )))
+    extractor = FakeSignalExtractor()
+    extractor.prefilter = None
+    pipeline = _SlowWriterPipeline(
+        AsyncClient(MemoryClient(), max_workers=2), extractor, concurrency=2, write_batch_size=5
+    )
+
+    summary = run(pipeline.summarize(pipeline.rows(rows)))
+
+    assert summary["inspections_processed"] == 400
+    # Queued rows, packs in flight, the pack being read and the batch being written
+    per_pack = extractor.max_batch_notes
+    assert pipeline.max_ahead <= 2 * per_pack + 2 * per_pack + per_pack + 5
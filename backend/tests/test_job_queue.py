@@ -0,0 +1,136 @@
+"""Background job queue leases and upload failures"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.services.job_queue import JobQueue, JobStore
+
+
+async def _echo(items: list[dict]) -> list[dict]:
+    return [{"status": "success", **item} for item in items]
+
+
+@pytest.fixture
+def store(tmp_path) -> JobStore:
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def _queue(store: JobStore, lease_seconds: float = 60) -> JobQueue:
+    queue = JobQueue(store, lease_seconds=lease_seconds)
+    queue.register("echo", _echo)
+    return queue
+
+
+def test_live_lease_is_not_taken_over(store):
+    running = _queue(store)
+    job_id = store.create_job("echo")
+    assert store.claim_next_job(running.owner)["job_id"] == job_id
+
+    # Another worker starting up leaves the job with its live owner
+    assert store.requeue_interrupted() == 0
+    assert store.get_job(job_id)["status"] == "running"
+
+
+def test_expired_lease_is_requeued(store):
+    crashed = _queue(store, lease_seconds=0.01)
+    job_id = store.create_job("echo")
+    store.claim_next_job(crashed.owner, crashed.lease_seconds)
+    time.sleep(0.02)
+
+    assert store.requeue_interrupted() == 1
+    assert store.get_job(job_id)["status"] == "queued"
+    assert store.claim_next_job(_queue(store).owner)["job_id"] == job_id
+
+
+def test_renewed_lease_survives(store):
+    queue = _queue(store, lease_seconds=0.05)
+    job_id = store.create_job("echo")
+    store.claim_next_job(queue.owner, queue.lease_seconds)
+    time.sleep(0.03)
+    store.renew_leases(queue.owner, queue.lease_seconds)
+    time.sleep(0.03)
+
+    assert store.requeue_interrupted() == 0
+    assert store.get_job(job_id)["status"] == "running"
+
+
+def test_abandoned_upload_fails(store):
+    job_id = store.create_job("echo", "receiving", owner="gone", lease_seconds=0)
+    time.sleep(0.01)
+
+    store.requeue_interrupted()
+    job = store.get_job(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "Upload was interrupted"
+
+
+def test_failed_source_marks_job_failed(store, run):
+    queue = _queue(store)
+
+    async def rows():
+        yield {"n": 1}
+        raise ValueError("bad row")
+
+    with pytest.raises(ValueError):
+        run(queue.submit("echo", rows()))
+
+    (job_id,) = [row[0] for row in store._conn.execute("SELECT job_id FROM jobs")]
+    job = store.get_job(job_id)
+    assert job["status"] == "failed"
+    assert "bad row" in job["error"]
+
+
+def test_cancelled_upload_marks_job_failed(store, run):
+    queue = _queue(store)
+
+    async def rows():
+        yield {"n": 1}
+        await asyncio.sleep(10)
+        yield {"n": 2}
+
+    async def submit_and_cancel():
+        task = asyncio.create_task(queue.submit("echo", rows()))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    run(submit_and_cancel())
+    (job_id,) = [row[0] for row in store._conn.execute("SELECT job_id FROM jobs")]
+    assert store.get_job(job_id)["status"] == "failed"
+
+
+async def _run_to_completion(queue: JobQueue, kind: str, payloads: list[dict]) -> dict:
+    await queue.start()
+    try:
+        job_id = await queue.submit(kind, payloads)
+        for _ in range(200):
+            job = await queue.get_job(job_id)
+            if job["status"] == "completed":
+                return job
+            await asyncio.sleep(0.01)
+        return job
+    finally:
+        await queue.stop()
+
+
+def test_workers_process_submitted_jobs(store, run):
+    job = run(_run_to_completion(_queue(store), "echo", [{"n": i} for i in range(5)]))
+    assert job["status"] == "completed"
+    assert job["processed_items"] == 5
+
+
+def test_items_without_a_result_fail(store, run):
+    async def drops_last(items: list[dict]) -> list[dict]:
+        return (await _echo(items))[:-1]
+
+    queue = JobQueue(store, chunk_size=3)
+    queue.register("drops_last", drops_last)
+
+    job = run(_run_to_completion(queue, "drops_last", [{"n": i} for i in range(5)]))
+    assert job["status"] == "completed"
+    assert (job["processed_items"], job["failed_items"]) == (5, 2)
+    assert [item["status"] for item in job["items"]] == ["success", "success", "error", "success", "error"]
+    assert "returned 2 results for 3 items" in job["items"][2]["error"]
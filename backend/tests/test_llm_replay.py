@@ -0,0 +1,68 @@
+"""Replaying recorded extraction calls"""
+
+from datetime import datetime
+
+from backend.agents import ExtractionCache, SignalExtractorAgent
+from backend.agents.llm_replay import LLMReplayStore
+from backend.benchmarks.fake_extractor import FakeSignalExtractor
+from backend.models import Inspection
+
+
+NOTES = [
+    "Fire extinguisher missing in corridor B.",
+    "Roof leak above loading dock, tenant reports water damage.",
+    "HVAC unit not cooling, work order not closed after two weeks.",
+    "Emergency exit blocked by pallets.",
+]
+
+
+class _FakeAgent:
+    """Answers `run` with the fake extractor's deterministic results"""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.fake = FakeSignalExtractor(cache=ExtractionCache(max_entries=0))
+
+    async def run(self, user_prompt: str):
+        return await self.fake._call_model(None, user_prompt, self.mode)
+
+
+def _extractor(store: LLMReplayStore, max_batch_notes: int) -> SignalExtractorAgent:
+    extractor = SignalExtractorAgent(cache=ExtractionCache(max_entries=0), replay=store)
+    extractor.prefilter = None
+    extractor.max_batch_notes = max_batch_notes
+    if store.mode == "record":
+        extractor.agent = _FakeAgent("single")
+        extractor.batch_agent = _FakeAgent("batch")
+    return extractor
+
+
+def _inspections() -> list[Inspection]:
+    return [
+        Inspection(
+            inspection_id=f"test_replay_{idx}",
+            site_id="site_a",
+            inspector_name="Inspector",
+            inspection_date=datetime(2026, 1, 1),
+            notes=note,
+            status="completed"
+        )
+        for idx, note in enumerate(NOTES)
+    ]
+
+
+def _extracted(results: list) -> list:
+    return [[(s.signal_type, s.severity, s.confidence_score) for s in signals] for signals in results]
+
+
+def test_replay_does_not_depend_on_packing(tmp_path, run, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    path = str(tmp_path / "replay.sqlite3")
+    recorded = run(_extractor(LLMReplayStore(path, mode="record"), 4).extract_from_inspections(_inspections()))
+
+    store = LLMReplayStore(path, mode="replay")
+    replayed = run(_extractor(store, 2).extract_from_inspections(_inspections()))
+
+    assert _extracted(replayed) == _extracted(recorded)
+    # Both 2-note packs miss, then every note is served on its own
+    assert (store.missed, store.replayed) == (2, 4)
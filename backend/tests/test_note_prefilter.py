@@ -0,0 +1,47 @@
+"""Note pre-filter decisions"""
+
+import pytest
+
+from backend.agents.note_prefilter import NotePrefilter
+from backend.benchmarks.generators import CLEAN_NOTES
+
+
+@pytest.mark.parametrize("notes", [
+    *CLEAN_NOTES,
+    "No issues found.",
+    "All equipment operational and no concerns noted.",
+    "Monthly inspection completed. Nothing to report.",
+])
+def test_clean_notes_skip_the_llm(notes):
+    assert NotePrefilter().is_clean(notes)
+
+
+@pytest.mark.parametrize("notes", [
+    "No issues found. Roof membrane torn near east drain.",
+    "All equipment operational. Elevator inspection certificate expired last month.",
+    "No concerns. Emergency lights did not illuminate during test.",
+    "No problems found, but HVAC unit making loud grinding noise",
+    "All systems operational. Tenant reports water dripping from ceiling tiles in suite 210.",
+    "Routine walkthrough completed. Loading dock door will not close fully.",
+    "Documentation complete. Smell of gas near the boiler room.",
+])
+def test_mixed_notes_go_to_the_llm(notes):
+    assert not NotePrefilter().is_clean(notes)
+
+
+@pytest.mark.parametrize("notes", [
+    "",
+    "Walkthrough done.",
+    "Roof membrane torn near east drain.",
+])
+def test_notes_without_a_clean_phrase_go_to_the_llm(notes):
+    assert not NotePrefilter().is_clean(notes)
+
+
+def test_stats_count_skips():
+    prefilter = NotePrefilter()
+    prefilter.should_skip("No issues found.")
+    prefilter.should_skip("No issues found. Roof membrane torn near east drain.")
+
+    assert prefilter.stats.checked == 2
+    assert prefilter.stats.skipped == 1
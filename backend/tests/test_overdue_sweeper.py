@@ -0,0 +1,148 @@
+"""Overdue work order sweeper against a real schema"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from backend.agents import RiskScorerAgent, SignalExtractorAgent
+from backend.agents.signal_extractor import LATE_HIGH_DAYS
+from backend.db.postgres import PostgresClient
+from backend.services.overdue_sweeper import OverdueWorkOrderSweeper, WATERMARK_NAME
+
+
+SITE_ID = "test_overdue_sweeper_site"
+WORK_ORDER_ID = "test_overdue_sweeper_wo"
+NEW_WORK_ORDER_ID = "test_overdue_sweeper_wo_new"
+
+
+class _LockstepSweeper(OverdueWorkOrderSweeper):
+    """Waits after reading stored signals until every sweeper has read them"""
+
+    def __init__(self, *args, readers: int, arrived: list, all_read: asyncio.Event, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.readers = readers
+        self.arrived = arrived
+        self.all_read = all_read
+
+    async def _fetch_existing(self, db, signal_ids):
+        existing = await super()._fetch_existing(db, signal_ids)
+        self.arrived.append(self)
+        if len(self.arrived) == self.readers:
+            self.all_read.set()
+        await self.all_read.wait()
+        return existing
+
+
+def _work_order(work_order_id: str, due_date: datetime) -> dict:
+    return {
+        "work_order_id": work_order_id,
+        "site_id": SITE_ID,
+        "title": "Replace filter",
+        "description": "Replace the AHU filter",
+        "status": "open",
+        "created_date": (due_date - timedelta(days=3)).isoformat(),
+        "due_date": due_date.isoformat()
+    }
+
+
+async def _escalate_stored_signal(dsn: str) -> tuple[dict, dict]:
+    db = PostgresClient(dsn, min_size=1, max_size=2)
+    extractor = SignalExtractorAgent()
+    now = datetime.utcnow().replace(microsecond=0)
+    due_date = now - timedelta(days=LATE_HIGH_DAYS, hours=1)
+    first_detected = due_date + timedelta(hours=2)
+
+    try:
+        await db.table("sites").upsert({
+            "site_id": SITE_ID,
+            "name": "Sweeper test site",
+            "location": "Test",
+            "site_type": "office"
+        }, on_conflict="site_id").execute()
+        await db.table("work_orders").upsert(_work_order(WORK_ORDER_ID, due_date), on_conflict="work_order_id").execute()
+
+        # Stored as low when the order first went late
+        low = extractor._late_work_order_signal(WORK_ORDER_ID, SITE_ID, due_date, 0, "low", first_detected)
+        await db.table("execution_signals").upsert(low.model_dump(mode="json"), on_conflict="signal_id").execute()
+
+        # The order crosses the high threshold inside this sweep's window
+        await db.table("maintenance_watermarks").upsert(
+            {"name": WATERMARK_NAME, "watermark": (now - timedelta(days=1)).isoformat()},
+            on_conflict="name"
+        ).execute()
+
+        sweeper = OverdueWorkOrderSweeper(lambda: db, extractor, RiskScorerAgent(), interval_seconds=0)
+        stats = await sweeper.sweep(now=now)
+
+        stored = await db.table("execution_signals").select("*").eq("signal_id", low.signal_id).execute()
+        return stats, stored.data[0]
+    finally:
+        await db.table("maintenance_watermarks").delete().eq("name", WATERMARK_NAME).execute()
+        await db.table("sites").delete().eq("site_id", SITE_ID).execute()
+        await db.aclose()
+
+
+def test_escalation_keeps_not_null_columns(postgres_dsn, run):
+    stats, stored = run(_escalate_stored_signal(postgres_dsn))
+
+    assert stats["signals_escalated"] == 1
+    assert stored["severity"] == "high"
+    assert stored["evidence"]["days_late"] >= LATE_HIGH_DAYS
+    # Detection time stays that of the first sweep that saw the order late
+    assert stored["detected_date"] is not None
+    assert datetime.fromisoformat(stored["detected_date"]).replace(tzinfo=None) < datetime.utcnow() - timedelta(days=1)
+
+
+async def _concurrent_sweeps(dsn: str) -> tuple[list[dict], int]:
+    db = PostgresClient(dsn, min_size=1, max_size=4)
+    extractor = SignalExtractorAgent()
+    now = datetime.utcnow().replace(microsecond=0)
+    due_date = now - timedelta(days=LATE_HIGH_DAYS, hours=1)
+
+    try:
+        await db.table("sites").delete().eq("site_id", SITE_ID).execute()
+        await db.table("sites").insert({
+            "site_id": SITE_ID,
+            "name": "Sweeper test site",
+            "location": "Test",
+            "site_type": "office"
+        }).execute()
+        await db.table("work_orders").insert([
+            _work_order(WORK_ORDER_ID, due_date),
+            _work_order(NEW_WORK_ORDER_ID, now - timedelta(hours=1))
+        ]).execute()
+
+        low = extractor._late_work_order_signal(WORK_ORDER_ID, SITE_ID, due_date, 0, "low", due_date + timedelta(hours=2))
+        await db.table("execution_signals").insert(low.model_dump(mode="json")).execute()
+        await db.table("maintenance_watermarks").upsert(
+            {"name": WATERMARK_NAME, "watermark": (now - timedelta(days=1)).isoformat()},
+            on_conflict="name"
+        ).execute()
+
+        # Two app workers sweep the same window; both read the signal as
+        # low and the new order as unflagged before either writes
+        arrived, all_read = [], asyncio.Event()
+        sweepers = [
+            _LockstepSweeper(
+                lambda: db, extractor, RiskScorerAgent(), interval_seconds=0,
+                readers=2, arrived=arrived, all_read=all_read
+            )
+            for _ in range(2)
+        ]
+        stats = await asyncio.gather(*[sweeper.sweep(now=now) for sweeper in sweepers])
+
+        history = await db.table("risk_scores").select("risk_score_id").eq("site_id", SITE_ID).execute()
+        return stats, len(history.data)
+    finally:
+        await db.table("maintenance_watermarks").delete().eq("name", WATERMARK_NAME).execute()
+        await db.table("sites").delete().eq("site_id", SITE_ID).execute()
+        await db.aclose()
+
+
+def test_overlapping_sweeps_score_each_change_once(postgres_dsn, run):
+    stats, score_updates = run(_concurrent_sweeps(postgres_dsn))
+
+    assert sum(s["signals_created"] for s in stats) == 1
+    assert sum(s["signals_escalated"] for s in stats) == 1
+    # Each sweep that applied a change updates the score once; the losing
+    # side of either race adds nothing
+    assert score_updates == sum(1 for s in stats if s["signals_created"] or s["signals_escalated"])
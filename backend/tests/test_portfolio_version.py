@@ -0,0 +1,59 @@
+"""Portfolio version validator against a real schema"""
+
+import asyncio
+
+import asyncpg
+
+
+SITE_IDS = ("test_portfolio_version_a", "test_portfolio_version_b")
+
+INSERT_SITE = "INSERT INTO sites (site_id, name, location, site_type) VALUES ($1, 'Version test site', 'Test', 'office')"
+
+
+async def _portfolio_version(conn) -> str:
+    return await conn.fetchval("SELECT portfolio_version()")
+
+
+async def _out_of_order_commits(dsn: str) -> dict:
+    first = await asyncpg.connect(dsn)
+    second = await asyncpg.connect(dsn)
+    try:
+        await first.execute("DELETE FROM sites WHERE site_id = ANY($1)", list(SITE_IDS))
+
+        # The first writer takes the lower version but commits last
+        first_tx = first.transaction()
+        await first_tx.start()
+        await first.execute(INSERT_SITE, SITE_IDS[0])
+
+        # Writers to other sites do not wait for it
+        await asyncio.wait_for(second.execute(INSERT_SITE, SITE_IDS[1]), timeout=5)
+        before_commit = await _portfolio_version(second)
+
+        await first_tx.commit()
+        versions = dict(await first.fetch(
+            "SELECT site_id, version FROM site_versions WHERE site_id = ANY($1)", list(SITE_IDS)
+        ))
+        after_commit = await _portfolio_version(second)
+
+        # A statement that touches no rows leaves the validator alone
+        await first.execute("UPDATE sites SET name = name WHERE site_id = 'test_portfolio_version_missing'")
+        unchanged = await _portfolio_version(second)
+
+        return {
+            "versions": versions,
+            "before_commit": before_commit,
+            "after_commit": after_commit,
+            "unchanged": unchanged
+        }
+    finally:
+        await first.execute("DELETE FROM sites WHERE site_id = ANY($1)", list(SITE_IDS))
+        await first.close()
+        await second.close()
+
+
+def test_out_of_order_commit_changes_the_validator(postgres_dsn, run):
+    result = run(_out_of_order_commits(postgres_dsn))
+
+    assert result["versions"][SITE_IDS[0]] < result["versions"][SITE_IDS[1]]
+    assert result["after_commit"] != result["before_commit"]
+    assert result["unchanged"] == result["after_commit"]
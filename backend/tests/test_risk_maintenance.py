@@ -0,0 +1,111 @@
+"""Incremental risk score updates racing other writers"""
+
+from datetime import datetime
+
+from backend.agents import RiskScorerAgent
+from backend.benchmarks.memory_db import MemoryClient
+from backend.db.async_client import AsyncClient
+from backend.db.postgres import PostgresClient
+from backend.models import ExecutionSignal, RiskScore
+from backend.services import risk_maintenance
+from backend.services.risk_maintenance import RiskScoreMaintainer
+
+
+SITE_ID = "test_risk_maintenance_site"
+
+
+def _signal(signal_id: str, severity: str = "high") -> ExecutionSignal:
+    return ExecutionSignal(
+        signal_id=signal_id,
+        site_id=SITE_ID,
+        signal_type="missed_inspection",
+        severity=severity,
+        detected_date=datetime.utcnow(),
+        confidence_score=1.0,
+        evidence={},
+        explanation="Test signal",
+        source_type="inspection",
+        source_id="test_inspection"
+    )
+
+
+class _RacingClient:
+    """Lets another writer append a score just before the first conditional append"""
+
+    def __init__(self, db, race):
+        self._db = db
+        self._race = race
+
+    def table(self, name: str):
+        return self._db.table(name)
+
+    def rpc(self, *args, **kwargs):
+        query = self._db.rpc(*args, **kwargs)
+        if self._race is None:
+            return query
+
+        race, self._race = self._race, None
+        return _RaceThenExecute(query, race)
+
+
+class _RaceThenExecute:
+    def __init__(self, query, race):
+        self._query = query
+        self._race = race
+
+    async def execute(self):
+        await self._race()
+        return await self._query.execute()
+
+
+async def _race(db) -> dict:
+    scorer = RiskScorerAgent()
+    await db.table("sites").upsert({
+        "site_id": SITE_ID,
+        "name": "Maintenance test site",
+        "location": "Test",
+        "site_type": "office"
+    }, on_conflict="site_id").execute()
+    await RiskScoreMaintainer(db, scorer).apply(added=[_signal("test_rm_first")])
+
+    # Another app worker (with its own in-process locks) adds a signal
+    # between this update's read and its append
+    async def other_worker():
+        current = await db.table("site_current_risk").select("*").eq("site_id", SITE_ID).execute()
+        score = scorer.apply_signal_delta(SITE_ID, RiskScore(**current.data[0]), added=[_signal("test_rm_other")])
+        await db.table("risk_scores").insert(score.model_dump(mode="json")).execute()
+
+    racing = _RacingClient(db, other_worker)
+    scores = await RiskScoreMaintainer(racing, scorer).apply(added=[_signal("test_rm_mine", "critical")])
+
+    current = await db.table("site_current_risk").select("*").eq("site_id", SITE_ID).execute()
+    history = await db.table("risk_scores").select("risk_score_id").eq("site_id", SITE_ID).execute()
+    return {"returned": scores[SITE_ID], "current": current.data[0], "history": len(history.data)}
+
+
+def _assert_no_lost_update(result: dict):
+    assert sorted(result["current"]["contributing_signals"]) == ["test_rm_first", "test_rm_mine", "test_rm_other"]
+    assert result["current"]["risk_score_id"] == result["returned"].risk_score_id
+    assert result["history"] == 3
+
+
+def test_concurrent_update_is_recomputed_in_memory(run):
+    _assert_no_lost_update(run(_race(AsyncClient(MemoryClient(), max_workers=2))))
+
+
+def test_concurrent_update_is_recomputed_in_postgres(postgres_dsn, run):
+    async def race():
+        db = PostgresClient(postgres_dsn, min_size=1, max_size=2)
+        try:
+            return await _race(db)
+        finally:
+            await db.table("sites").delete().eq("site_id", SITE_ID).execute()
+            await db.aclose()
+
+    _assert_no_lost_update(run(race()))
+
+
+def test_site_locks_are_released(run):
+    run(_race(AsyncClient(MemoryClient(), max_workers=2)))
+
+    assert len(risk_maintenance._site_locks) == 0
@@ -0,0 +1,10 @@
+"""Datetime helpers shared by agents, services and database clients"""
+
+from datetime import datetime, timezone
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Normalize a datetime to naive UTC (the convention used by utcnow)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value